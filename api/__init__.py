@@ -1,5 +1,6 @@
 from api.interfaces.prediction_model import PredictionModel
 from api.models.prediction_model_loader import PredictionModelLoader
+from api.services.prediction_service import PredictionService, PredictionServiceStats
 
 
-__all__ = ["PredictionModel", "PredictionModelLoader"]
+__all__ = ["PredictionModel", "PredictionModelLoader", "PredictionService", "PredictionServiceStats"]
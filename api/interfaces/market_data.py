@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+from typing import Optional
+
 from pydantic.dataclasses import dataclass
 
 
@@ -9,3 +11,4 @@ class MarketData:
     low_price: str
     close_price: str
     timestamp: int
+    open_price: Optional[str] = None
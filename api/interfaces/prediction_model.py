@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Generic, TypeVar
 
 from pandas import DataFrame
 
 from api.interfaces.market_data import MarketData
+from src.persistence.table_store import TableStore
+from src.persistence.write_behind_persister import WriteBehindPersister
 
 T = TypeVar('T')
 
@@ -32,6 +37,32 @@ class PredictionModel(ABC, Generic[T]):
     def fine_tune(self, update_data: DataFrame):
         raise NotImplementedError("PredictionModel method:`train_and_save` has not yet been implemented!")
 
+    def refresh(self, n_new_trees: int | None = None, max_estimators: int | None = None) -> int:
+        raise NotImplementedError("PredictionModel method:`refresh` has not yet been implemented!")
+
+    def to_shared(self) -> PredictionModel:
+        raise NotImplementedError("PredictionModel method:`to_shared` has not yet been implemented!")
+
+    def adopt_window(self, window: DataFrame) -> None:
+        raise NotImplementedError("PredictionModel method:`adopt_window` has not yet been implemented!")
+
+    def flush_cache(self) -> None:
+        """Write any pending update of the model's window cache now."""
+
+    def retire(self, successor: Callable[[], PredictionModel], hand_over_window: bool = False) -> None:
+        """
+        Stop updating this model once it is replaced in, or evicted from, a registry.
+
+        Afterwards `predict` and `fine_tune` are forwarded to ``successor()``. With
+        `hand_over_window`, the successor adopts this model's window first.
+        """
+        raise NotImplementedError("PredictionModel method:`retire` has not yet been implemented!")
+
+    def compile(self) -> None:
+        """Optionally prepare a faster inference path; models without one keep the default."""
+
     @abstractmethod
-    def set_cache_dir(self, cache_dir: str):
+    def set_cache_dir(
+            self, cache_dir: str, persister: WriteBehindPersister | None = None, store: TableStore | None = None
+    ):
         raise NotImplementedError("PredictionModel method:`set_cache_dir` has not yet been implemented!")
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import functools
 import logging
 import os.path
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from pathlib import Path
 
@@ -10,49 +14,261 @@ import joblib
 from api.interfaces.prediction_model import PredictionModel
 from constants import PROJECT_ROOT
 from src.entities.asset_entity import AssetEntity
+from src.helpers.joblib_helper import JoblibHelper
+from src.metrics.metrics_registry import metrics
+from src.persistence.table_store import TableStore
+from src.persistence.write_behind_persister import WriteBehindPersister
 
 logger = logging.getLogger(__name__)
 
+# Registry key, evicted model, its asset, and the event set once it has retired.
+Evicted = tuple[tuple[str, str], PredictionModel, AssetEntity, threading.Event]
+
 
 class PredictionModelLoader:
-    def __init__(self, prediction_dir: str, cache_dir: str):
+    """
+    Registry of loaded prediction models.
+
+    Models are kept in least-recently-used order. When `max_models` or
+    `max_memory_bytes` (measured by model file size) is set, the least recently used
+    models are evicted once the budget is exceeded and reloaded on their next
+    `get_model`. An evicted model flushes its pending window first and forwards any
+    later call to the reloaded model, so a caller still holding it never grows a
+    second window for the asset; the flush runs outside the registry lock and a
+    reload of that asset waits for it. A model replaced by `load_model` or
+    `swap_model` hands its window to the new one the same way. With `lazy` set,
+    callers are expected to rely on `get_model` and `prefetch` instead of loading
+    every asset up front. The registry is safe to use from many threads.
+
+    With `shared_models` set, models are served from a ``.shared.joblib`` export
+    (see `PredictionModel.to_shared`) opened with ``mmap_mode="r"``, so worker
+    processes share one read-only copy of the model arrays through the page cache.
+    The export is (re)written from the regular model file whenever it is missing or
+    older.
+    """
+
+    def __init__(
+            self, prediction_dir: str, cache_dir: str, *,
+            persister: WriteBehindPersister | None = None, store: TableStore | None = None,
+            compile_models: bool = False, lazy: bool = False,
+            max_models: int | None = None, max_memory_bytes: int | None = None,
+            shared_models: bool = False
+    ):
         super().__init__()
         self.__directory = Path(prediction_dir)
         self.__cache_dir = Path(cache_dir).expanduser().resolve()
         self.__cache_dir.mkdir(parents=True, exist_ok=True)
-        self.models = {}
+        self.__persister = persister if persister is not None else WriteBehindPersister()
+        self.__store = store
+        self.__compile_models = compile_models
+        self.__shared_models = shared_models
+        self.__lock = threading.Lock()
+        self.__model_sizes: dict[tuple[str, str], int] = {}
+        self.__assets: dict[tuple[str, str], AssetEntity] = {}
+        self.__loading: dict[tuple[str, str], Future] = {}
+        self.__retiring: dict[tuple[str, str], threading.Event] = {}
+        self.lazy = lazy
+        self.max_models = max_models
+        self.max_memory_bytes = max_memory_bytes
+        self.models: OrderedDict[tuple[str, str], PredictionModel] = OrderedDict()
 
-    def __get_filename(self, ticker_symbol: str, model_class_name: str) -> Path:
+    @property
+    def model_dir(self) -> Path:
+        return PROJECT_ROOT.joinpath(self.__directory)
+
+    def model_path(self, asset: AssetEntity, model_class_name: str) -> Path:
+        return self.__get_filename(asset.ticker_symbol.lower(), model_class_name.lower())
+
+    def shared_model_path(self, asset: AssetEntity, model_class_name: str) -> Path:
+        return self.__get_filename(asset.ticker_symbol.lower(), model_class_name.lower(), shared=True)
+
+    def __get_filename(self, ticker_symbol: str, model_class_name: str, shared: bool = False) -> Path:
+        suffix = ".shared.joblib" if shared else ".joblib"
         filename = PROJECT_ROOT.joinpath(
-            Path(f"{self.__directory}/{ticker_symbol}-{model_class_name}.joblib")
+            Path(f"{self.__directory}/{ticker_symbol}-{model_class_name}{suffix}")
         )
         return filename
 
-    def load_model(self, asset: AssetEntity, model_class_name: str) -> None:
+    def export_shared(self, asset: AssetEntity, model_class_name: str) -> Path:
+        """Write the memory-mappable export of the asset's model file and return its path."""
+        ticker_symbol, model_class_name = asset.ticker_symbol.lower(), model_class_name.lower()
+        source = self.__get_filename(ticker_symbol, model_class_name)
+        filename = self.__get_filename(ticker_symbol, model_class_name, shared=True)
+        logger.info("Exporting shared ClassifierModel: filepath=%s.", filename)
+        JoblibHelper.dump(joblib.load(str(source)).to_shared(), filename)
+        return filename
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(self.__model_sizes.values())
+
+    def __is_over_budget(self) -> bool:
+        if self.max_models is not None and len(self.models) > self.max_models:
+            return True
+        return self.max_memory_bytes is not None and self.memory_bytes > self.max_memory_bytes
+
+    def __register(
+            self, asset: AssetEntity, key: tuple[str, str], model: PredictionModel, size: int
+    ) -> list[Evicted]:
+        """Register `model` and return the entries evicted to make room, still to be retired."""
+        evicted = []
+        with self.__lock:
+            self.models[key] = model
+            self.models.move_to_end(key)
+            self.__model_sizes[key] = size
+            self.__assets[key] = asset
+            while len(self.models) > 1 and self.__is_over_budget():
+                evicted_key, evicted_model = self.models.popitem(last=False)
+                self.__model_sizes.pop(evicted_key, None)
+                # Reloads of the asset wait on this until the evicted model has flushed.
+                retired = self.__retiring[evicted_key] = threading.Event()
+                evicted.append((evicted_key, evicted_model, self.__assets.pop(evicted_key), retired))
+        return evicted
+
+    def __retire_evicted(self, evicted: list[Evicted]) -> None:
+        for key, model, asset, retired in evicted:
+            try:
+                model.retire(functools.partial(self.get_model, asset, key[1]))
+            finally:
+                with self.__lock:
+                    if self.__retiring.get(key) is retired:
+                        del self.__retiring[key]
+                retired.set()
+            metrics.increment("model_evictions_total", asset=key[0], model=key[1])
+            logger.info("Evicted ClassifierModel from registry: ticker=%s, model=%s.", *key)
+
+    def __replace(
+            self, asset: AssetEntity, key: tuple[str, str], model: PredictionModel, size: int, *,
+            previous: PredictionModel | None
+    ) -> None:
+        """Register `model` in place of `previous`, which hands its window over and forwards to it."""
+        if previous is not None:
+            previous.retire(lambda: model, hand_over_window=True)
+        self.__retire_evicted(self.__register(asset, key, model, size))
+
+    def __get_previous(self, key: tuple[str, str]) -> PredictionModel | None:
+        """Return the live model under `key` with its pending window flushed, once any eviction of it has."""
+        with self.__lock:
+            previous = self.models.get(key)
+            retiring = self.__retiring.get(key)
+        if retiring is not None:
+            retiring.wait()
+        if previous is not None:
+            previous.flush_cache()
+        return previous
+
+    def __prepare(self, model: PredictionModel) -> None:
+        model.set_cache_dir(str(self.__cache_dir), self.__persister, self.__store)
+        if self.__compile_models:
+            model.compile()
+
+    def __get_shared_filename(self, asset: AssetEntity, model_class_name: str, source: Path) -> Path:
+        filename = self.shared_model_path(asset, model_class_name)
+        if not filename.is_file() or filename.stat().st_mtime < source.stat().st_mtime:
+            self.export_shared(asset, model_class_name)
+        return filename
+
+    def load_model(self, asset: AssetEntity, model_class_name: str) -> PredictionModel:
         model_class_name = model_class_name.lower()
         ticker_symbol = asset.ticker_symbol.lower()
         filename = self.__get_filename(ticker_symbol, model_class_name)
         logger.info("Fetching ClassifierModel from file: filepath=%s.", filename)
         if os.path.isfile(filename):
             try:
+                previous = self.__get_previous((ticker_symbol, model_class_name))
                 logger.info("Loading ClassifierModel from path.")
-                if ticker_symbol not in self.models:
-                    self.models[ticker_symbol] = {}
-                loaded_model = joblib.load(str(filename))
-                loaded_model.set_cache_dir(str(self.__cache_dir))
-                self.models[ticker_symbol][model_class_name] = loaded_model
-                return
+                with metrics.timer("model_load_seconds", asset=ticker_symbol, model=model_class_name):
+                    if self.__shared_models:
+                        filename = self.__get_shared_filename(asset, model_class_name, filename)
+                        loaded_model = joblib.load(str(filename), mmap_mode="r")
+                    else:
+                        loaded_model = joblib.load(str(filename))
+                    self.__prepare(loaded_model)
+                self.__replace(
+                    asset, (ticker_symbol, model_class_name), loaded_model, os.path.getsize(filename), previous=previous
+                )
+                metrics.increment("model_loads_total", asset=ticker_symbol, model=model_class_name)
+                return loaded_model
             except Exception as exc:
+                metrics.increment("model_load_failures_total", asset=ticker_symbol, model=model_class_name)
                 logger.exception("Failed loading ClassifierModel.")
                 raise RuntimeError(["Unable to load model for the requested asset.", asset.name, exc]) from exc
         logger.warning("Model not loaded and may lead to predict failure! Check path: filepath=%s.", filename)
         raise FileNotFoundError(filename)
 
-    def get_model(self, asset: AssetEntity, model_class_name: str) -> PredictionModel:
+    def swap_model(
+            self, asset: AssetEntity, model_class_name: str, model: PredictionModel, source: Path
+    ) -> PredictionModel:
+        """
+        Promote an already loaded `model` from `source` to the live registry.
+
+        With `shared_models` the memory-mapped export of `model` is registered, as
+        `load_model` would, and returned instead of `model` itself.
+
+        The model is prepared before anything changes, then `source` replaces the
+        asset's model file and the registry entry is swapped under the lock, so
+        concurrent `get_model` callers see either the old model or the new one. The
+        live model's pending window is flushed before the new one reads the cache, and
+        the live model then hands its window over and forwards later ticks, so no tick
+        received while the new model was staged is lost.
+        """
         model_class_name = model_class_name.lower()
         ticker_symbol = asset.ticker_symbol.lower()
-        if ticker_symbol not in self.models:
-            self.models[ticker_symbol] = {}
-        if model_class_name not in self.models[ticker_symbol]:
-            self.load_model(asset, model_class_name)
-        return self.models[ticker_symbol][model_class_name]
+        key = (ticker_symbol, model_class_name)
+        previous = self.__get_previous(key)
+        filename = self.__get_filename(ticker_symbol, model_class_name)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        registered_filename = filename
+        if self.__shared_models:
+            registered_filename = self.shared_model_path(asset, model_class_name)
+            JoblibHelper.dump(model.to_shared(), registered_filename)
+            model = joblib.load(str(registered_filename), mmap_mode="r")
+        self.__prepare(model)
+        os.replace(source, filename)
+        self.__replace(asset, key, model, os.path.getsize(registered_filename), previous=previous)
+        logger.info("Swapped ClassifierModel in registry: ticker=%s, model=%s.", ticker_symbol, model_class_name)
+        return model
+
+    def get_model(self, asset: AssetEntity, model_class_name: str) -> PredictionModel:
+        """
+        Return the registered model, loading it on a miss.
+
+        Loads are single-flight: concurrent misses for the same model wait for the one
+        load in progress instead of reading the file again.
+        """
+        key = (asset.ticker_symbol.lower(), model_class_name.lower())
+        with self.__lock:
+            model = self.models.get(key)
+            if model is not None:
+                self.models.move_to_end(key)
+                return model
+            loading = self.__loading.get(key)
+            if loading is None:
+                loading = self.__loading[key] = Future()
+                is_loader = True
+            else:
+                is_loader = False
+
+        if not is_loader:
+            return loading.result()
+        try:
+            model = self.load_model(asset, model_class_name)
+            loading.set_result(model)
+            return model
+        except BaseException as exc:
+            loading.set_exception(exc)
+            raise
+        finally:
+            with self.__lock:
+                self.__loading.pop(key, None)
+
+    def prefetch(self, assets: list[AssetEntity], model_class_name: str, max_workers: int = 4) -> None:
+        """Load `assets` concurrently; failures are logged and left for `get_model` to retry."""
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-prefetch") as executor:
+            futures = {executor.submit(self.get_model, asset, model_class_name): asset for asset in assets}
+        for future, asset in futures.items():
+            if future.exception() is not None:
+                logger.error("Failed prefetching ClassifierModel: name=%s, error=%s.", asset.name, future.exception())
+
+    def close(self) -> None:
+        self.__persister.close()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from pydantic.dataclasses import dataclass
+
+from api.interfaces.market_data import MarketData
+
+if TYPE_CHECKING:
+    from src.prediction_engine import PredictionEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PredictionServiceStats:
+    queue_depth: int
+    requests: int
+    batches: int
+    last_batch_size: int
+    max_batch_size: int
+    mean_batch_size: float
+
+
+class PredictionService:
+    """
+    Asyncio front end for `PredictionEngine` that micro-batches requests.
+
+    `predict` enqueues a request and awaits its result. A dispatcher task takes the
+    first queued request, keeps collecting until `max_batch_size` requests are
+    gathered or `max_latency` seconds have passed, and then schedules one
+    `predict_batch` call per asset without waiting for it, so a slow asset never
+    holds up the next batch. Each asset's calls are chained so its requests keep
+    their arrival order, and at most `max_concurrency` calls run at once in
+    `executor` (a thread pool by default).
+
+    `stop` stops accepting requests, lets the batches already scheduled finish, and
+    fails every request that was not served.
+    """
+
+    def __init__(
+            self, engine: PredictionEngine, *, max_batch_size: int = 64, max_latency: float = 0.005,
+            executor: Executor | None = None, max_workers: int | None = None, max_concurrency: int = 32
+    ):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.__owns_executor = executor is None
+        self.__executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prediction-service"
+        )
+        self.max_concurrency = max_concurrency
+        self.__queue: asyncio.Queue | None = None
+        self.__dispatcher: asyncio.Task | None = None
+        self.__semaphore: asyncio.Semaphore | None = None
+        # Unresolved results of accepted requests, and the latest scheduled call per asset.
+        self.__pending: set[asyncio.Future] = set()
+        self.__chains: dict[str, asyncio.Task] = {}
+        self.__requests = 0
+        self.__batches = 0
+        self.__last_batch_size = 0
+        self.__max_batch_size = 0
+
+    @property
+    def stats(self) -> PredictionServiceStats:
+        return PredictionServiceStats(
+            queue_depth=self.__queue.qsize() if self.__queue is not None else 0,
+            requests=self.__requests,
+            batches=self.__batches,
+            last_batch_size=self.__last_batch_size,
+            max_batch_size=self.__max_batch_size,
+            mean_batch_size=self.__requests / self.__batches if self.__batches else 0.0
+        )
+
+    async def start(self) -> None:
+        if self.__dispatcher is None:
+            self.__queue = asyncio.Queue()
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.__dispatcher = asyncio.create_task(self.__dispatch(), name="prediction-service-dispatcher")
+
+    async def stop(self) -> None:
+        dispatcher, self.__dispatcher = self.__dispatcher, None
+        if dispatcher is not None:
+            dispatcher.cancel()
+            try:
+                await dispatcher
+            except asyncio.CancelledError:
+                pass
+        if self.__chains:
+            await asyncio.gather(*self.__chains.values(), return_exceptions=True)
+        # Queued requests, and any a cancelled collection had already taken, are never served.
+        for result in list(self.__pending):
+            if not result.done():
+                result.set_exception(RuntimeError("PredictionService stopped before the request was served."))
+        self.__pending.clear()
+        if self.__queue is not None:
+            while not self.__queue.empty():
+                self.__queue.get_nowait()
+        if self.__owns_executor:
+            shutdown = functools.partial(self.__executor.shutdown, wait=True)
+            await asyncio.get_running_loop().run_in_executor(None, shutdown)
+
+    async def __aenter__(self) -> PredictionService:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def predict(self, ticker_symbol: str, current_data: MarketData) -> int:
+        if self.__dispatcher is None:
+            raise RuntimeError("PredictionService is not running. Call `start` first.")
+        result = asyncio.get_running_loop().create_future()
+        self.__pending.add(result)
+        result.add_done_callback(self.__pending.discard)
+        await self.__queue.put((ticker_symbol, current_data, result))
+        return await result
+
+    async def __collect(self) -> list[tuple[str, MarketData, asyncio.Future]]:
+        batch = [await self.__queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def __dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.__collect()
+            self.__requests += len(batch)
+            self.__batches += 1
+            self.__last_batch_size = len(batch)
+            self.__max_batch_size = max(self.__max_batch_size, len(batch))
+
+            grouped: dict[str, list[tuple[str, MarketData, asyncio.Future]]] = {}
+            for request in batch:
+                grouped.setdefault(request[0].lower(), []).append(request)
+            for key, requests in grouped.items():
+                task = asyncio.create_task(self.__score(loop, self.__chains.get(key), requests))
+                self.__chains[key] = task
+                task.add_done_callback(functools.partial(self.__release_chain, key))
+
+    def __release_chain(self, key: str, task: asyncio.Task) -> None:
+        if self.__chains.get(key) is task:
+            del self.__chains[key]
+
+    async def __score(
+            self, loop: asyncio.AbstractEventLoop, previous: asyncio.Task | None, requests: list
+    ) -> None:
+        pairs = [(ticker_symbol, current_data) for ticker_symbol, current_data, _ in requests]
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            async with self.__semaphore:
+                predictions = await loop.run_in_executor(self.__executor, self.engine.predict_batch, pairs)
+        except BaseException as exc:
+            if isinstance(exc, Exception):
+                logger.warning(
+                    "Prediction batch failed: ticker=%s, size=%d, error=%s.", pairs[0][0], len(pairs), exc
+                )
+            failure = exc if isinstance(exc, Exception) else RuntimeError("Prediction batch was cancelled.")
+            for _, _, result in requests:
+                if not result.done():
+                    result.set_exception(failure)
+            if not isinstance(exc, Exception):
+                raise
+            return
+        for (_, _, result), prediction in zip(requests, predictions):
+            if not result.done():
+                result.set_result(prediction)
@@ -0,0 +1,72 @@
+"""
+Compare hyperparameter search strategies on synthetic history.
+
+    python -m benchmarks.search_strategy_benchmark --rows 2000 --iterations 30
+
+Each strategy trains through `RandomForestClassifierHelper.train_model`, so the
+wall time covers the whole search plus refit; recall is measured on the same
+chronological 30% holdout the helper reports on.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from sklearn.metrics import recall_score
+from sklearn.model_selection import train_test_split
+
+from benchmarks.synthetic_data import generate_ohlcv
+from src.helpers.random_forest_classifier_helper import RandomForestClassifierHelper
+from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
+
+
+def run(
+        rows: int, iterations: int, splits: int, strategies: list[str],
+        n_jobs: int | None = None, seed: int = 0
+) -> list[dict]:
+    processed_data, predictors, target = CoinMarketCapPreProcessor().pre_process_data(generate_ohlcv(rows, seed))
+    data = processed_data[predictors]
+    _, x_test, _, y_test = train_test_split(data, target, test_size=0.3, shuffle=False)
+
+    results = []
+    for strategy in strategies:
+        helper = RandomForestClassifierHelper(n_jobs=n_jobs, search_strategy=strategy)
+        helper.no_of_iterations = iterations
+        helper.n_splits = splits
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = helper.train_model(data, target)
+        wall_time = time.perf_counter() - started
+
+        results.append({
+            "strategy": strategy,
+            "wall_time": round(wall_time, 3),
+            "recall": float(recall_score(y_test, model.predict(x_test))),
+            "best_params": {
+                name: int(model.get_params()[name]) for name in ("n_estimators", "min_samples_split", "max_depth")
+            },
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=150)
+    parser.add_argument("--splits", type=int, default=10)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--strategies", nargs="+", default=list(RandomForestClassifierHelper.SEARCH_STRATEGIES),
+        choices=RandomForestClassifierHelper.SEARCH_STRATEGIES
+    )
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.iterations, args.splits, args.strategies, args.n_jobs, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
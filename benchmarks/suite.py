@@ -0,0 +1,299 @@
+"""
+Benchmark the prediction and training hot paths on synthetic data.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --output new.json --compare results.json
+
+Every run writes one JSON document with the environment, the configuration and the
+measurements. With ``--compare`` the new results are checked against a previous
+run and the process exits non-zero when a metric regressed by more than
+``--tolerance``: ``*_ms``, ``*_seconds`` and ``*_bytes`` metrics must not grow and
+``*_per_second`` metrics must not shrink.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+from api import PredictionModelLoader
+from api.interfaces.market_data import MarketData
+from benchmarks.synthetic_data import DAY_SECONDS, generate_ohlcv, generate_universe, write_legacy_history
+from src.entities.asset_entity import AssetEntity
+from src.helpers.cpu_helper import CpuHelper
+from src.prediction_engine import PredictionEngine
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
+from src.training.random_forest.random_forest_classifier_model import RandomForestClassifierModel
+
+MODEL_CLASS_NAME = RandomForestClassifierModel.__name__.lower()
+
+DEFAULT_CONFIG = {
+    "assets": 8,
+    "rows": 2000,
+    "n_estimators": 300,
+    "max_depth": 14,
+    "predict_iterations": 300,
+    "batch_sizes": [1, 8, 32, 128],
+    "history_lengths": [500, 1000, 2000, 5000],
+    "compile_models": True,
+    "seed": 0,
+}
+QUICK_CONFIG = {
+    **DEFAULT_CONFIG,
+    "assets": 2,
+    "rows": 600,
+    "n_estimators": 20,
+    "max_depth": 6,
+    "predict_iterations": 30,
+    "batch_sizes": [1, 8],
+    "history_lengths": [300, 600],
+}
+
+
+def _asset(ticker_symbol: str) -> AssetEntity:
+    return AssetEntity(
+        id=0, name=ticker_symbol, ticker_symbol=ticker_symbol, exchange="SYNTHETIC",
+        market_cap="0", decimal_places=8, keywords=[]
+    )
+
+
+def _percentiles(samples: list[float]) -> dict:
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def _ticks(history: pd.DataFrame, count: int, offset: int = 0) -> list[MarketData]:
+    last = history.iloc[-1]
+    rng = np.random.default_rng(offset)
+    closes = float(last["close"]) * np.exp(np.cumsum(rng.normal(0.0, 0.02, count)))
+    return [
+        MarketData(
+            volume=str(float(last["volume"])), high_price=str(close * 1.01), low_price=str(close * 0.99),
+            close_price=str(close), timestamp=int(last["timestamp"]) + DAY_SECONDS * (offset + index + 1)
+        )
+        for index, close in enumerate(closes)
+    ]
+
+
+def _train_model(history: pd.DataFrame, ticker_symbol: str, config: dict) -> RandomForestClassifierModel:
+    preprocessor = CoinMarketCapPreProcessor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        processed_data, predictors, target = preprocessor.pre_process_data(history.copy())
+    features = processed_data[predictors]
+    forest = RandomForestClassifier(
+        n_estimators=config["n_estimators"], max_depth=config["max_depth"], min_samples_split=75,
+        class_weight="balanced", random_state=config["seed"]
+    ).fit(features, target)
+    return RandomForestClassifierModel(forest, predictors, features, _asset(ticker_symbol), preprocessor)
+
+
+def bench_preprocess(config: dict) -> list[dict]:
+    preprocessor = CoinMarketCapPreProcessor()
+    results = []
+    for rows in config["history_lengths"]:
+        history = generate_ohlcv(rows, seed=config["seed"])
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            preprocessor.pre_process_data(history.copy())
+        results.append({"rows": rows, "preprocess_ms": (time.perf_counter() - started) * 1000})
+    return results
+
+
+def bench_provider(config: dict, workdir: Path) -> list[dict]:
+    results = []
+    for rows in config["history_lengths"]:
+        directory = workdir / f"provider-{rows}"
+        history = generate_ohlcv(rows, seed=config["seed"])
+        csv_file = write_legacy_history(directory, "SYN", history)
+        provider = LocalStorageDataProvider(directory=str(directory))
+
+        started = time.perf_counter()
+        provider.get_ticker_data("SYN")
+        first_read = time.perf_counter() - started
+        started = time.perf_counter()
+        provider.get_ticker_data("SYN")
+        read = time.perf_counter() - started
+        update = generate_ohlcv(rows + 1, seed=config["seed"]).tail(1)
+        started = time.perf_counter()
+        provider.update_ticker_data("SYN", update)
+        update_time = time.perf_counter() - started
+
+        results.append({
+            "rows": rows,
+            "csv_bytes": csv_file.stat().st_size,
+            "first_read_ms": first_read * 1000,
+            "read_ms": read * 1000,
+            "update_ms": update_time * 1000,
+        })
+    return results
+
+
+def bench_serving(config: dict, workdir: Path) -> dict:
+    universe = generate_universe(config["assets"], config["rows"], seed=config["seed"])
+    model_dir = workdir / "models"
+    model_dir.mkdir()
+    data_dir = workdir / "serving"
+    for ticker_symbol, history in universe.items():
+        write_legacy_history(data_dir, ticker_symbol, history)
+        joblib.dump(_train_model(history, ticker_symbol, config),
+                    model_dir / f"{ticker_symbol.lower()}-{MODEL_CLASS_NAME}.joblib")
+
+    assets = [_asset(ticker_symbol) for ticker_symbol in universe]
+    loader = PredictionModelLoader(
+        str(model_dir), str(workdir / "cache"), compile_models=config["compile_models"], lazy=True
+    )
+    load_times = []
+    for asset in assets:
+        started = time.perf_counter()
+        loader.get_model(asset, MODEL_CLASS_NAME)
+        load_times.append(time.perf_counter() - started)
+    engine = PredictionEngine(assets, LocalStorageDataProvider(directory=str(data_dir)), str(model_dir), loader)
+
+    ticker_symbols = list(universe)
+    ticks = {
+        ticker_symbol: _ticks(history, config["predict_iterations"])
+        for ticker_symbol, history in universe.items()
+    }
+    latencies = []
+    for index in range(config["predict_iterations"]):
+        ticker_symbol = ticker_symbols[index % len(ticker_symbols)]
+        started = time.perf_counter()
+        engine.predict(ticker_symbol, ticks[ticker_symbol][index])
+        latencies.append(time.perf_counter() - started)
+
+    throughput = []
+    for batch_size in config["batch_sizes"]:
+        requests = [
+            (ticker_symbols[index % len(ticker_symbols)], tick)
+            for index, tick in enumerate(_ticks(universe[ticker_symbols[0]], batch_size, offset=10_000))
+        ]
+        rounds = max(1, config["predict_iterations"] // batch_size)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            engine.predict_batch(requests)
+        elapsed = time.perf_counter() - started
+        throughput.append({"batch_size": batch_size, "predictions_per_second": rounds * batch_size / elapsed})
+    loader.close()
+
+    return {
+        "model_file_bytes": int(np.mean([path.stat().st_size for path in model_dir.glob("*.joblib")])),
+        "model_load": {"mean_ms": float(np.mean(load_times) * 1000), **_percentiles(load_times)},
+        "predict_latency": _percentiles(latencies),
+        "batch_throughput": throughput,
+    }
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def run(config: dict) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="benchmarks-"))
+    try:
+        results = {
+            "preprocess": bench_preprocess(config),
+            "provider": bench_provider(config, workdir),
+            "serving": bench_serving(config, workdir),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    results["peak_rss_bytes"] = peak_rss_bytes()
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": CpuHelper.available_cpus(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+        },
+        "config": config,
+        "results": results,
+    }
+
+
+def _flatten(value, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(value, list):
+        flat = {}
+        for item in value:
+            label = next((f"{key}={item[key]}" for key in ("rows", "batch_size") if key in item), None)
+            if label is not None:
+                flat.update(_flatten({k: v for k, v in item.items() if k not in ("rows", "batch_size")},
+                                     f"{prefix}[{label}]"))
+        return flat
+    return {prefix: value} if isinstance(value, (int, float)) else {}
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.1) -> list[str]:
+    """Describe every metric in `current` that is worse than `baseline` by more than `tolerance`."""
+    previous, latest = _flatten(baseline["results"]), _flatten(current["results"])
+    regressions = []
+    for name, value in latest.items():
+        old = previous.get(name)
+        if not old:
+            continue
+        if name.endswith(("_ms", "_seconds", "_bytes")) and value > old * (1 + tolerance):
+            regressions.append(f"{name}: {old:.4g} -> {value:.4g} (+{value / old - 1:.0%})")
+        elif name.endswith("_per_second") and value < old * (1 - tolerance):
+            regressions.append(f"{name}: {old:.4g} -> {value:.4g} ({value / old - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON results to this file.")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a smoke run.")
+    parser.add_argument("--config", type=json.loads, default={}, help="JSON overrides for the configuration.")
+    parser.add_argument("--compare", type=Path, default=None, help="Previous results to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    config = {**(QUICK_CONFIG if args.quick else DEFAULT_CONFIG), **args.config}
+    results = run(config)
+    document = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(document, encoding="utf-8")
+    else:
+        print(document)
+
+    if args.compare is not None:
+        regressions = compare(json.loads(args.compare.read_text(encoding="utf-8")), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
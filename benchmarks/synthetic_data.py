@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame
+
+DAY_SECONDS = 86400
+
+
+def generate_ohlcv(
+        rows: int, seed: int = 0, start_timestamp: int = 1_500_000_000,
+        start_price: float = 30000.0, volatility: float = 0.03, name: str | int = "2781"
+) -> DataFrame:
+    """Daily OHLCV bars following a geometric random walk, oldest first."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, rows)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0.0, volatility / 2, rows)) * close
+    volume = rng.lognormal(mean=23.0, sigma=0.4, size=rows)
+    return DataFrame({
+        "name": name,
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": volume,
+        "marketCap": close * 19_000_000,
+        "timestamp": start_timestamp + np.arange(rows, dtype=np.int64) * DAY_SECONDS,
+    })
+
+
+def generate_universe(
+        assets: int, rows: int, seed: int = 0, start_timestamp: int = 1_500_000_000
+) -> dict[str, DataFrame]:
+    """Independent histories for `assets` synthetic tickers (``SYN0``, ``SYN1``, ...)."""
+    return {
+        f"SYN{index}": generate_ohlcv(
+            rows, seed=seed + index, start_timestamp=start_timestamp,
+            start_price=float(10 ** (1 + index % 4)), name=index
+        )
+        for index in range(assets)
+    }
+
+
+def write_legacy_history(directory: str | Path, ticker_symbol: str, history: DataFrame) -> Path:
+    """Write `history` where `LocalStorageDataProvider(directory)` looks for a legacy CSV."""
+    path = Path(directory).joinpath("coinmarketcap/history", f"{ticker_symbol.lower()}-usd.csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    history.to_csv(path, sep=";", index=False)
+    return path
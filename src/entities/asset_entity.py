@@ -11,3 +11,4 @@ class AssetEntity:
     id: float
     exchange: str
     market_cap: str
+    search_strategy: str = "random"
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+from typing import Optional
+
+from pydantic.dataclasses import dataclass
+
+
+@dataclass
+class PhaseTiming:
+    name: str
+    wall_time: float
+    cpu_time: float
+
+
+@dataclass
+class SearchCandidateTiming:
+    params: dict
+    fit_time: float
+    score_time: float
+    mean_test_score: float
+    n_resources: Optional[int] = None
+
+
+@dataclass
+class TrainingProfile:
+    ticker_symbol: str
+    phases: list[PhaseTiming]
+    candidates: list[SearchCandidateTiming]
+    peak_memory: Optional[int] = None
+    cprofile_path: Optional[str] = None
+    collapsed_stacks_path: Optional[str] = None
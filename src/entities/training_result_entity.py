@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+from typing import Optional
+
+from pydantic.dataclasses import dataclass
+
+from src.entities.training_profile_entity import TrainingProfile
+
+
+@dataclass
+class TrainingResult:
+    ticker_symbol: str
+    succeeded: bool
+    wall_time: float
+    n_jobs: int
+    error: Optional[str] = None
+    profile: Optional[TrainingProfile] = None
@@ -5,15 +5,21 @@ from api.interfaces.market_data import MarketData
 
 
 class DataframeFactory:
+    @staticmethod
+    def record_from_market_data_entity(asset: AssetEntity, market_data: MarketData) -> dict:
+        return {
+            'name': asset.id,
+            # Daily feeds historically carried no open; the low stands in for it.
+            'open': float(market_data.open_price if market_data.open_price is not None else market_data.low_price),
+            'high': float(market_data.high_price),
+            'low': float(market_data.low_price),
+            'close': float(market_data.close_price),
+            'volume': float(market_data.volume),
+            'marketCap': asset.market_cap,
+            'timestamp': market_data.timestamp
+        }
+
     @staticmethod
     def from_market_data_entity(asset: AssetEntity, market_data: MarketData) -> pd.DataFrame:
-        return pd.DataFrame({
-            'name': [asset.id],
-            'open': [float(market_data.low_price)],
-            'high': [float(market_data.high_price)],
-            'low': [float(market_data.low_price)],
-            'close': [float(market_data.close_price)],
-            'volume': [float(market_data.volume)],
-            'marketCap': [asset.market_cap],
-            'timestamp': [market_data.timestamp]
-        })
+        record = DataframeFactory.record_from_market_data_entity(asset, market_data)
+        return pd.DataFrame({column: [value] for column, value in record.items()})
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+from pandas import DataFrame
+
+
+class BacktestHelper:
+    @staticmethod
+    def sweep(
+            close: np.ndarray, probabilities: np.ndarray,
+            thresholds: list[float] | np.ndarray = (0.5,), fees: list[float] | np.ndarray = (0.001,),
+            periods_per_year: int = 365
+    ) -> DataFrame:
+        """
+        Long/flat backtest of every (fee, threshold) scenario in one vectorised pass.
+
+        The strategy holds the asset from bar ``t`` to ``t + 1`` whenever the up
+        probability at ``t`` is at least the threshold, and pays `fee` per position
+        change. Positions, costs and equity curves are (scenarios x time) arrays, so
+        the whole grid costs a handful of numpy operations. Returns one row of
+        metrics per scenario, fees major and thresholds minor.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        fees = np.asarray(fees, dtype=np.float64)
+        periods = len(close)
+
+        # Next-bar log return earned by a position opened at each bar; the last bar has none.
+        forward_log_return = np.zeros(periods)
+        forward_log_return[:-1] = np.log(close[1:] / close[:-1])
+        forward_log_return = np.nan_to_num(forward_log_return)
+
+        positions = np.tile((probabilities[np.newaxis, :] >= thresholds[:, np.newaxis]).astype(np.float64),
+                            (len(fees), 1))
+        scenario_fees = np.repeat(fees, len(thresholds))
+        changes = np.abs(np.diff(positions, axis=1, prepend=positions[:, :1]))
+
+        net_return = np.exp(positions * forward_log_return) - 1 - changes * scenario_fees[:, np.newaxis]
+        net_log = np.log1p(np.clip(net_return, -0.99, None))
+        equity = np.exp(np.cumsum(net_log, axis=1))
+
+        drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+        deviation = net_log.std(axis=1)
+        sharpe_ratio = np.divide(
+            net_log.mean(axis=1), deviation, out=np.full(len(deviation), np.nan), where=deviation > 0
+        ) * np.sqrt(periods_per_year)
+
+        return DataFrame({
+            "fee": scenario_fees,
+            "threshold": np.tile(thresholds, len(fees)),
+            "annual_return": equity[:, -1] ** (periods_per_year / periods) - 1,
+            "max_drawdown": drawdown.min(axis=1),
+            "sharpe_ratio": sharpe_ratio,
+            "trades": (changes > 0).sum(axis=1),
+            "exposure": positions.mean(axis=1),
+        })
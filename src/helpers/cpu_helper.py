@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+
+
+class CpuHelper:
+    CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+    @staticmethod
+    def _read(path: Path) -> str | None:
+        try:
+            return path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+
+    @classmethod
+    def cgroup_cpu_limit(cls) -> float | None:
+        """CPU quota of the current cgroup in cores, or None when unlimited."""
+        # cgroup v2: "<quota> <period>" or "max <period>".
+        cpu_max = cls._read(cls.CGROUP_ROOT / "cpu.max")
+        if cpu_max:
+            quota, _, period = cpu_max.partition(" ")
+            if quota != "max" and period:
+                return int(quota) / int(period)
+            return None
+
+        # cgroup v1: quota of -1 means unlimited.
+        quota = cls._read(cls.CGROUP_ROOT / "cpu" / "cpu.cfs_quota_us")
+        period = cls._read(cls.CGROUP_ROOT / "cpu" / "cpu.cfs_period_us")
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+        return None
+
+    @classmethod
+    def available_cpus(cls) -> int:
+        """Cores this process may actually use: CPU affinity capped by the cgroup quota."""
+        if hasattr(os, "sched_getaffinity"):
+            cpus = len(os.sched_getaffinity(0))
+        else:
+            cpus = os.cpu_count() or 1
+        limit = cls.cgroup_cpu_limit()
+        if limit is not None:
+            cpus = min(cpus, max(1, math.floor(limit)))
+        return max(1, cpus)
@@ -1,9 +1,13 @@
 import pandas as pd
+from pandas.api.types import is_integer_dtype
 
 
 class DataFrameHelper:
     @staticmethod
     def normalize_timestamp(data: pd.DataFrame) -> pd.DataFrame:
+        if is_integer_dtype(data["timestamp"].dtype):
+            data["timestamp"] = data["timestamp"].astype("int64", copy=False)
+            return data
         data["timestamp"] = pd.to_numeric(
             data["timestamp"], errors="coerce"
         ).fillna(
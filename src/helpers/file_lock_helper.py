@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _try_lock(fd: int, shared: bool) -> bool:
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    # msvcrt only has exclusive byte-range locks, so shared locks are exclusive there.
+    os.lseek(fd, 0, os.SEEK_SET)
+    try:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """
+    Advisory lock on a lock file, shared by processes and threads.
+
+    Uses ``flock`` on a descriptor opened per `acquire`, so two threads of one
+    process exclude each other just like two processes do; on Windows, where there
+    is no ``flock``, ``msvcrt.locking`` stands in and `shared` locks are exclusive.
+    A `shared` lock only excludes exclusive ones. With a `timeout`, `acquire` gives
+    up with a `TimeoutError` instead of waiting forever.
+    """
+
+    def __init__(
+            self, path: str | Path, timeout: float | None = None, poll_interval: float = 0.05, shared: bool = False
+    ):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.shared = shared
+        self.__fd: int | None = None
+
+    def acquire(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if self.timeout is None and fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+            else:
+                deadline = None if self.timeout is None else time.monotonic() + self.timeout
+                while not _try_lock(fd, self.shared):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timed out waiting for lock: {self.path}.")
+                    time.sleep(self.poll_interval)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.__fd = fd
+
+    def release(self) -> None:
+        if self.__fd is not None:
+            _unlock(self.__fd)
+            os.close(self.__fd)
+            self.__fd = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
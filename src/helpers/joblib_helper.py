@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import joblib
+
+
+class JoblibHelper:
+    @staticmethod
+    def dump(value: object, filename: Path) -> None:
+        """Write `value` next to `filename` and move it into place, so readers never see a partial file."""
+        temporary = filename.with_name(f".{filename.name}.{os.getpid()}.tmp")
+        try:
+            joblib.dump(value, temporary)
+            os.replace(temporary, filename)
+        finally:
+            temporary.unlink(missing_ok=True)
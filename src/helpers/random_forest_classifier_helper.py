@@ -1,20 +1,67 @@
+from __future__ import annotations
+
 import numpy as np
 from pandas import DataFrame, Series
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, classification_report
-from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit, train_test_split
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 pylint: disable=unused-import
+from sklearn.model_selection import HalvingRandomSearchCV, RandomizedSearchCV, TimeSeriesSplit, train_test_split
 
-from joblib import parallel_backend
+from joblib import parallel_config
 
+from src.helpers.backtest_helper import BacktestHelper
+from src.helpers.cpu_helper import CpuHelper
+from src.training.training_profiler import TrainingProfiler
 
-class RandomForestClassifierHelper:
 
-    def __init__(self):
+class RandomForestClassifierHelper:
+    """
+    Hyperparameter search for the random forest classifier.
+
+    `backend` is any joblib backend; "loky" runs the search in worker processes and
+    sidesteps the GIL-bound parts of tree building and scoring. With a process
+    backend, training arrays larger than `max_nbytes` are memory-mapped into the
+    workers with `mmap_mode` instead of being pickled once per task. `n_jobs`
+    defaults to the CPUs available to this process, honouring cgroup limits.
+
+    `search_strategy` "random" fits every sampled candidate with its full forest.
+    "halving" runs successive halving with `n_estimators` as the budget: all
+    candidates start with `halving_min_estimators` trees and only the best
+    1/`halving_factor` of each round go on with `halving_factor` times more trees.
+
+    With an enabled `profiler`, the search, refit, evaluation and backtest are timed
+    as separate phases and every search candidate's timings are recorded.
+    """
+    BACKENDS = ("threading", "loky", "multiprocessing", "sequential")
+    SEARCH_STRATEGIES = ("random", "halving")
+    SEARCH_PARAMETERS = ("n_estimators", "min_samples_split", "max_depth")
+
+    def __init__(
+            self, n_jobs: int | None = None, backend: str = "threading",
+            max_nbytes: int | str | None = "1M", mmap_mode: str | None = "r",
+            search_strategy: str = "random", profiler: TrainingProfiler | None = None
+    ):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown search backend: {backend}. Expected one of {self.BACKENDS}.")
+        if search_strategy not in self.SEARCH_STRATEGIES:
+            raise ValueError(
+                f"Unknown search strategy: {search_strategy}. Expected one of {self.SEARCH_STRATEGIES}."
+            )
+        self.n_jobs = n_jobs if n_jobs is not None else CpuHelper.available_cpus()
+        self.backend = backend
+        self.max_nbytes = max_nbytes
+        self.mmap_mode = mmap_mode
+        self.search_strategy = search_strategy
+        self.profiler = profiler if profiler is not None else TrainingProfiler(enabled=False)
         self.n_estimators = range(250, 800, 20)
         self.min_samples_split = range(75, 500, 15)
         self.max_depth = range(10, 50, 2)
         self.random_state = 5
         self.no_of_iterations = 150
+        self.n_splits = 10
+        self.halving_factor = 3
+        self.halving_min_estimators = 30
 
     @staticmethod
     def _print_report(y_test, y_pred, best_params):
@@ -32,7 +79,7 @@ class RandomForestClassifierHelper:
         print("Predictions:", y_pred)
 
     @staticmethod
-    def _backtest(df, y_pred, fee_per_trade=0.001):
+    def _backtest(df, y_pred, fee_per_trade=0.001) -> dict:
         """
         Safe backtesting for long/flat strategy using next-day predictions.
 
@@ -45,84 +92,122 @@ class RandomForestClassifierHelper:
         fee_per_trade : float
             Proportional cost per trade (0.001 = 0.1% per trade).
 
-        Prints annualized return, equity curve, max drawdown, and Sharpe ratio.
+        Returns
+        -------
+        dict
+            Annual return, max drawdown, Sharpe ratio, trades and exposure, as
+            computed by `BacktestHelper.sweep`; the report is printed as well.
         """
-        df = df.copy().sort_values(by="timestamp", ascending=True)
-
-        # 1. Compute next-day log returns
-        df["log_ret_1d"] = np.log(df["close"] / df["close"].shift(1))
-
-        # 2. Assign positions: 1 if predicting up, 0 otherwise
-        df["pos"] = y_pred.astype(float)
-
-        # 3. Strategy gross daily return in log space
-        df["strat_log"] = df["pos"] * df["log_ret_1d"]
-
-        # 4. Cost: apply when position changes
-        df["cost"] = df["pos"].diff().abs().fillna(0) * fee_per_trade
-
-        # 5. Net daily return
-        df["net_ret"] = np.exp(df["strat_log"]) - 1 - df["cost"]
-
-        # 6. Clip extreme values and fill NaNs
-        df["net_ret"] = df["net_ret"].fillna(0).clip(lower=-0.99)
-
-        # 7. Net log return for equity compounding
-        df["net_log"] = np.log1p(df["net_ret"])
+        order = np.argsort(df["timestamp"].to_numpy(), kind="stable")
+        metrics = BacktestHelper.sweep(
+            df["close"].to_numpy()[order], np.asarray(y_pred, dtype=np.float64)[order],
+            thresholds=[0.5], fees=[fee_per_trade]
+        ).iloc[0].to_dict()
 
-        # 8. Equity curve
-        equity = np.exp(df["net_log"].cumsum())
-
-        # 9. Annualized return
-        ann_return = equity.iloc[-1] ** (365 / len(df)) - 1
-
-        # 10. Max Drawdown
-        roll_max = equity.cummax()
-        drawdown = equity / roll_max - 1
-        max_drawdown = drawdown.min()
-
-        # 11. Sharpe Ratio (daily returns)
-        daily_ret = df["net_log"]
-        sharpe_ratio = np.mean(daily_ret) / np.std(daily_ret) * np.sqrt(252)
-
-        # 12. Report
         print("Backtesting report")
-        print(f"Annual return: {ann_return:.4f}")
-        print(f"Equity curve (last 5 rows):\n{equity.tail()}")
-        print(f"Max Drawdown: {max_drawdown:.2f}")
-        print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
+        print(f"Annual return: {metrics['annual_return']:.4f}")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2f}")
+        print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+        return metrics
+
+    def search_space(self) -> dict:
+        """Everything that decides which hyperparameters a search ends up with."""
+        def as_list(values: range) -> list[int]:
+            return [values.start, values.stop, values.step]
+
+        return {
+            "strategy": self.search_strategy,
+            "n_estimators": as_list(self.n_estimators),
+            "min_samples_split": as_list(self.min_samples_split),
+            "max_depth": as_list(self.max_depth),
+            "random_state": self.random_state,
+            "no_of_iterations": self.no_of_iterations,
+            "n_splits": self.n_splits,
+            "halving_factor": self.halving_factor,
+            "halving_min_estimators": self.halving_min_estimators,
+        }
 
-    def train_model(self, data: DataFrame, target: Series) -> RandomForestClassifier:
-        X_train, X_test, y_train, y_test = train_test_split(data, target, test_size=0.3, shuffle=False,)
+    @classmethod
+    def best_params(cls, model: RandomForestClassifier) -> dict:
+        params = model.get_params()
+        return {name: params[name] for name in cls.SEARCH_PARAMETERS}
 
-        random_forest_classifier = RandomForestClassifier(
-            random_state=self.random_state,
-            class_weight="balanced"
-        )
+    def _create_search(self, estimator: RandomForestClassifier) -> RandomizedSearchCV | HalvingRandomSearchCV:
         param_dist = {
-            'n_estimators': self.n_estimators,
             'min_samples_split': self.min_samples_split,
             'max_depth': self.max_depth
         }
-        rand_search = RandomizedSearchCV(
-            estimator=random_forest_classifier,
-            param_distributions=param_dist,
+        if self.search_strategy == "halving":
+            return HalvingRandomSearchCV(
+                estimator=estimator,
+                param_distributions=param_dist,
+                n_candidates=self.no_of_iterations,
+                factor=self.halving_factor,
+                resource='n_estimators',
+                min_resources=self.halving_min_estimators,
+                max_resources=max(self.n_estimators),
+                aggressive_elimination=True,
+                cv=TimeSeriesSplit(n_splits=self.n_splits),
+                scoring="recall",
+                random_state=self.random_state,
+                refit=False
+            )
+        return RandomizedSearchCV(
+            estimator=estimator,
+            param_distributions={'n_estimators': self.n_estimators, **param_dist},
             n_iter=self.no_of_iterations,
             # cv=5,
-            cv=TimeSeriesSplit(n_splits=10),
+            cv=TimeSeriesSplit(n_splits=self.n_splits),
             scoring="recall",
-            random_state=self.random_state
+            random_state=self.random_state,
+            refit=False
         )
 
-        with parallel_backend('threading', n_jobs=12):
-            print(X_train.shape, y_train.shape)
-            rand_search.fit(X_train, y_train)
+    def __evaluate(self, X_test: DataFrame, y_test: Series, model: RandomForestClassifier, params: dict) -> None:
+        with self.profiler.phase("evaluate"):
+            y_pred = model.predict(X_test)
+            self._print_report(y_test, y_pred, params)
+        with self.profiler.phase("backtest"):
+            self._backtest(X_test, y_pred)
 
-        best_rf = rand_search.best_estimator_
-        best_params = rand_search.best_params_
+    def train_model(self, data: DataFrame, target: Series) -> RandomForestClassifier:
+        X_train, X_test, y_train, y_test = train_test_split(data, target, test_size=0.3, shuffle=False,)
 
-        y_pred = best_rf.predict(X_test)
-        self._print_report(y_test, y_pred, best_params)
-        self._backtest(X_test, y_pred)
+        random_forest_classifier = RandomForestClassifier(
+            random_state=self.random_state,
+            class_weight="balanced"
+        )
+        rand_search = self._create_search(random_forest_classifier)
 
+        with parallel_config(
+                backend=self.backend, n_jobs=self.n_jobs, max_nbytes=self.max_nbytes, mmap_mode=self.mmap_mode
+        ):
+            print(X_train.shape, y_train.shape)
+            with self.profiler.phase("search"):
+                rand_search.fit(X_train, y_train)
+            self.profiler.record_search(rand_search)
+
+            # Refit outside the search, as its `refit=True` would, so it is timed on its own.
+            best_params = rand_search.best_params_
+            with self.profiler.phase("refit"):
+                best_rf = clone(random_forest_classifier).set_params(**best_params).fit(X_train, y_train)
+
+        self.__evaluate(X_test, y_test, best_rf, best_params)
         return best_rf
+
+    def fit_with_params(self, data: DataFrame, target: Series, params: dict) -> RandomForestClassifier:
+        """Fit a single forest with known hyperparameters, skipping the search."""
+        X_train, X_test, y_train, y_test = train_test_split(data, target, test_size=0.3, shuffle=False,)
+
+        random_forest_classifier = RandomForestClassifier(
+            random_state=self.random_state,
+            class_weight="balanced",
+            **params
+        )
+        with parallel_config(
+                backend=self.backend, n_jobs=self.n_jobs, max_nbytes=self.max_nbytes, mmap_mode=self.mmap_mode
+        ), self.profiler.phase("refit"):
+            random_forest_classifier.fit(X_train, y_train)
+
+        self.__evaluate(X_test, y_test, random_forest_classifier, params)
+        return random_forest_classifier
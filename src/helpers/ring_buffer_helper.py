@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import numpy as np
+from pandas import DataFrame
+
+
+class RingBuffer:
+    """
+    Fixed-capacity, column-typed rolling window.
+
+    Columns are grouped into one int64 and one float64 block. Every row is written
+    twice, at slot ``i`` and ``i + capacity``, so the live window is always the
+    contiguous slice ``block[start:start + size]``. Appending and evicting cost O(1)
+    and never reallocate; a DataFrame is only built when `to_frame` is called.
+    """
+    __slots__ = ("capacity", "columns", "size", "__start", "__int_columns", "__float_columns",
+                 "__int_block", "__float_block")
+
+    def __init__(self, columns: list[str], capacity: int, int_columns: list[str] | None = None):
+        int_columns = set(int_columns or [])
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.size = 0
+        self.__start = 0
+        self.__int_columns = [column for column in self.columns if column in int_columns]
+        self.__float_columns = [column for column in self.columns if column not in int_columns]
+        self.__int_block = np.zeros((2 * capacity, len(self.__int_columns)), dtype=np.int64)
+        self.__float_block = np.full((2 * capacity, len(self.__float_columns)), np.nan, dtype=np.float64)
+
+    @classmethod
+    def from_frame(cls, data: DataFrame, capacity: int, columns: list[str] | None = None) -> RingBuffer:
+        columns = list(data.columns) if columns is None else columns
+        int_columns = [column for column in columns if np.issubdtype(data[column].dtype, np.integer)]
+        buffer = cls(columns, capacity, int_columns)
+        buffer.extend(data)
+        return buffer
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __next_slot(self) -> int:
+        if self.size < self.capacity:
+            slot = (self.__start + self.size) % self.capacity
+            self.size += 1
+        else:
+            slot = self.__start
+            self.__start = (self.__start + 1) % self.capacity
+        return slot
+
+    def append(self, row: dict) -> None:
+        slot = self.__next_slot()
+        int_values = [row[column] for column in self.__int_columns]
+        float_values = [row[column] for column in self.__float_columns]
+        self.__int_block[slot] = int_values
+        self.__int_block[slot + self.capacity] = int_values
+        self.__float_block[slot] = float_values
+        self.__float_block[slot + self.capacity] = float_values
+
+    def extend(self, data: DataFrame) -> None:
+        data = data.iloc[-self.capacity:]
+        if len(data) < self.capacity:
+            for row in data[self.columns].to_dict("records"):
+                self.append(row)
+            return
+
+        # The incoming rows replace the whole window, so load them in one go.
+        int_values = data[self.__int_columns].to_numpy(dtype=np.int64)
+        float_values = data[self.__float_columns].to_numpy(dtype=np.float64)
+        self.__int_block[:self.capacity] = int_values
+        self.__int_block[self.capacity:] = int_values
+        self.__float_block[:self.capacity] = float_values
+        self.__float_block[self.capacity:] = float_values
+        self.__start = 0
+        self.size = self.capacity
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a single column, oldest to newest."""
+        if name in self.__int_columns:
+            view = self.__int_block[self.__start:self.__start + self.size, self.__int_columns.index(name)]
+        else:
+            view = self.__float_block[self.__start:self.__start + self.size, self.__float_columns.index(name)]
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def to_frame(self) -> DataFrame:
+        window = slice(self.__start, self.__start + self.size)
+        data = {}
+        for index, column in enumerate(self.__int_columns):
+            data[column] = self.__int_block[window, index]
+        for index, column in enumerate(self.__float_columns):
+            data[column] = self.__float_block[window, index]
+        return DataFrame(data, columns=self.columns, copy=True)
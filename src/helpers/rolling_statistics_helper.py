@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+
+
+def divide(numerator: float, denominator: float) -> float:
+    """IEEE-754 division, matching what numpy/pandas produce for a zero denominator."""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return math.nan
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class RollingMean:
+    """
+    Streaming equivalent of ``Series.rolling(window, min_periods).mean()``.
+
+    Mirrors the compensated add/remove summation pandas uses internally so that
+    feeding the same values one at a time yields bit-identical results.
+    """
+    __slots__ = (
+        "window", "min_periods", "values", "sum_x", "compensation_add",
+        "compensation_remove", "nobs", "neg_ct", "num_consecutive_same_value", "prev_value"
+    )
+
+    def __init__(self, window: int, min_periods: int | None = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.nobs = 0
+        self.neg_ct = 0
+        self.num_consecutive_same_value = 0
+        self.prev_value = math.nan
+
+    def __advance(self, value: float) -> tuple:
+        sum_x, compensation_add, compensation_remove = self.sum_x, self.compensation_add, self.compensation_remove
+        nobs, neg_ct = self.nobs, self.neg_ct
+        num_consecutive_same_value, prev_value = self.num_consecutive_same_value, self.prev_value
+
+        if len(self.values) == self.window:
+            removed = self.values[0]
+            if not math.isnan(removed):
+                nobs -= 1
+                y = -removed - compensation_remove
+                t = sum_x + y
+                compensation_remove = t - sum_x - y
+                sum_x = t
+                if math.copysign(1.0, removed) < 0:
+                    neg_ct -= 1
+
+        if not math.isnan(value):
+            nobs += 1
+            y = value - compensation_add
+            t = sum_x + y
+            compensation_add = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, value) < 0:
+                neg_ct += 1
+            if value == prev_value:
+                num_consecutive_same_value += 1
+            else:
+                num_consecutive_same_value = 1
+            prev_value = value
+
+        return (
+            sum_x, compensation_add, compensation_remove, nobs, neg_ct,
+            num_consecutive_same_value, prev_value
+        )
+
+    def __result(self, state: tuple) -> float:
+        sum_x, _, _, nobs, neg_ct, num_consecutive_same_value, prev_value = state
+        if nobs >= self.min_periods and nobs > 0:
+            result = sum_x / nobs
+            if num_consecutive_same_value >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            return result
+        return math.nan
+
+    def peek(self, value: float) -> float:
+        return self.__result(self.__advance(value))
+
+    def push(self, value: float) -> float:
+        state = self.__advance(value)
+        (
+            self.sum_x, self.compensation_add, self.compensation_remove, self.nobs, self.neg_ct,
+            self.num_consecutive_same_value, self.prev_value
+        ) = state
+        if len(self.values) == self.window:
+            self.values.popleft()
+        self.values.append(value)
+        return self.__result(state)
+
+
+class RollingCount:
+    """Streaming ``rolling(window, min_periods=1).sum()`` for integer flags."""
+    __slots__ = ("window", "values", "total")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0
+
+    def peek(self, value: int) -> int:
+        if len(self.values) == self.window:
+            return self.total + value - self.values[0]
+        return self.total + value
+
+    def push(self, value: int) -> int:
+        self.total = self.peek(value)
+        if len(self.values) == self.window:
+            self.values.popleft()
+        self.values.append(value)
+        return self.total
+
+
+class ExponentialMean:
+    """Streaming equivalent of ``Series.ewm(span=span, adjust=False).mean()``."""
+    __slots__ = ("old_wt", "new_wt", "weighted")
+
+    def __init__(self, span: float):
+        alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.old_wt = 1.0 - alpha
+        self.new_wt = alpha
+        self.weighted = math.nan
+
+    def peek(self, value: float) -> float:
+        weighted = self.weighted
+        if not math.isnan(weighted):
+            if not math.isnan(value) and weighted != value:
+                weighted = (self.old_wt * weighted + self.new_wt * value) / (self.old_wt + self.new_wt)
+        elif not math.isnan(value):
+            weighted = value
+        return weighted
+
+    def push(self, value: float) -> float:
+        self.weighted = self.peek(value)
+        return self.weighted
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so short
+    bursts of `capacity` calls go through at once while the long-run rate never
+    exceeds `rate`. `acquire` blocks until a token is available; the wait happens
+    outside the lock, so waiting threads do not hold each other up.
+    """
+
+    def __init__(
+            self, rate: float, capacity: float | None = None,
+            clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep
+    ):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got: {rate}.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__tokens = self.capacity
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    def __refill(self) -> None:
+        now = self.__clock()
+        self.__tokens = min(self.capacity, self.__tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take `tokens` if available and return 0, otherwise return the seconds to wait for them."""
+        with self.__lock:
+            self.__refill()
+            if self.__tokens >= tokens:
+                self.__tokens -= tokens
+                return 0.0
+            return (tokens - self.__tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            self.__sleep(wait)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import bisect
+import copy
+import threading
+import time
+
+from src.metrics.metrics_sink import MetricsSink
+
+Labels = tuple[tuple[str, str], ...]
+MetricKey = tuple[str, Labels]
+
+# Upper bounds in seconds, from half a millisecond to ten seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-on-read latency histogram with fixed bucket bounds, Prometheus style."""
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile; ``inf`` past the last bound."""
+        if self.count == 0:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsSnapshot:
+    """Point-in-time copy of every counter and histogram, keyed by (name, labels)."""
+
+    def __init__(self, counters: dict[MetricKey, float], histograms: dict[MetricKey, Histogram]):
+        self.counters = counters
+        self.histograms = histograms
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, _to_labels(labels)), 0)
+
+    def histogram(self, name: str, **labels: str) -> Histogram | None:
+        return self.histograms.get((name, _to_labels(labels)))
+
+
+def _to_labels(labels: dict[str, str]) -> Labels:
+    return tuple((key, str(value)) for key, value in labels.items())
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "started")
+
+    def __init__(self, registry: MetricsRegistry, name: str, labels: dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> _Timer:
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopTimer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency histograms, exported through pluggable sinks.
+
+    Metrics are aggregated in memory under one lock and only handed to the sinks on
+    `export`, so recording stays off the I/O path. While the registry is disabled,
+    `timer` returns a shared no-op context manager and `increment`/`observe` return
+    after a single attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, sinks: list[MetricsSink] | None = None):
+        self.enabled = enabled
+        self.sinks: list[MetricsSink] = list(sinks or [])
+        self.__lock = threading.Lock()
+        self.__counters: dict[MetricKey, float] = {}
+        self.__histograms: dict[MetricKey, Histogram] = {}
+
+    def enable(self, *sinks: MetricsSink) -> MetricsRegistry:
+        self.sinks.extend(sinks)
+        self.enabled = True
+        return self
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, _to_labels(labels))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, _to_labels(labels))
+        with self.__lock:
+            histogram = self.__histograms.get(key)
+            if histogram is None:
+                histogram = self.__histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels: str) -> _Timer | _NoopTimer:
+        """Context manager observing the elapsed seconds of its block into histogram `name`."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, name, labels)
+
+    def snapshot(self) -> MetricsSnapshot:
+        with self.__lock:
+            return MetricsSnapshot(dict(self.__counters), copy.deepcopy(self.__histograms))
+
+    def export(self) -> MetricsSnapshot:
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.export(snapshot)
+        return snapshot
+
+
+# Process-wide registry used by the engine, model loader, models and persister.
+metrics = MetricsRegistry()
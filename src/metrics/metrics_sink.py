@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import abc
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.metrics.metrics_registry import MetricsSnapshot
+
+
+class MetricsSink(abc.ABC):
+    """Destination for the metrics collected by a `MetricsRegistry`."""
+
+    @abc.abstractmethod
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        raise NotImplementedError()
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from src.metrics.metrics_registry import MetricsSnapshot
+from src.metrics.metrics_sink import MetricsSink
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Keeps the most recent snapshots, oldest first, for tests and in-process dashboards."""
+
+    def __init__(self, max_snapshots: int = 1):
+        self.max_snapshots = max_snapshots
+        self.snapshots: list[MetricsSnapshot] = []
+
+    @property
+    def latest(self) -> MetricsSnapshot | None:
+        return self.snapshots[-1] if self.snapshots else None
+
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        self.snapshots = (self.snapshots + [snapshot])[-self.max_snapshots:]
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import logging
+
+from src.metrics.metrics_registry import MetricsSnapshot
+from src.metrics.metrics_sink import MetricsSink
+
+logger = logging.getLogger(__name__)
+
+
+class LoggingMetricsSink(MetricsSink):
+    """Logs one line per counter and one summary line (count, mean, p50, p99) per histogram."""
+
+    def __init__(self, level: int = logging.INFO, metrics_logger: logging.Logger | None = None):
+        self.level = level
+        self.logger = metrics_logger if metrics_logger is not None else logger
+
+    @staticmethod
+    def __format_labels(labels) -> str:
+        return ",".join(f"{key}={value}" for key, value in labels)
+
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            self.logger.log(self.level, "Metric %s{%s}: %s.", name, self.__format_labels(labels), value)
+        for (name, labels), histogram in sorted(snapshot.histograms.items(), key=lambda item: item[0]):
+            self.logger.log(
+                self.level, "Metric %s{%s}: count=%d, mean=%.6fs, p50<=%ss, p99<=%ss.",
+                name, self.__format_labels(labels), histogram.count, histogram.sum / max(histogram.count, 1),
+                histogram.quantile(0.5), histogram.quantile(0.99)
+            )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from src.metrics.metrics_registry import MetricsSnapshot
+from src.metrics.metrics_sink import MetricsSink
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Renders snapshots in the Prometheus text exposition format.
+
+    The latest rendering is kept in `text`; with `path` set it is also written there
+    atomically, which is what the node exporter's textfile collector expects.
+    """
+
+    def __init__(self, path: str | Path | None = None, namespace: str = "ml_assets"):
+        self.path = Path(path) if path is not None else None
+        self.namespace = namespace
+        self.text = ""
+
+    @staticmethod
+    def __escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @classmethod
+    def __format_labels(cls, labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [f'{key}="{cls.__escape(value)}"' for key, value in (*labels, *extra)]
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @staticmethod
+    def __format_value(value: float) -> str:
+        return "+Inf" if value == float("inf") else repr(float(value))
+
+    def render(self, snapshot: MetricsSnapshot) -> str:
+        lines, typed = [], set()
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            name = f"{self.namespace}_{name}"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{self.__format_labels(labels)} {self.__format_value(value)}")
+
+        for (name, labels), histogram in sorted(snapshot.histograms.items(), key=lambda item: item[0]):
+            name = f"{self.namespace}_{name}"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip((*histogram.bounds, float("inf")), histogram.counts):
+                cumulative += count
+                bucket_labels = self.__format_labels(labels, (("le", self.__format_value(bound)),))
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{self.__format_labels(labels)} {self.__format_value(histogram.sum)}")
+            lines.append(f"{name}_count{self.__format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        self.text = self.render(snapshot)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            temporary.write_text(self.text, encoding="utf-8")
+            os.replace(temporary, self.path)
@@ -1,16 +1,47 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
+
 from pandas import DataFrame
 import pandas as pd
 
 from pytrends.request import TrendReq
 
+from src.persistence.source_cache import SourceCache
+from src.persistence.table_store import TableStore
+
+logger = logging.getLogger(__name__)
+
 
 class GoogleTrends:
-    def __init__(self):
-        self.directory = Path(os.getcwd()).joinpath("./localstorage")
+    """
+    Google Trends interest for keyword sets, cached under ``./localstorage``.
+
+    Trends values are scaled 0-100 relative to the requested window, so rows from
+    different downloads cannot be stitched together: once a cached series is older
+    than `ttl` the whole window is downloaded again (a single request) and replaces
+    the cached series entirely. `prefetch` warms many keyword sets concurrently.
+    """
+    TIMESTAMP_COLUMN = "date"
+
+    def __init__(
+            self, store: TableStore | None = None, ttl: timedelta = timedelta(days=7),
+            directory: str = "./localstorage"
+    ):
+        self.directory = Path(os.getcwd()).joinpath(directory)
         self.directory.mkdir(parents=True, exist_ok=True)
+        self.store = store if store is not None else TableStore(on_import=self.__normalize_dates)
+        self.cache = SourceCache(self.directory, self.store, ttl)
+
+    @classmethod
+    def __normalize_dates(cls, trends: DataFrame) -> DataFrame:
+        trends[cls.TIMESTAMP_COLUMN] = pd.to_datetime(trends[cls.TIMESTAMP_COLUMN])
+        return trends
 
     @staticmethod
     def get_google_trends_factor(keywords: list[str]) -> DataFrame:
@@ -25,11 +56,16 @@ class GoogleTrends:
         return trends
 
     def get_data_source(self, keywords: list[str]) -> DataFrame:
-        file_path = f"{self.directory}/{''.join(keywords)}.csv"
-        if os.path.exists(file_path):
-            trends_history = pd.read_csv(file_path)
-        else:
-            trends_history = GoogleTrends.get_google_trends_factor(keywords)
-            trends_history.to_csv(file_path)
-        trends_history = trends_history.reset_index()
-        return trends_history
+        return self.cache.get(
+            ''.join(keywords),
+            lambda _: self.__normalize_dates(GoogleTrends.get_google_trends_factor(keywords).reset_index()),
+            self.TIMESTAMP_COLUMN, replace=True
+        )
+
+    def prefetch(self, keyword_sets: list[list[str]], max_workers: int = 4) -> None:
+        """Refresh `keyword_sets` concurrently; failures are logged and left for `get_data_source`."""
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trends-prefetch") as executor:
+            futures = {executor.submit(self.get_data_source, keywords): keywords for keywords in keyword_sets}
+        for future, keywords in futures.items():
+            if future.exception() is not None:
+                logger.error("Failed prefetching Google Trends: keywords=%s, error=%s.", keywords, future.exception())
@@ -1,25 +1,83 @@
 #!/usr/bin/env python3
+from __future__ import annotations
 
+import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
-import pandas as pd
 
+import pandas as pd
 import yfinance as yf
+from pandas import DataFrame
+
+from src.persistence.source_cache import SourceCache
+from src.persistence.table_store import TableStore
+
+logger = logging.getLogger(__name__)
 
 
 class YahooFinance:
-    def __init__(self):
-        self.directory = Path(os.getcwd()).joinpath("./localstorage")
+    """
+    Daily price history from Yahoo Finance, cached under ``./localstorage``.
+
+    Cached histories are reused for `ttl` and then topped up from their last
+    trading day (see `SourceCache`), keeping only the requested `period` before the
+    newest day; `prefetch` warms many tickers concurrently.
+    """
+    TIMESTAMP_COLUMN = "Date"
+    PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+    def __init__(
+            self, store: TableStore | None = None, ttl: timedelta = timedelta(hours=12),
+            directory: str = "./localstorage"
+    ):
+        self.directory = Path(os.getcwd()).joinpath(directory)
         self.directory.mkdir(parents=True, exist_ok=True)
+        self.store = store if store is not None else TableStore(on_import=self.__normalize_dates)
+        self.cache = SourceCache(self.directory, self.store, ttl)
 
-    def get_data_source(self, ticker: str, period: str = "5y"):
-        file_path = f"{self.directory}/{ticker}-{period}.csv"
-        if os.path.exists(file_path):
-            asset_history = pd.read_csv(file_path)
+    @classmethod
+    def __normalize_dates(cls, history: DataFrame) -> DataFrame:
+        history[cls.TIMESTAMP_COLUMN] = pd.to_datetime(history[cls.TIMESTAMP_COLUMN], utc=True)
+        return history
+
+    @classmethod
+    def download(cls, ticker: str, period: str, start: pd.Timestamp | None = None) -> DataFrame:
+        """Download the full `period`, or every day from `start` on when it is given."""
+        ticker_data = yf.Ticker(ticker)
+        if start is None:
+            history = ticker_data.history(period=period)
+        else:
+            history = ticker_data.history(start=start.strftime("%Y-%m-%d"))
+        return cls.__normalize_dates(history.reset_index())
+
+    @classmethod
+    def trim_to_period(cls, history: DataFrame, period: str) -> DataFrame:
+        """Keep the rows within `period` (a yfinance period such as ``5y`` or ``ytd``) of the newest one."""
+        if period == "max" or history.empty:
+            return history
+        newest = history[cls.TIMESTAMP_COLUMN].max()
+        if period == "ytd":
+            start = newest.normalize().replace(month=1, day=1) - pd.Timedelta(1, "ns")
         else:
-            ticker_data = yf.Ticker(ticker)
-            asset_history = ticker_data.history(period=period)
-            asset_history.to_csv(file_path)
+            match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+            if match is None:
+                raise ValueError(f"Unsupported Yahoo Finance period: {period}.")
+            start = newest - pd.DateOffset(**{cls.PERIOD_UNITS[match.group(2)]: int(match.group(1))})
+        return history[history[cls.TIMESTAMP_COLUMN] > start].reset_index(drop=True)
+
+    def get_data_source(self, ticker: str, period: str = "5y"):
+        return self.cache.get(
+            f"{ticker}-{period}", lambda start: self.download(ticker, period, start), self.TIMESTAMP_COLUMN,
+            trim=lambda history: self.trim_to_period(history, period)
+        )
 
-        asset_history = asset_history.reset_index()
-        return asset_history
+    def prefetch(self, tickers: list[str], period: str = "5y", max_workers: int = 8) -> None:
+        """Refresh `tickers` concurrently; failures are logged and left for `get_data_source`."""
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yahoo-prefetch") as executor:
+            futures = {executor.submit(self.get_data_source, ticker, period): ticker for ticker in tickers}
+        for future, ticker in futures.items():
+            if future.exception() is not None:
+                logger.error("Failed prefetching Yahoo Finance history: ticker=%s, error=%s.", ticker, future.exception())
@@ -0,0 +1,29 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from pandas import DataFrame
+
+from src.persistence.storage_format import StorageFormat
+
+
+class CsvStorageFormat(StorageFormat):
+    suffix = ".csv"
+
+    def __init__(self, sep: str = ","):
+        self.sep = sep
+
+    def read(self, base: Path) -> DataFrame:
+        return pd.read_csv(self.path_for(base), sep=self.sep)
+
+    def write(self, base: Path, data: DataFrame) -> None:
+        path = self.path_for(base)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8", newline="") as temp_file:
+                data.to_csv(temp_file, sep=self.sep, index=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from pandas.api.types import DatetimeTZDtype, is_bool_dtype, is_datetime64_dtype, is_numeric_dtype
+
+from src.helpers.file_lock_helper import FileLock
+from src.persistence.storage_format import StorageFormat
+
+
+class NumpyStorageFormat(StorageFormat):
+    """
+    Typed, column-per-file binary format.
+
+    A table is a directory holding one ``.npy`` file per column plus ``manifest.json``.
+    Every write produces a new generation of column files and then swaps the manifest,
+    so the replacement is atomic. Writes hold the table's lock file exclusively and
+    reads hold it shared, so a write only removes earlier generations once no reader
+    can still be opening their columns. Columns larger than `mmap_threshold` bytes are
+    memory-mapped copy-on-write instead of being read into memory.
+    """
+    suffix = ".columns"
+    MANIFEST = "manifest.json"
+    LOCK = ".lock"
+
+    def __init__(self, mmap_threshold: int = 1 << 20):
+        self.mmap_threshold = mmap_threshold
+
+    def exists(self, base: Path) -> bool:
+        return self.path_for(base).joinpath(self.MANIFEST).is_file()
+
+    @staticmethod
+    def __encode(series: pd.Series) -> tuple[dict, np.ndarray, np.ndarray | None]:
+        if isinstance(series.dtype, DatetimeTZDtype):
+            values = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+            return {"kind": "datetimetz", "tz": str(series.dt.tz)}, values, None
+        if is_datetime64_dtype(series.dtype):
+            return {"kind": "datetime"}, series.to_numpy(dtype="datetime64[ns]"), None
+        if is_bool_dtype(series.dtype) or is_numeric_dtype(series.dtype):
+            return {"kind": "numeric"}, series.to_numpy(), None
+        nulls = series.isna().to_numpy()
+        values = np.asarray(series.where(~nulls, "").astype(str).to_numpy(), dtype=str)
+        return {"kind": "string"}, values, nulls if nulls.any() else None
+
+    @staticmethod
+    def __decode(column: dict, values: np.ndarray, nulls: np.ndarray | None) -> pd.Series:
+        if column["kind"] == "datetimetz":
+            return pd.Series(values).dt.tz_localize("UTC").dt.tz_convert(column["tz"])
+        if column["kind"] == "string":
+            series = pd.Series(values, dtype=object)
+            if nulls is not None:
+                series[nulls] = None
+            return series
+        return pd.Series(values, copy=False)
+
+    def __load(self, path: Path) -> np.ndarray:
+        if path.stat().st_size >= self.mmap_threshold:
+            return np.load(path, mmap_mode="c", allow_pickle=False).view(np.ndarray)
+        return np.load(path, allow_pickle=False)
+
+    def read(self, base: Path) -> DataFrame:
+        directory = self.path_for(base)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"No such table: {directory}.")
+        with FileLock(directory / self.LOCK, shared=True):
+            return self.__read_generation(directory)
+
+    def __read_generation(self, directory: Path) -> DataFrame:
+        manifest = json.loads(directory.joinpath(self.MANIFEST).read_text(encoding="utf-8"))
+        data = {}
+        for column in manifest["columns"]:
+            values = self.__load(directory / column["file"])
+            nulls = self.__load(directory / column["nulls"]) if "nulls" in column else None
+            data[column["name"]] = self.__decode(column, values, nulls)
+        return DataFrame(data, columns=[column["name"] for column in manifest["columns"]], copy=False)
+
+    def write(self, base: Path, data: DataFrame) -> None:
+        directory = self.path_for(base)
+        directory.mkdir(parents=True, exist_ok=True)
+        with FileLock(directory / self.LOCK):
+            self.__write_generation(directory, data)
+
+    def __write_generation(self, directory: Path, data: DataFrame) -> None:
+        manifest_path = directory / self.MANIFEST
+        generation = f"{time.time_ns():x}-{os.getpid():x}"
+
+        columns = []
+        for index, name in enumerate(data.columns):
+            column, values, nulls = self.__encode(data[name])
+            column.update({"name": str(name), "file": f"{index}.{generation}.npy"})
+            np.save(directory / column["file"], values, allow_pickle=False)
+            if nulls is not None:
+                column["nulls"] = f"{index}.{generation}.nulls.npy"
+                np.save(directory / column["nulls"], nulls, allow_pickle=False)
+            columns.append(column)
+
+        temp_manifest_path = directory / f".{self.MANIFEST}.{generation}.tmp"
+        temp_manifest_path.write_text(
+            json.dumps({"generation": generation, "rows": len(data), "columns": columns}), encoding="utf-8"
+        )
+        os.replace(temp_manifest_path, manifest_path)
+
+        for path in directory.glob("*.npy"):
+            if path.name.split(".")[1] != generation:
+                try:
+                    path.unlink(missing_ok=True)
+                except PermissionError:
+                    # Windows refuses to remove a column still memory-mapped; the next write retries.
+                    pass
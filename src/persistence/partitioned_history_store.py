@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.helpers.dataframe_helper import DataFrameHelper
+from src.helpers.file_lock_helper import FileLock
+from src.persistence.formats.numpy_storage_format import NumpyStorageFormat
+from src.persistence.storage_format import StorageFormat
+from src.persistence.table_store import TableStore
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionedHistoryStore:
+    """
+    History tables split into one partition per calendar month (UTC).
+
+    Each partition is sorted by ``timestamp``, so a range read only opens the months
+    it overlaps and trims the edges with a binary search. Appends rewrite only the
+    partitions the new rows fall into, deduplicating on ``timestamp`` (newest row
+    wins). Tables that only exist in `legacy_store` are partitioned on first access;
+    the partitions replace the legacy table's own import, so no second copy is written.
+    Appends and imports of one table are serialised by a lock file in its partition
+    directory, so concurrent appends never drop each other's rows.
+    """
+    SUFFIX = ".partitions"
+    LOCK = ".lock"
+
+    def __init__(
+            self, directory: Path, storage_format: StorageFormat | None = None,
+            legacy_store: TableStore | None = None
+    ):
+        self.directory = Path(directory)
+        self.storage_format = storage_format if storage_format is not None else NumpyStorageFormat()
+        self.legacy_store = legacy_store
+
+    def __get_partition_dir(self, name: str) -> Path:
+        return self.directory.joinpath(f"{name}{self.SUFFIX}")
+
+    def __get_partition_keys(self, name: str) -> list[str]:
+        partition_dir = self.__get_partition_dir(name)
+        if not partition_dir.is_dir():
+            return []
+        keys = {
+            path.name[:-len(self.storage_format.suffix)] if self.storage_format.suffix else path.name
+            for path in partition_dir.iterdir() if not path.name.startswith(".")
+        }
+        return sorted(key for key in keys if self.storage_format.exists(partition_dir / key))
+
+    @staticmethod
+    def __to_partition_key(timestamp: int) -> str:
+        return str(np.datetime64(int(timestamp), "s").astype("datetime64[M]"))
+
+    @staticmethod
+    def __to_timestamp(value: datetime | int | None) -> int | None:
+        if value is None or isinstance(value, (int, np.integer)):
+            return value
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize("UTC")
+        return int(timestamp.timestamp())
+
+    def __lock(self, name: str) -> FileLock:
+        return FileLock(self.__get_partition_dir(name) / self.LOCK)
+
+    def __has_legacy(self, name: str) -> bool:
+        return self.legacy_store is not None and self.legacy_store.exists(self.directory / name)
+
+    def __import_legacy(self, name: str) -> None:
+        # Called under the table lock; another process may have imported the table meanwhile.
+        if self.__get_partition_keys(name) or not self.__has_legacy(name):
+            return
+        logger.info("Partitioning legacy history table: name=%s.", name)
+        self.__write_partitions(name, self.legacy_store.read(self.directory / name, persist_import=False))
+
+    def __get_or_import_partition_keys(self, name: str) -> list[str]:
+        keys = self.__get_partition_keys(name)
+        if keys or not self.__has_legacy(name):
+            return keys
+        with self.__lock(name):
+            self.__import_legacy(name)
+        return self.__get_partition_keys(name)
+
+    def exists(self, name: str) -> bool:
+        return bool(self.__get_partition_keys(name)) or self.__has_legacy(name)
+
+    def read(
+            self, name: str,
+            from_date: datetime | int | None = None,
+            to_date: datetime | int | None = None
+    ) -> DataFrame:
+        keys = self.__get_or_import_partition_keys(name)
+        if not keys:
+            raise FileNotFoundError(f"History for: {name} does not exist in: {self.__get_partition_dir(name)}.")
+
+        from_timestamp, to_timestamp = self.__to_timestamp(from_date), self.__to_timestamp(to_date)
+        selected = [
+            key for key in keys
+            if (from_timestamp is None or key >= self.__to_partition_key(from_timestamp))
+            and (to_timestamp is None or key <= self.__to_partition_key(to_timestamp))
+        ]
+        partition_dir = self.__get_partition_dir(name)
+        if not selected:
+            return self.storage_format.read(partition_dir / keys[-1]).iloc[0:0]
+
+        partitions = [self.storage_format.read(partition_dir / key) for key in selected]
+        history = partitions[0] if len(partitions) == 1 else pd.concat(partitions, ignore_index=True)
+        timestamps = history["timestamp"].to_numpy()
+        start = 0 if from_timestamp is None else int(np.searchsorted(timestamps, from_timestamp, side="left"))
+        stop = len(history) if to_timestamp is None else int(np.searchsorted(timestamps, to_timestamp, side="right"))
+        if start == 0 and stop == len(history):
+            return history
+        return history.iloc[start:stop].reset_index(drop=True)
+
+    def last_timestamp(self, name: str) -> int | None:
+        """Newest ``timestamp`` stored for `name`, reading only its latest partition."""
+        keys = self.__get_or_import_partition_keys(name)
+        if not keys:
+            return None
+        timestamps = self.storage_format.read(self.__get_partition_dir(name) / keys[-1])["timestamp"]
+        return int(timestamps.iloc[-1]) if len(timestamps) else None
+
+    def append(self, name: str, market_data: DataFrame) -> DataFrame:
+        """Merge `market_data` into its partitions and return the rows that were written."""
+        with self.__lock(name):
+            self.__import_legacy(name)
+            return self.__write_partitions(name, market_data)
+
+    def __write_partitions(self, name: str, market_data: DataFrame) -> DataFrame:
+        new_data = DataFrameHelper.normalize_timestamp(market_data.copy())
+        new_data = new_data.sort_values(by="timestamp", kind="stable", ignore_index=True)
+        partition_dir = self.__get_partition_dir(name)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+
+        months = new_data["timestamp"].to_numpy(dtype="int64").astype("datetime64[s]").astype("datetime64[M]")
+        for key, rows in new_data.groupby(np.datetime_as_string(months, unit="M"), sort=True):
+            partition_base = partition_dir / key
+            if self.storage_format.exists(partition_base):
+                rows = pd.concat([self.storage_format.read(partition_base), rows], ignore_index=True)
+            partition = rows.drop_duplicates(subset="timestamp", keep="last").sort_values(
+                by="timestamp", kind="stable", ignore_index=True
+            )
+            self.storage_format.write(partition_base, partition)
+
+        return new_data.drop_duplicates(subset="timestamp", keep="last").reset_index(drop=True)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+from pandas import DataFrame
+
+from src.helpers.file_lock_helper import FileLock
+from src.persistence.table_store import TableStore
+
+logger = logging.getLogger(__name__)
+
+# Called with the newest cached timestamp, or None for a full download.
+Fetcher = Callable[[Optional[pd.Timestamp]], DataFrame]
+
+
+class SourceCache:
+    """
+    Local cache of an external data source, refreshed once it is older than `ttl`.
+
+    A stale table is topped up rather than downloaded again: the fetcher receives
+    the newest cached value of `timestamp_column` and the rows it returns replace
+    cached rows with the same timestamp, so a partial last row is corrected. The
+    refresh of a table runs under a per-table `FileLock`, and the freshness check is
+    repeated once the lock is held, so parallel trainers wait for one download
+    instead of stampeding the source. If the refresh fails and a cached copy exists,
+    the stale copy is returned. Tables written before this cache existed carry no
+    fetch time and are treated as stale. With ``replace=True`` the fetcher is always
+    called with None and its frame replaces the cached table as-is, for sources
+    whose downloads cannot be merged. A `trim` callable is applied to the refreshed
+    table before it is stored, so top-ups can keep it to a bounded window.
+    """
+
+    def __init__(
+            self, directory: Path, store: TableStore | None = None, ttl: timedelta = timedelta(days=1), *,
+            lock_timeout: float | None = 300.0, clock: Callable[[], float] = time.time
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.store = store if store is not None else TableStore()
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.__clock = clock
+
+    def __meta_path(self, name: str) -> Path:
+        return self.directory / f".{name}.meta.json"
+
+    def fetched_at(self, name: str) -> float | None:
+        try:
+            return json.loads(self.__meta_path(name).read_text(encoding="utf-8"))["fetched_at"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def is_fresh(self, name: str) -> bool:
+        fetched_at = self.fetched_at(name)
+        return (
+            fetched_at is not None and self.store.exists(self.directory / name)
+            and self.__clock() - fetched_at < self.ttl.total_seconds()
+        )
+
+    def __write_meta(self, name: str) -> None:
+        meta_path = self.__meta_path(name)
+        temporary = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps({"fetched_at": self.__clock()}), encoding="utf-8")
+        os.replace(temporary, meta_path)
+
+    @staticmethod
+    def __merge(cached: DataFrame | None, fetched: DataFrame, timestamp_column: str) -> DataFrame:
+        if cached is None or cached.empty:
+            return fetched.reset_index(drop=True)
+        if fetched.empty:
+            return cached
+        merged = pd.concat([cached, fetched], ignore_index=True)
+        return merged.drop_duplicates(subset=timestamp_column, keep="last").sort_values(
+            by=timestamp_column, kind="stable", ignore_index=True
+        )
+
+    def get(
+            self, name: str, fetch: Fetcher, timestamp_column: str, replace: bool = False,
+            trim: Callable[[DataFrame], DataFrame] | None = None
+    ) -> DataFrame:
+        base_path = self.directory / name
+        if self.is_fresh(name):
+            return self.store.read(base_path)
+
+        with FileLock(self.directory / f".{name}.lock", timeout=self.lock_timeout):
+            cached = self.store.read(base_path) if self.store.exists(base_path) else None
+            if cached is not None and self.is_fresh(name):
+                # Another process refreshed it while we waited for the lock.
+                return cached
+            last_timestamp = None
+            if not replace and cached is not None and not cached.empty:
+                last_timestamp = pd.Timestamp(cached[timestamp_column].max())
+            try:
+                fetched = fetch(last_timestamp)
+            except Exception:
+                if cached is None:
+                    raise
+                logger.exception("Failed refreshing cached source, serving stale copy: name=%s.", name)
+                return cached
+            data = fetched.reset_index(drop=True) if replace else self.__merge(cached, fetched, timestamp_column)
+            if trim is not None:
+                data = trim(data)
+            self.store.write(base_path, data)
+            self.__write_meta(name)
+            logger.info(
+                "Refreshed cached source: name=%s, fetched_rows=%d, rows=%d.", name, len(fetched), len(data)
+            )
+            return data
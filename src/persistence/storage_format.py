@@ -0,0 +1,24 @@
+import abc
+from pathlib import Path
+
+from pandas import DataFrame
+
+
+class StorageFormat(abc.ABC):
+    """On-disk representation of a table. `base` paths never carry the format suffix."""
+    suffix: str = ""
+
+    def path_for(self, base: Path) -> Path:
+        return Path(f"{base}{self.suffix}")
+
+    def exists(self, base: Path) -> bool:
+        return self.path_for(base).exists()
+
+    @abc.abstractmethod
+    def read(self, base: Path) -> DataFrame:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def write(self, base: Path, data: DataFrame) -> None:
+        """Replace the table at `base` atomically; readers see either the old or the new table."""
+        raise NotImplementedError()
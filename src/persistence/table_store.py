@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from collections.abc import Callable
+
+from pandas import DataFrame
+
+from src.persistence.formats.csv_storage_format import CsvStorageFormat
+from src.persistence.formats.numpy_storage_format import NumpyStorageFormat
+from src.persistence.storage_format import StorageFormat
+
+logger = logging.getLogger(__name__)
+
+
+class TableStore:
+    """
+    Reads and writes tables in `storage_format`.
+
+    Tables that only exist in `legacy_format` (CSV by default) are imported on first
+    read: parsed once, passed through `on_import`, and rewritten in `storage_format`.
+    Callers that keep the imported rows elsewhere pass ``persist_import=False`` to skip
+    the rewrite.
+    """
+
+    def __init__(
+            self, storage_format: StorageFormat | None = None,
+            legacy_format: StorageFormat | None = None,
+            on_import: Callable[[DataFrame], DataFrame] | None = None
+    ):
+        self.storage_format = storage_format if storage_format is not None else NumpyStorageFormat()
+        self.legacy_format = legacy_format if legacy_format is not None else CsvStorageFormat()
+        self.on_import = on_import
+
+    def exists(self, base: Path) -> bool:
+        return self.storage_format.exists(base) or self.legacy_format.exists(base)
+
+    def read(self, base: Path, persist_import: bool = True) -> DataFrame:
+        if self.storage_format.exists(base):
+            return self.storage_format.read(base)
+        if self.legacy_format.exists(base):
+            logger.info("Importing %s into %s.", self.legacy_format.path_for(base), type(self.storage_format).__name__)
+            data = self.legacy_format.read(base)
+            if self.on_import is not None:
+                data = self.on_import(data)
+            if persist_import and self.storage_format is not self.legacy_format:
+                self.storage_format.write(base, data)
+            return data
+        raise FileNotFoundError(f"Table does not exist in: {self.storage_format.path_for(base)}.")
+
+    def write(self, base: Path, data: DataFrame) -> None:
+        self.storage_format.write(base, data)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from collections.abc import Callable
+from pathlib import Path
+
+from pandas import DataFrame
+
+from src.metrics.metrics_registry import metrics
+
+logger = logging.getLogger(__name__)
+
+Writer = Callable[[Path, DataFrame], None]
+DirtyTables = dict[Path, tuple[Callable[[], DataFrame], Writer, int]]
+
+
+def _write(path: Path, snapshot: Callable[[], DataFrame], writer: Writer, ticks: int) -> None:
+    try:
+        with metrics.timer("cache_flush_seconds"):
+            writer(path, snapshot())
+        metrics.increment("cache_flushes_total")
+        logger.debug("Flushed %s pending update(s) to %s", ticks, path)
+    except Exception:
+        metrics.increment("cache_flush_failures_total")
+        logger.exception("Failed writing cache file %s.", path)
+
+
+def _flush(dirty: DirtyTables, lock: threading.Lock, flush_lock: threading.Lock) -> None:
+    with flush_lock:
+        with lock:
+            pending = dict(dirty)
+            dirty.clear()
+        for path, entry in pending.items():
+            _write(path, *entry)
+
+
+class WriteBehindPersister:
+    """
+    Takes cache writes off the request path.
+
+    Callers mark a table dirty together with a snapshot callable and the writer to
+    persist it with; a background thread writes every dirty table once per
+    `flush_interval` seconds, or sooner when a table has collected `max_dirty_ticks`
+    updates. Pending writes are flushed on `close`, and by a weak finalizer when the
+    persister is collected or the interpreter exits, so an unused persister is not
+    kept alive. Tables marked dirty after `close` are written inline.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, max_dirty_ticks: int = 100):
+        self.flush_interval = flush_interval
+        self.max_dirty_ticks = max_dirty_ticks
+        self.__dirty: DirtyTables = {}
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__stopped = threading.Event()
+        self.__thread: threading.Thread | None = None
+        self.__finalizer = weakref.finalize(self, _flush, self.__dirty, self.__lock, self.__flush_lock)
+
+    @property
+    def pending(self) -> int:
+        with self.__lock:
+            return len(self.__dirty)
+
+    def mark_dirty(self, path: Path, snapshot: Callable[[], DataFrame], writer: Writer) -> None:
+        with self.__lock:
+            # Checked under the lock `close` stops under, so no update lands after the final flush.
+            stopped = self.__stopped.is_set()
+            if not stopped:
+                _, _, ticks = self.__dirty.get(path, (None, None, 0))
+                self.__dirty[path] = (snapshot, writer, ticks + 1)
+                self.__ensure_started()
+        if stopped:
+            _write(path, snapshot, writer, 1)
+            return
+        if ticks + 1 >= self.max_dirty_ticks:
+            self.__wakeup.set()
+
+    def flush(self) -> None:
+        _flush(self.__dirty, self.__lock, self.__flush_lock)
+
+    def flush_path(self, path: Path) -> None:
+        """Write the pending update of `path` now, if there is one."""
+        with self.__flush_lock:
+            with self.__lock:
+                entry = self.__dirty.pop(path, None)
+            if entry is not None:
+                _write(path, *entry)
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__stopped.set()
+        self.__wakeup.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__finalizer()
+
+    def __ensure_started(self) -> None:
+        if self.__thread is None:
+            self.__thread = threading.Thread(
+                target=self.__run, args=(weakref.ref(self), self.__wakeup, self.__stopped, self.flush_interval),
+                name="write-behind-persister", daemon=True
+            )
+            self.__thread.start()
+
+    @staticmethod
+    def __run(
+            reference: weakref.ref[WriteBehindPersister], wakeup: threading.Event, stopped: threading.Event,
+            flush_interval: float
+    ) -> None:
+        # Holds the persister only while flushing, so the thread does not keep it alive.
+        while not stopped.is_set():
+            wakeup.wait(flush_interval)
+            wakeup.clear()
+            persister = reference()
+            if persister is None:
+                return
+            persister.flush()
+            del persister
@@ -1,20 +1,34 @@
 from __future__ import annotations
 import logging
+import time
+from datetime import timedelta
 
-from api import PredictionModelLoader
+from api import PredictionModel, PredictionModelLoader
 from api.interfaces.market_data import MarketData
 from src.entities.asset_entity import AssetEntity
+from src.helpers.joblib_helper import JoblibHelper
 from src.providers.history_data_provider import HistoryDataProvider
+from src.streaming.bar_aggregator import BarAggregator
 from src.training.random_forest.random_forest_classifier_model import RandomForestClassifierModel
-from src.training.random_forest.random_forest_classifier_trainer import RandomForestClassifierTrainer
+from src.entities.training_result_entity import TrainingResult
+from src.metrics.metrics_registry import metrics
+from src.training.retraining_scheduler import RetrainingScheduler
+from src.training.training_cache import TrainingCache
+from src.training.training_profiler import TrainingProfiler
+from src.training.training_scheduler import TrainingScheduler
 
 
 class PredictionEngine:
     def __init__(
             self, assets: list[AssetEntity], data_provider: HistoryDataProvider,
-            prediction_dir: str, prediction_model_loader: PredictionModelLoader
+            prediction_dir: str, prediction_model_loader: PredictionModelLoader,
+            hot_assets: list[str] | None = None, bar_aggregator: BarAggregator | None = None
     ):
         self.asset_lookup: dict[str, AssetEntity] = {}
+        self.training_results: list[TrainingResult] = []
+        self.retraining_scheduler: RetrainingScheduler | None = None
+        self.hot_assets = [ticker_symbol.lower() for ticker_symbol in hot_assets or []]
+        self.bar_aggregator = bar_aggregator if bar_aggregator is not None else BarAggregator()
         self.prediction_model_loader = prediction_model_loader
         self.data_provider: HistoryDataProvider = data_provider
         self.assets = assets
@@ -24,46 +38,151 @@ class PredictionEngine:
     def init_application(self):
         self.load_models()
         for asset in self.assets:
-            self.asset_lookup[asset.ticker_symbol] = asset
+            self.asset_lookup[asset.ticker_symbol.lower()] = asset
 
-    # def start_training(self):
-    #     try:
-    #         schedule.every().week.do(self.train_assets_model())
-    #         # schedule.every().day.do(self.update_data_source(assets))
-    #     except Exception as exc:
-    #         logging.error(["Error occurred initializing application. ->", exc])
+    def start_training(self, interval: timedelta = timedelta(weeks=1), **training_options) -> RetrainingScheduler:
+        """Retrain all assets every `interval` in the background, hot-swapping models as they pass validation."""
+        self.stop_training()
+        self.retraining_scheduler = RetrainingScheduler(
+            self.assets, self.data_provider, self.prediction_model_loader,
+            str(RandomForestClassifierModel.__name__).lower(), interval=interval, **training_options
+        )
+        self.retraining_scheduler.start()
+        return self.retraining_scheduler
+
+    def stop_training(self) -> None:
+        if self.retraining_scheduler is not None:
+            self.retraining_scheduler.stop()
+            self.retraining_scheduler = None
 
     def set_data_provider(self, data_provider: HistoryDataProvider):
         self.data_provider = data_provider
 
-    def train_assets_model(self) -> PredictionEngine:
+    def train_assets_model(
+            self, total_cores: int | None = None, max_parallel_assets: int | None = None,
+            training_cache: TrainingCache | None = None, profiler: TrainingProfiler | None = None
+    ) -> PredictionEngine:
+        scheduler = TrainingScheduler(
+            self.prediction_dir, self.data_provider,
+            total_cores=total_cores, max_parallel_assets=max_parallel_assets, training_cache=training_cache,
+            profiler=profiler
+        )
+        self.training_results = scheduler.train(self.assets)
+        return self
+
+    def refresh_assets_model(
+            self, n_new_trees: int | None = None, max_estimators: int | None = None
+    ) -> PredictionEngine:
+        """Refresh every asset's model on its recent window and save it, without rerunning the search."""
         for asset in self.assets:
-            preprocessor = self.data_provider.get_preprocessor()
-            trainer = RandomForestClassifierTrainer(
-                self.prediction_dir, self.data_provider, preprocessor
-            )
-            trainer.train_and_save(asset)
+            try:
+                prediction_model = self.__get_prediction_model(asset)
+                prediction_model.refresh(n_new_trees, max_estimators)
+                self.__save_model(asset, prediction_model)
+            except Exception as exc:
+                logging.error(["Error occurred refreshing model. ->", asset.name, exc])
         return self
 
+    def __save_model(self, asset: AssetEntity, prediction_model: PredictionModel) -> None:
+        model_class_name = prediction_model.__class__.__name__.lower()
+        JoblibHelper.dump(prediction_model, self.prediction_model_loader.model_path(asset, model_class_name))
+
     def load_models(self) -> None:
+        model_class_name = str(RandomForestClassifierModel.__name__).lower()
+        if self.prediction_model_loader.lazy:
+            hot_assets = [asset for asset in self.assets if asset.ticker_symbol.lower() in self.hot_assets]
+            self.prediction_model_loader.prefetch(hot_assets, model_class_name)
+            return
         for asset in self.assets:
             try:
-                self.prediction_model_loader.load_model(asset, str(RandomForestClassifierModel.__name__).lower())
+                self.prediction_model_loader.load_model(asset, model_class_name)
             except Exception as exc:
                 logging.error(["Error occurred loading model. ->", exc])
 
-    def predict(self, ticker_symbol: str, current_data: MarketData) -> int:
+    def __get_asset(self, ticker_symbol: str) -> AssetEntity:
         asset = self.asset_lookup.get(ticker_symbol.lower())
         if not asset:
             raise ValueError(f"Asset with ticker symbol {ticker_symbol} not found in prediction engine.")
-        prediction_model = self.prediction_model_loader.get_model(
-            asset, str(RandomForestClassifierModel.__name__).lower()
-        )
+        return asset
+
+    def __get_prediction_model(self, asset: AssetEntity) -> PredictionModel:
+        model_class_name = str(RandomForestClassifierModel.__name__).lower()
+        with metrics.timer(
+                "prediction_stage_seconds", stage="model_lookup", asset=asset.ticker_symbol.lower(),
+                model=model_class_name
+        ):
+            prediction_model = self.prediction_model_loader.get_model(asset, model_class_name)
         if prediction_model:
-            predictions = prediction_model.predict([current_data])
-            return predictions[0]
+            return prediction_model
 
         raise ValueError(
-            f"Model for {ticker_symbol} ticker not found in prediction engine. "
+            f"Model for {asset.ticker_symbol} ticker not found in prediction engine. "
             f"Load assets model and try again."
         )
+
+    def predict(self, ticker_symbol: str, current_data: MarketData) -> int:
+        return self.predict_batch([(ticker_symbol, current_data)])[0]
+
+    def predict_batch(self, requests: list[tuple[str, MarketData]]) -> list[int]:
+        """
+        Score many (ticker_symbol, MarketData) pairs; the result is aligned with `requests`.
+
+        Pairs are grouped per asset, keeping their relative order, so several ticks for the
+        same asset are folded into its window in sequence and scored with one model call.
+        With the metrics registry enabled, each asset's call is recorded in the
+        ``prediction_latency_seconds`` histogram and the ``predictions_total`` counter.
+        """
+        grouped_requests: dict[str, tuple[AssetEntity, list[int], list[MarketData]]] = {}
+        for position, (ticker_symbol, current_data) in enumerate(requests):
+            asset = self.__get_asset(ticker_symbol)
+            _, positions, market_data = grouped_requests.setdefault(
+                asset.ticker_symbol.lower(), (asset, [], [])
+            )
+            positions.append(position)
+            market_data.append(current_data)
+
+        predictions: list[int | None] = [None] * len(requests)
+        for asset, positions, market_data in grouped_requests.values():
+            started = time.perf_counter()
+            prediction_model = self.__get_prediction_model(asset)
+            asset_predictions = prediction_model.predict(market_data)
+            if metrics.enabled:
+                labels = {"asset": asset.ticker_symbol.lower(), "model": prediction_model.__class__.__name__.lower()}
+                metrics.observe("prediction_latency_seconds", time.perf_counter() - started, **labels)
+                metrics.increment("predictions_total", len(market_data), **labels)
+            for position, prediction in zip(positions, asset_predictions):
+                predictions[position] = prediction
+        return predictions
+
+    def ingest_tick(self, ticker_symbol: str, price: float, volume: float, timestamp: float) -> list[int]:
+        """
+        Aggregate a raw trade into the asset's current bar.
+
+        Only bars the trade closed are folded into the model window, so the features
+        move once per bar rather than once per trade; their predictions are returned,
+        oldest first, and the list is empty while the bar is still open.
+        """
+        asset = self.__get_asset(ticker_symbol)
+        closed_bars = self.bar_aggregator.add(asset.ticker_symbol, price, volume, timestamp)
+        if not closed_bars:
+            return []
+        return self.predict_batch([(ticker_symbol, closed_bar) for closed_bar in closed_bars])
+
+    def close_due_bars(self, now: float) -> dict[str, list[int]]:
+        """Close every bar whose interval ended before `now` and predict on it, per ticker symbol."""
+        predictions = {}
+        for asset in self.assets:
+            closed_bars = self.bar_aggregator.close_due(asset.ticker_symbol, now)
+            if closed_bars:
+                predictions[asset.ticker_symbol] = self.predict_batch(
+                    [(asset.ticker_symbol, closed_bar) for closed_bar in closed_bars]
+                )
+        return predictions
+
+    def predict_provisional(self, ticker_symbol: str) -> int | None:
+        """Score the asset's still-open bar without adding it to the window; None before its first trade."""
+        asset = self.__get_asset(ticker_symbol)
+        provisional_bar = self.bar_aggregator.provisional(asset.ticker_symbol)
+        if provisional_bar is None:
+            return None
+        return self.__get_prediction_model(asset).predict([provisional_bar], update=False)[0]
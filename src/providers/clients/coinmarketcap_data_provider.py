@@ -1,33 +1,231 @@
-from datetime import datetime
-from typing import Optional
+from __future__ import annotations
 
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import requests
 from pandas import DataFrame
+from requests.adapters import HTTPAdapter
 
+from src.entities.asset_entity import AssetEntity
+from src.helpers.token_bucket_helper import TokenBucket
+from src.persistence.partitioned_history_store import PartitionedHistoryStore
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
 from src.providers.preprocessors.coinmarketcap_preprocessor import (
     CoinMarketCapPreProcessor,
 )
 from src.providers.preprocessor import PreProcessor
 from src.providers.history_data_provider import HistoryDataProvider
 
+logger = logging.getLogger(__name__)
+
 
 class CoinMarketCapDataProvider(HistoryDataProvider):
+    """
+    Daily OHLCV history from the CoinMarketCap API, kept in the local history store.
+
+    Fetched bars are appended to the same partitioned store `LocalStorageDataProvider`
+    reads from `directory`, and reads are always served from that store, so a fetch
+    only asks the API for what is missing: from the newest stored bar, or from
+    `history_start` for a new asset. Long ranges are split into pages of `page_days`
+    and all pages of all requested assets are fetched concurrently on one pooled
+    session by `max_workers` threads. Every request, retries included, takes a token
+    from a bucket refilled at `requests_per_minute`; 429 and 5xx responses and
+    connection errors are retried `max_retries` times with jittered exponential
+    backoff, honouring ``Retry-After``.
 
-    def __init__(self, api_url: str, api_key: str):
+    Every stored bar carries its asset's id in the `name` column, the same value live
+    rows are built with, taken from `assets` by ticker symbol; tickers not in `assets`
+    fall back to the id CoinMarketCap reports for them.
+    """
+    HISTORY_PATH = "/v2/cryptocurrency/ohlcv/historical"
+    HISTORY_START = datetime(2013, 4, 28, tzinfo=timezone.utc)
+    # CoinMarketCap id of USD, the currency quotes are converted to.
+    USD_CONVERT_ID = 2781
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    COLUMNS = (
+        "timeOpen", "timeClose", "timeHigh", "timeLow", "name", "open", "high", "low", "close", "volume",
+        "marketCap", "timestamp"
+    )
+
+    def __init__(
+            self, api_url: str, api_key: str, directory: str = "./storage/datasets", *,
+            assets: list[AssetEntity] | None = None, history_store: PartitionedHistoryStore | None = None, max_workers: int = 8,
+            requests_per_minute: float = 30, burst: float | None = None, max_retries: int = 5,
+            backoff: float = 1.0, max_backoff: float = 60.0, page_days: int = 365, timeout: float = 30.0,
+            history_start: datetime = HISTORY_START
+    ):
         self.api_url = api_url
         self.api_key = api_key
+        self.local_storage = LocalStorageDataProvider(directory, history_store)
+        self.asset_ids = {asset.ticker_symbol.upper(): asset.id for asset in assets or []}
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(requests_per_minute / 60, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.page_days = page_days
+        self.timeout = timeout
+        self.history_start = self.__to_utc(history_start)
+        self.session = requests.Session()
+        self.session.headers.update({"X-CMC_PRO_API_KEY": api_key, "Accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    @staticmethod
+    def __to_utc(value: datetime) -> datetime:
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+    @staticmethod
+    def __format_time(value: datetime) -> str:
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def __get_start(self, ticker_symbol: str) -> datetime:
+        last_timestamp = self.local_storage.last_timestamp(ticker_symbol)
+        if last_timestamp is None:
+            return self.history_start
+        return datetime.fromtimestamp(last_timestamp + 1, tz=timezone.utc)
+
+    def __get_pages(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        pages, step = [], timedelta(days=self.page_days)
+        while start < end:
+            pages.append((start, min(start + step, end)))
+            start += step
+        return pages
+
+    def __get_delay(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        return min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def __request(self, params: dict) -> dict:
+        url = f"{self.api_url.rstrip('/')}{self.HISTORY_PATH}"
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self.max_retries:
+                    raise
+                reason, delay = exc, self.__get_delay(attempt, None)
+            else:
+                if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                reason, delay = response.status_code, self.__get_delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(
+                "Retrying CoinMarketCap request: symbol=%s, attempt=%d, reason=%s, delay=%.2fs.",
+                params["symbol"], attempt + 1, reason, delay
+            )
+            time.sleep(delay)
+        raise RuntimeError("Unreachable: the last attempt either returns or raises.")
+
+    def __fetch_page(self, ticker_symbol: str, start: datetime, end: datetime) -> DataFrame:
+        payload = self.__request({
+            "symbol": ticker_symbol.upper(),
+            "time_start": self.__format_time(start),
+            "time_end": self.__format_time(end),
+            "time_period": "daily",
+            "interval": "daily",
+            "convert_id": self.USD_CONVERT_ID,
+        })
+        data = payload["data"]
+        entry = data.get(ticker_symbol.upper(), data)
+        if isinstance(entry, list):
+            entry = entry[0] if entry else {"quotes": []}
+        asset_id = self.asset_ids.get(ticker_symbol.upper(), entry.get("id"))
+        records = []
+        for quote in entry.get("quotes", []):
+            usd = quote["quote"][str(self.USD_CONVERT_ID)]
+            records.append({
+                "timeOpen": quote["time_open"], "timeClose": quote["time_close"],
+                "timeHigh": quote["time_high"], "timeLow": quote["time_low"], "name": asset_id,
+                "open": usd["open"], "high": usd["high"], "low": usd["low"], "close": usd["close"],
+                "volume": usd["volume"], "marketCap": usd["market_cap"],
+                "timestamp": usd.get("timestamp", quote["time_close"]),
+            })
+        return DataFrame.from_records(records, columns=list(self.COLUMNS))
+
+    def fetch_ticker_data(
+            self, ranges: dict[str, tuple[datetime, datetime]]
+    ) -> dict[str, DataFrame | Exception]:
+        """
+        Fetch `ranges` (ticker symbol to UTC start and end) concurrently, without storing.
+
+        A ticker whose pages could not all be fetched maps to the exception instead.
+        """
+        pages = [
+            (ticker_symbol, start, end)
+            for ticker_symbol, (range_start, range_end) in ranges.items()
+            for start, end in self.__get_pages(self.__to_utc(range_start), self.__to_utc(range_end))
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="coinmarketcap") as executor:
+            futures = [(ticker_symbol, executor.submit(self.__fetch_page, ticker_symbol, start, end))
+                       for ticker_symbol, start, end in pages]
+
+        frames: dict[str, list[DataFrame]] = {ticker_symbol: [] for ticker_symbol in ranges}
+        results: dict[str, DataFrame | Exception] = {}
+        for ticker_symbol, future in futures:
+            if future.exception() is not None:
+                results.setdefault(ticker_symbol, future.exception())
+            else:
+                frames[ticker_symbol].append(future.result())
+        for ticker_symbol, ticker_frames in frames.items():
+            if ticker_symbol not in results:
+                results[ticker_symbol] = pd.concat(ticker_frames, ignore_index=True) if ticker_frames \
+                    else DataFrame(columns=list(self.COLUMNS))
+        return results
+
+    def refresh_tickers(
+            self, ticker_symbols: list[str], to_date: datetime | None = None
+    ) -> dict[str, DataFrame]:
+        """
+        Top up the stored history of every ticker concurrently and return the rows written.
+
+        Tickers that fail are logged and left out of the result.
+        """
+        end = self.__to_utc(to_date) if to_date is not None else datetime.now(timezone.utc)
+        fetched = self.fetch_ticker_data(
+            {ticker_symbol: (self.__get_start(ticker_symbol), end) for ticker_symbol in ticker_symbols}
+        )
+        written = {}
+        for ticker_symbol, market_data in fetched.items():
+            if isinstance(market_data, Exception):
+                logger.error("Failed fetching CoinMarketCap history: symbol=%s, error=%s.", ticker_symbol, market_data)
+                continue
+            written[ticker_symbol] = self.update_ticker_data(ticker_symbol, market_data) if len(market_data) \
+                else market_data
+        return written
 
     def get_ticker_data(
             self,
             ticker_symbol: str,
-            from_date: Optional[datetime] = None,
-            to_date: Optional[datetime] = None,
-    ):
-        pass
+            from_date: datetime | None = None,
+            to_date: datetime | None = None,
+    ) -> DataFrame:
+        end = self.__to_utc(to_date) if to_date is not None else datetime.now(timezone.utc)
+        market_data = self.fetch_ticker_data({ticker_symbol: (self.__get_start(ticker_symbol), end)})[ticker_symbol]
+        if isinstance(market_data, Exception):
+            raise market_data
+        if len(market_data):
+            self.update_ticker_data(ticker_symbol, market_data)
+        return self.local_storage.get_ticker_data(ticker_symbol, from_date, to_date)
 
     def update_ticker_data(
             self, ticker_symbol: str, market_data: DataFrame
     ) -> DataFrame:
-        pass
+        return self.local_storage.update_ticker_data(ticker_symbol, market_data)
 
     def get_preprocessor(self) -> PreProcessor:
         return CoinMarketCapPreProcessor()
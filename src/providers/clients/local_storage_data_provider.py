@@ -3,43 +3,50 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import pandas as pd
 from pandas import DataFrame
 
+from src.helpers.dataframe_helper import DataFrameHelper
+from src.persistence.formats.csv_storage_format import CsvStorageFormat
+from src.persistence.partitioned_history_store import PartitionedHistoryStore
+from src.persistence.table_store import TableStore
 from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
 from src.providers.preprocessor import PreProcessor
 from src.providers.history_data_provider import HistoryDataProvider
 
 
 class LocalStorageDataProvider(HistoryDataProvider):
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, history_store: Optional[PartitionedHistoryStore] = None):
         self.directory = Path(os.getcwd()).joinpath(directory)
+        self.history_store = history_store if history_store is not None else PartitionedHistoryStore(
+            self.directory.joinpath("coinmarketcap/history"),
+            legacy_store=TableStore(
+                legacy_format=CsvStorageFormat(sep=";"), on_import=DataFrameHelper.normalize_timestamp
+            )
+        )
+
+    @staticmethod
+    def __get_table_name(ticker_symbol: str) -> str:
+        return f"{ticker_symbol.lower()}-usd"
 
     def get_ticker_data(
             self, ticker_symbol: str,
-            _from_date: Optional[datetime] = None,
-            _to_date: Optional[datetime] = None
+            from_date: Optional[datetime] = None,
+            to_date: Optional[datetime] = None
     ) -> DataFrame:
-        file_path = f"{self.directory}/coinmarketcap/history/{ticker_symbol.lower()}-usd.csv"
-
-        if os.path.exists(file_path):
-            history = pd.read_csv(file_path, sep=";")
-            return history
+        table_name = self.__get_table_name(ticker_symbol)
 
-        raise FileNotFoundError(f"Data source for ticker: {ticker_symbol} does not exist in: {file_path}.")
+        if self.history_store.exists(table_name):
+            return self.history_store.read(table_name, from_date, to_date)
 
-    def update_ticker_data(self, ticker_symbol: str, market_data: DataFrame) -> DataFrame:
-        file_path = f"{self.directory}/coinmarketcap/history/{ticker_symbol.lower()}-usd.csv"
+        raise FileNotFoundError(
+            f"Data source for ticker: {ticker_symbol} does not exist in: {self.history_store.directory}."
+        )
 
-        if os.path.exists(file_path):
-            existing_data = pd.read_csv(file_path, sep=";")
-            updated_data = pd.concat([market_data, existing_data], ignore_index=True)
-            updated_data = updated_data.drop_duplicates()
-        else:
-            updated_data = market_data
+    def last_timestamp(self, ticker_symbol: str) -> Optional[int]:
+        return self.history_store.last_timestamp(self.__get_table_name(ticker_symbol))
 
-        updated_data.to_csv(file_path, sep=";", index=False)
-        return updated_data
+    def update_ticker_data(self, ticker_symbol: str, market_data: DataFrame) -> DataFrame:
+        return self.history_store.append(self.__get_table_name(ticker_symbol), market_data)
 
     def get_preprocessor(self) -> PreProcessor:
         return CoinMarketCapPreProcessor()
@@ -0,0 +1,18 @@
+import abc
+
+
+class FeatureState(abc.ABC):
+    """
+    Incremental counterpart of a PreProcessor: keeps just enough running state to
+    produce the feature row for the newest record in constant time.
+    """
+
+    @abc.abstractmethod
+    def peek(self, record: dict) -> dict:
+        """Return the feature row `record` would produce, without committing it."""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def push(self, record: dict) -> dict:
+        """Commit `record` to the state and return its feature row."""
+        raise NotImplementedError()
@@ -6,3 +6,10 @@ class PreProcessor(abc.ABC):
     @abc.abstractmethod
     def pre_process_data(self, data: Any):
         raise NotImplementedError()
+
+    def get_config(self) -> dict:
+        """Settings that change the features `pre_process_data` produces."""
+        return {"preprocessor": type(self).__name__}
+
+    def create_feature_state(self, history: Any):
+        raise NotImplementedError("PreProcessor method:`create_feature_state` has not yet been implemented!")
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+
+import numpy as np
+
+from src.helpers.rolling_statistics_helper import divide, ExponentialMean, RollingCount, RollingMean
+from src.providers.feature_state import FeatureState
+
+
+class CoinMarketCapFeatureState(FeatureState):
+    """
+    Incremental version of `CoinMarketCapPreProcessor.pre_process_data`.
+
+    Records are expected oldest to newest. The feature row returned for a record is
+    identical to the last row the batch preprocessor would compute over the same
+    sequence, but costs O(len(horizons)) instead of a full recompute.
+    """
+    RAW_COLUMNS = ("name", "open", "high", "low", "close", "volume", "timestamp")
+    MOMENTUM_PERIODS = (3, 6, 12)
+
+    def __init__(self, horizons: list[int]):
+        self.horizons = list(horizons)
+        self.__closes = deque(maxlen=max(self.MOMENTUM_PERIODS))
+        self.__ema_10 = ExponentialMean(10)
+        self.__ema_20 = ExponentialMean(20)
+        self.__gains = RollingMean(14)
+        self.__losses = RollingMean(14)
+        self.__sma = {window: RollingMean(window) for window in (3, 6, 12)}
+        self.__close_means = {horizon: RollingMean(horizon, min_periods=1) for horizon in self.horizons}
+        self.__trends = {horizon: RollingCount(horizon - 1) for horizon in self.horizons}
+
+    def __compute(self, record: dict, commit: bool) -> dict:
+        close = float(record["close"])
+        previous_close = self.__closes[-1] if self.__closes else math.nan
+        diff = close - previous_close
+        previous_target = int(close > previous_close)
+
+        def step(statistic, value):
+            return statistic.push(value) if commit else statistic.peek(value)
+
+        features = {column: record[column] for column in self.RAW_COLUMNS}
+        features["ema_10"] = step(self.__ema_10, close)
+        features["ema_20"] = step(self.__ema_20, close)
+        gain = step(self.__gains, diff if math.isnan(diff) else max(diff, 0.0))
+        loss = step(self.__losses, diff if math.isnan(diff) else min(diff, 0.0))
+        features["rsi_14"] = 100 - divide(100, 1 + divide(gain, -loss))
+        features["return"] = divide(close, previous_close) - 1
+        features["log_return"] = float(np.log(divide(close, previous_close)))
+
+        sma = {window: step(statistic, close) for window, statistic in self.__sma.items()}
+        for window, value in sma.items():
+            features[f"sma_{window}"] = value
+        features["price_sma6"] = divide(close, sma[6])
+        features["sma3_sma12"] = divide(sma[3], sma[12])
+
+        for period in self.MOMENTUM_PERIODS:
+            past_close = self.__closes[-period] if len(self.__closes) >= period else math.nan
+            features[f"mom_{period}"] = divide(close, past_close) - 1
+
+        for horizon in self.horizons:
+            features[f"close_Ratio_{horizon}"] = divide(close, step(self.__close_means[horizon], close))
+            if self.__closes:
+                features[f"trend_{horizon}"] = float(step(self.__trends[horizon], previous_target))
+            else:
+                features[f"trend_{horizon}"] = 0.0
+
+        if commit:
+            self.__closes.append(close)
+        return features
+
+    def peek(self, record: dict) -> dict:
+        return self.__compute(record, commit=False)
+
+    def push(self, record: dict) -> dict:
+        return self.__compute(record, commit=True)
@@ -1,14 +1,61 @@
+from __future__ import annotations
+
 import logging
 
 import numpy as np
-from pandas import DataFrame
+import pandas as pd
+from pandas import DataFrame, Series
 
 from src.helpers.dataframe_helper import DataFrameHelper
 from src.providers.preprocessor import PreProcessor
+from src.providers.preprocessors.coinmarketcap_feature_state import CoinMarketCapFeatureState
 
 
 class CoinMarketCapPreProcessor(PreProcessor):
     horizons = [10, 50, 100, 250, 500, 1000]
+    # Bump whenever the engineered features in `pre_process_data` change.
+    feature_set_version = 1
+
+    @staticmethod
+    def _close_features(close: Series | DataFrame) -> dict[str, Series | DataFrame]:
+        """
+        Features derived from the close price, in column order.
+
+        `close` is either one asset's Series or a (time x assets) frame; every operation
+        works column by column, so both give the same values for an asset.
+        """
+        features = {}
+        tomorrow = close.shift(-1)
+        features["tomorrow"] = tomorrow
+        features["target"] = ((tomorrow > close) & tomorrow.notna()).astype(int)
+
+        features["ema_10"] = close.ewm(span=10, adjust=False).mean()
+        features["ema_20"] = close.ewm(span=20, adjust=False).mean()
+        features["rsi_14"] = 100 - (100 / (1 + (close.diff().clip(lower=0).rolling(14).mean() /
+                                                (-close.diff().clip(upper=0).rolling(14).mean()))))
+        features["return"] = close.pct_change(fill_method=None)
+        features["log_return"] = np.log(close / close.shift(1))
+
+        # Trend
+        for w in (3, 6, 12):
+            features[f"sma_{w}"] = close.rolling(w).mean()
+        features["price_sma6"] = close / features["sma_6"]
+        features["sma3_sma12"] = features["sma_3"] / features["sma_12"]
+
+        # Momentum
+        features["mom_3"] = close.pct_change(3, fill_method=None)
+        features["mom_6"] = close.pct_change(6, fill_method=None)
+        features["mom_12"] = close.pct_change(12, fill_method=None)
+        return features
+
+    @staticmethod
+    def _horizon_features(
+            close: Series | DataFrame, target: Series | DataFrame, horizon: int
+    ) -> dict[str, Series | DataFrame]:
+        rolling_averages = close.rolling(window=horizon, min_periods=1).mean()
+        rolling_sums = target.rolling(window=horizon, min_periods=1).sum()
+        # = .shift(1)
+        return {f"close_Ratio_{horizon}": close / rolling_averages, f"trend_{horizon}": rolling_sums}
 
     @classmethod
     def get_horizon(
@@ -16,57 +63,88 @@ class CoinMarketCapPreProcessor(PreProcessor):
     ) -> tuple[DataFrame, list]:
         for horizon in cls.horizons:
             if horizon < training_data.shape[0]:
-                rolling_averages = (
-                    training_data["close"].rolling(window=horizon, min_periods=1).mean()
-                )
-                rolling_sums = (
-                    training_data["target"].rolling(window=horizon, min_periods=1).sum()
-                )
-
-                ratio_column = f"close_Ratio_{horizon}"
-                training_data[ratio_column] = training_data["close"] / rolling_averages
-
-                trend_column = f"trend_{horizon}"
-                training_data[trend_column] = rolling_sums
-                # = .shift(1)
-
-                predictors.extend([ratio_column, trend_column])
+                horizon_features = cls._horizon_features(training_data["close"], training_data["target"], horizon)
+                for column, values in horizon_features.items():
+                    training_data[column] = values
+                predictors.extend(horizon_features)
             else:
                 logging.warning("Horizon %s exceeds data size.", horizon)
         return training_data, predictors
 
+    @staticmethod
+    def __select_predictors(columns) -> list[str]:
+        return [
+            col for col in columns
+            if col not in {"timeOpen", "timeClose", "timeHigh", "timeLow", "marketCap", "tomorrow", "target"}
+        ]
+
     def pre_process_data(
             self, data: DataFrame
     ) -> tuple[DataFrame, list[str], DataFrame]:
         DataFrameHelper.normalize_timestamp(data)
-        data["tomorrow"] = data["close"].shift(-1)
-        data["target"] = (
-                (data["tomorrow"] > data["close"]) & data["tomorrow"].notna()
-        ).astype(int)
-
-        data["ema_10"] = data["close"].ewm(span=10, adjust=False).mean()
-        data["ema_20"] = data["close"].ewm(span=20, adjust=False).mean()
-        data["rsi_14"] = 100 - (100 / (1 + (data["close"].diff().clip(lower=0).rolling(14).mean() /
-                                            (-data["close"].diff().clip(upper=0).rolling(14).mean()))))
-        data["return"] = data["close"].pct_change()
-        data["log_return"] = np.log(data["close"] / data["close"].shift(1))
+        for column, values in self._close_features(data["close"]).items():
+            data[column] = values
 
-        # Trend
-        for w in (3, 6, 12):
-            data[f"sma_{w}"] = data["close"].rolling(w).mean()
-        data["price_sma6"] = data["close"] / data["sma_6"]
-        data["sma3_sma12"] = data["sma_3"] / data["sma_12"]
-
-        # Momentum
-        data["mom_3"] = data["close"].pct_change(3)
-        data["mom_6"] = data["close"].pct_change(6)
-        data["mom_12"] = data["close"].pct_change(12)
-
-        predictors_copy = [
-            col for col in data.columns
-            if col not in {"timeOpen", "timeClose", "timeHigh", "timeLow", "marketCap", "tomorrow", "target"}
-        ]
+        predictors_copy = self.__select_predictors(data.columns)
         clean_data, predictors = self.get_horizon(data, predictors_copy)
         target = clean_data.target
         print(predictors)
         return clean_data, predictors, target
+
+    def pre_process_panel(
+            self, data: DataFrame, asset_column: str = "name"
+    ) -> tuple[DataFrame, list[str], Series]:
+        """
+        `pre_process_data` for many assets in one pass.
+
+        `data` is a long frame with one row per (`asset_column`, timestamp), such as the
+        concatenated CoinMarketCap histories keyed by their ``name`` id. Rows are
+        laid out as a (bar index x assets) matrix, each asset in its own column from
+        its first bar, and every feature is computed once over the whole matrix, which
+        gives the same values as processing each asset on its own. A horizon is only
+        used when every asset has more rows than it, so all assets share the
+        predictors. Returns the frame sorted by asset and timestamp.
+        """
+        data = DataFrameHelper.normalize_timestamp(data.copy())
+        data = data.sort_values(by=[asset_column, "timestamp"], kind="stable", ignore_index=True)
+        codes, assets = pd.factorize(data[asset_column])
+        positions = data.groupby(asset_column, sort=False).cumcount().to_numpy()
+        lengths = np.bincount(codes, minlength=len(assets))
+
+        shortest, longest = (lengths.min(), lengths.max()) if len(lengths) else (0, 0)
+        close_matrix = np.full((longest, len(assets)), np.nan)
+        close_matrix[positions, codes] = data["close"].to_numpy(dtype=np.float64)
+        close = DataFrame(close_matrix)
+
+        def to_rows(values: DataFrame) -> np.ndarray:
+            return values.to_numpy()[positions, codes]
+
+        features = self._close_features(close)
+        for column, values in features.items():
+            data[column] = to_rows(values)
+        predictors = self.__select_predictors(data.columns)
+
+        for horizon in self.horizons:
+            if horizon < shortest:
+                horizon_features = self._horizon_features(close, features["target"], horizon)
+                for column, values in horizon_features.items():
+                    data[column] = to_rows(values)
+                predictors.extend(horizon_features)
+            else:
+                logging.warning("Horizon %s exceeds data size of the shortest asset.", horizon)
+        return data, predictors, data.target
+
+    def get_config(self) -> dict:
+        return {
+            **super().get_config(),
+            "horizons": list(self.horizons),
+            "momentum_periods": list(CoinMarketCapFeatureState.MOMENTUM_PERIODS),
+            "feature_set_version": self.feature_set_version,
+        }
+
+    def create_feature_state(self, history: DataFrame) -> CoinMarketCapFeatureState:
+        feature_state = CoinMarketCapFeatureState(self.horizons)
+        columns = list(CoinMarketCapFeatureState.RAW_COLUMNS)
+        for record in history[columns].to_dict("records"):
+            feature_state.push(record)
+        return feature_state
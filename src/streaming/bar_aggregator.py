@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Sequence
+
+from api.interfaces.market_data import MarketData
+
+NO_BARS: tuple[MarketData, ...] = ()
+
+
+class _BarState:
+    __slots__ = ("start", "open", "high", "low", "close", "volume")
+
+    def __init__(self, start: int, price: float, volume: float):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+
+
+class BarAggregator:
+    """
+    Folds raw trades into fixed-interval OHLCV bars per asset.
+
+    Each asset keeps one open bar, so a tick costs O(1): it either updates the open
+    bar or closes it and starts the next one. Bars are aligned to `origin` and
+    stamped with their last second, like the ``timeClose`` of the daily history.
+    Closed bars are returned by `add` (and `close_due`) exactly once, oldest first;
+    the bar still being built is available from `provisional`. With `fill_gaps`,
+    intervals without trades are emitted as flat, zero-volume bars at the previous
+    close so the model window keeps one row per period. Ticks older than the open
+    bar are dropped and counted in `late_ticks`.
+    """
+
+    def __init__(self, interval: int = 86400, origin: int = 0, fill_gaps: bool = True):
+        if interval <= 0:
+            raise ValueError(f"Bar interval must be positive, got: {interval}.")
+        self.interval = int(interval)
+        self.origin = int(origin)
+        self.fill_gaps = fill_gaps
+        self.late_ticks = 0
+        self.__bars: dict[str, _BarState] = {}
+        # (start of the next bar, last close) of assets whose bar was closed by `close_due`.
+        self.__idle: dict[str, tuple[int, float]] = {}
+        self.__lock = threading.Lock()
+
+    def bar_start(self, timestamp: float) -> int:
+        return self.origin + math.floor((timestamp - self.origin) / self.interval) * self.interval
+
+    def __to_market_data(self, state: _BarState) -> MarketData:
+        return MarketData(
+            volume=str(state.volume), high_price=str(state.high), low_price=str(state.low),
+            close_price=str(state.close), timestamp=state.start + self.interval - 1, open_price=str(state.open)
+        )
+
+    def __fill(self, start: int, until: int, close: float) -> list[MarketData]:
+        if not self.fill_gaps:
+            return []
+        return [
+            self.__to_market_data(_BarState(gap_start, close, 0.0))
+            for gap_start in range(start, until, self.interval)
+        ]
+
+    def __roll(self, state: _BarState, until: int) -> list[MarketData]:
+        """Close the bar in `state` and any empty intervals before the bar starting at `until`."""
+        return [self.__to_market_data(state), *self.__fill(state.start + self.interval, until, state.close)]
+
+    def add(self, ticker_symbol: str, price: float, volume: float, timestamp: float) -> Sequence[MarketData]:
+        """Add one trade and return the bars it closed, usually none."""
+        key = ticker_symbol.lower()
+        start = self.bar_start(timestamp)
+        with self.__lock:
+            state = self.__bars.get(key)
+            if state is None:
+                idle = self.__idle.get(key)
+                if idle is not None and start < idle[0]:
+                    self.late_ticks += 1
+                    return NO_BARS
+                self.__idle.pop(key, None)
+                self.__bars[key] = _BarState(start, price, volume)
+                return self.__fill(idle[0], start, idle[1]) if idle is not None else NO_BARS
+            if start == state.start:
+                if price > state.high:
+                    state.high = price
+                elif price < state.low:
+                    state.low = price
+                state.close = price
+                state.volume += volume
+                return NO_BARS
+            if start < state.start:
+                self.late_ticks += 1
+                return NO_BARS
+            self.__bars[key] = _BarState(start, price, volume)
+        return self.__roll(state, start)
+
+    def close_due(self, ticker_symbol: str, now: float) -> list[MarketData]:
+        """Close the open bar once `now` is past its interval, for assets that stopped trading."""
+        key = ticker_symbol.lower()
+        start = self.bar_start(now)
+        with self.__lock:
+            state = self.__bars.get(key)
+            if state is None or start <= state.start:
+                return []
+            del self.__bars[key]
+            self.__idle[key] = (start, state.close)
+        return self.__roll(state, start)
+
+    def provisional(self, ticker_symbol: str) -> MarketData | None:
+        """Snapshot of the asset's open bar, or None before its first trade."""
+        with self.__lock:
+            state = self.__bars.get(ticker_symbol.lower())
+            return self.__to_market_data(state) if state is not None else None
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+from pandas import DataFrame
+from sklearn.ensemble import RandomForestClassifier
+
+# Child index sklearn stores for leaf nodes (sklearn.tree._tree.TREE_LEAF).
+TREE_LEAF = -1
+
+
+class CompiledRandomForest:
+    """
+    Flat-array evaluator for a fitted `RandomForestClassifier`.
+
+    Every tree is concatenated into contiguous node arrays (feature, threshold,
+    children, missing-value direction and leaf class fractions) and a batch is
+    walked through all trees at once with vectorised numpy indexing. Inputs are cast
+    to float32 and tree probabilities are summed in estimator order, exactly as
+    sklearn does, so predictions are bit-for-bit identical without its per-call
+    validation and per-estimator dispatch.
+    """
+
+    def __init__(
+            self, feature_names: np.ndarray | None, classes: np.ndarray, roots: np.ndarray,
+            feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+            missing_go_to_left: np.ndarray, leaf_proba: np.ndarray, max_depth: int
+    ):
+        self.feature_names = feature_names
+        self.classes = classes
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_go_to_left = missing_go_to_left
+        self.leaf_proba = leaf_proba
+        self.max_depth = max_depth
+
+    @classmethod
+    def compile(cls, forest: RandomForestClassifier) -> CompiledRandomForest:
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output random forests can be compiled.")
+
+        n_classes = len(forest.classes_)
+        roots, features, thresholds, lefts, rights, missing, probabilities = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int64) + offset
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Leaves point at themselves so every sample can take `max_depth` steps.
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            missing.append(tree.missing_go_to_left.astype(bool))
+
+            probabilities.append(tree.value[:, 0, :n_classes])
+
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            getattr(forest, "feature_names_in_", None), forest.classes_, np.asarray(roots, dtype=np.int64),
+            np.concatenate(features).astype(np.int64), np.concatenate(thresholds),
+            np.concatenate(lefts), np.concatenate(rights), np.concatenate(missing),
+            np.concatenate(probabilities), max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        )
+
+    def __to_array(self, data: DataFrame | np.ndarray) -> np.ndarray:
+        if isinstance(data, DataFrame) and self.feature_names is not None:
+            data = data[self.feature_names]
+        return np.asarray(data, dtype=np.float32).astype(np.float64)
+
+    def apply(self, data: DataFrame | np.ndarray) -> np.ndarray:
+        """Global leaf index reached in every tree, shaped (n_estimators, n_samples)."""
+        features = self.__to_array(data)
+        rows = np.arange(features.shape[0])[np.newaxis, :]
+        nodes = np.repeat(self.roots[:, np.newaxis], features.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            values = features[rows, self.feature[nodes]]
+            go_left = np.where(np.isnan(values), self.missing_go_to_left[nodes], values <= self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, data: DataFrame | np.ndarray) -> np.ndarray:
+        leaf_proba = self.leaf_proba[self.apply(data)]
+        # cumsum adds trees strictly in order, matching sklearn's accumulation.
+        proba = np.cumsum(leaf_proba, axis=0)[-1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, data: DataFrame | np.ndarray) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(data), axis=1), axis=0)
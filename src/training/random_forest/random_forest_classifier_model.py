@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import copy
 import logging
+import threading
+import warnings
+from collections.abc import Callable
 from pathlib import Path
 
-import pandas as pd
+import numpy as np
 from pandas import DataFrame
 from sklearn.ensemble import RandomForestClassifier
 
@@ -12,6 +16,12 @@ from api.interfaces.prediction_model import PredictionModel
 from src.entities.asset_entity import AssetEntity
 from src.factories.dataframe_factory import DataframeFactory
 from src.helpers.dataframe_helper import DataFrameHelper
+from src.helpers.ring_buffer_helper import RingBuffer
+from src.metrics.metrics_registry import metrics
+from src.persistence.table_store import TableStore
+from src.training.random_forest.compiled_random_forest import CompiledRandomForest
+from src.persistence.write_behind_persister import WriteBehindPersister
+from src.providers.feature_state import FeatureState
 from src.providers.preprocessor import PreProcessor
 
 logger = logging.getLogger(__name__)
@@ -26,7 +36,7 @@ class RandomForestClassifierModel(PredictionModel[RandomForestClassifier]):
 
     @property
     def training_subset(self) -> DataFrame:
-        return self.__training_subset[self.feature_names]
+        return self.__training_subset.to_frame()
 
     @property
     def model(self) -> RandomForestClassifier | None:
@@ -37,65 +47,261 @@ class RandomForestClassifierModel(PredictionModel[RandomForestClassifier]):
         return self.__model
 
     def __init__(
-            self, model: RandomForestClassifier, feature_names: list[str],
-            training_subset: DataFrame, asset: AssetEntity, preprocessor: PreProcessor
+            self, model: RandomForestClassifier | None, feature_names: list[str],
+            training_subset: DataFrame, asset: AssetEntity, preprocessor: PreProcessor, *,
+            compiled_model: CompiledRandomForest | None = None
     ):
         super().__init__()
         self.__cache_dir = None
         self.__cache_file = None
+        self.__persister = None
+        self.__store = None
+        self.__window_lock = threading.Lock()
+        self.__state_lock = threading.RLock()
         self.__model = model
+        self.__compiled_model = compiled_model
+        self.__successor = None
         self.__feature_names = feature_names
-        self.__training_subset = training_subset
         self.__preprocessor = preprocessor
+        self.__set_training_subset(training_subset)
         self.asset = asset
 
-    def set_cache_dir(self, cache_dir: str):
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_RandomForestClassifierModel__feature_state"] = None
+        state["_RandomForestClassifierModel__persister"] = None
+        state["_RandomForestClassifierModel__store"] = None
+        state["_RandomForestClassifierModel__successor"] = None
+        if self.__model is not None:
+            # The compiled form is derived; only shared models (see `to_shared`) carry it.
+            state["_RandomForestClassifierModel__compiled_model"] = None
+        # Stored as a frame so the window is always rebuilt into private, writable memory.
+        state["_RandomForestClassifierModel__training_subset"] = self.__snapshot_training_subset()
+        del state["_RandomForestClassifierModel__window_lock"]
+        del state["_RandomForestClassifierModel__state_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        state.setdefault("_RandomForestClassifierModel__feature_state", None)
+        state.setdefault("_RandomForestClassifierModel__persister", None)
+        state.setdefault("_RandomForestClassifierModel__store", None)
+        state.setdefault("_RandomForestClassifierModel__compiled_model", None)
+        state["_RandomForestClassifierModel__successor"] = None
+        state["_RandomForestClassifierModel__window_lock"] = threading.Lock()
+        state["_RandomForestClassifierModel__state_lock"] = threading.RLock()
+        self.__dict__.update(state)
+        if isinstance(self.__training_subset, DataFrame):
+            self.__set_training_subset(self.__training_subset)
+
+    def __set_training_subset(self, training_subset: DataFrame):
+        training_subset = RingBuffer.from_frame(
+            training_subset.sort_values(by="timestamp"), self.MAX_WINDOW_SIZE, self.feature_names
+        )
+        with self.__state_lock, self.__window_lock:
+            self.__training_subset = training_subset
+            self.__feature_state = None
+
+    def adopt_window(self, window: DataFrame) -> None:
+        self.__set_training_subset(window)
+        self.__save_cache()
+
+    def flush_cache(self) -> None:
+        if self.__persister is not None and self.__cache_file:
+            self.__persister.flush_path(self.__cache_file)
+
+    def retire(self, successor: Callable[[], PredictionModel], hand_over_window: bool = False) -> None:
+        """
+        Stop updating this model; `predict` and `fine_tune` are forwarded to ``successor()``.
+
+        Runs under the state lock, so no tick lands in this window afterwards: the pending
+        cache write is flushed first, so a successor reloaded from the cache sees every
+        tick, and with `hand_over_window` the successor adopts the window directly.
+        """
+        with self.__state_lock:
+            self.flush_cache()
+            if hand_over_window:
+                successor().adopt_window(self.__snapshot_training_subset())
+            self.__successor = successor
+
+    def compile(self) -> None:
+        if self.__model is None and self.__compiled_model is not None:
+            return
+        logger.info("Compiling RandomForestClassifierModel for asset: name=%s.", self.asset.name)
+        self.__compiled_model = CompiledRandomForest.compile(self.model)
+
+    def to_shared(self) -> RandomForestClassifierModel:
+        """
+        Copy of this model that carries only the compiled forest.
+
+        Saved with `joblib.dump`, its flat node arrays can be opened with
+        ``joblib.load(..., mmap_mode="r")`` so that every worker process maps the same
+        read-only pages; the window is still rebuilt privately on load. A shared model
+        predicts like the compiled model but cannot be refreshed.
+        """
+        with self.__state_lock:
+            compiled_model = self.__compiled_model or CompiledRandomForest.compile(self.model)
+        return RandomForestClassifierModel(
+            None, self.feature_names, self.__snapshot_training_subset(), self.asset, self.__preprocessor,
+            compiled_model=compiled_model
+        )
+
+    def set_cache_dir(
+            self, cache_dir: str, persister: WriteBehindPersister | None = None, store: TableStore | None = None
+    ):
+        self.__persister = persister
+        self.__store = store if store is not None else TableStore(on_import=DataFrameHelper.normalize_timestamp)
         self.__cache_dir = Path(cache_dir).expanduser().resolve()
         self.__cache_dir.mkdir(parents=True, exist_ok=True)
-        self.__cache_file = self.__cache_dir / f"{self.asset.ticker_symbol.lower()}-train-subset.csv"
+        self.__cache_file = self.__cache_dir / f"{self.asset.ticker_symbol.lower()}-train-subset"
 
-        if self.__cache_file.is_file():
+        if self.__store.exists(self.__cache_file):
             try:
                 logger.info("Loading training subset cache from %s", self.__cache_file)
-                self.__training_subset = pd.read_csv(
-                    self.__cache_file, dtype={"timestamp": int}
-                )
-                DataFrameHelper.normalize_timestamp(self.__training_subset)
+                training_subset = self.__store.read(self.__cache_file)
+                DataFrameHelper.normalize_timestamp(training_subset)
+                self.__set_training_subset(training_subset)
                 return
             except Exception as e:
                 logger.warning("Failed to load cache file %s: %s", self.__cache_file, e)
         self.__save_cache()
 
+    def __metric_labels(self) -> dict[str, str]:
+        return {"asset": self.asset.ticker_symbol.lower(), "model": self.__class__.__name__.lower()}
+
+    def __snapshot_training_subset(self) -> DataFrame:
+        with self.__window_lock:
+            return self.__training_subset.to_frame()
+
     def __save_cache(self):
         if self.__cache_file:
-            self.__training_subset.to_csv(self.__cache_file, index=False)
+            if self.__persister is not None:
+                self.__persister.mark_dirty(self.__cache_file, self.__snapshot_training_subset, self.__store.write)
+                return
+            self.__store.write(self.__cache_file, self.__snapshot_training_subset())
             logger.debug("Training subset saved to %s", self.__cache_file)
 
-    def __update_cache_with_market_data(self, new_data: DataFrame):
-        self.__training_subset = new_data
-
-        if len(self.__training_subset) > self.MAX_WINDOW_SIZE:
-            self.__training_subset = self.__training_subset.iloc[-self.MAX_WINDOW_SIZE:]
+    def __get_feature_state(self) -> FeatureState:
+        if self.__feature_state is None:
+            self.__feature_state = self.__preprocessor.create_feature_state(self.__training_subset.to_frame())
+        return self.__feature_state
 
+    def __update_cache_with_market_data(self, new_rows: list[dict]):
+        with self.__window_lock:
+            for row in new_rows:
+                self.__training_subset.append(row)
         self.__save_cache()
 
     def predict(self, current_data: list[MarketData], update: bool = True) -> list[int]:
-        if self.model:
-            data = DataframeFactory.from_market_data_entity(self.asset, current_data[0])
-            new_data = pd.concat(
-                [data, self.__training_subset],
-                ignore_index=False
-            )
-            pre_processed_data, _, _ = self.__preprocessor.pre_process_data(new_data)
-            filtered_data = pre_processed_data[self.__model.feature_names_in_]
-            if update:
-                self.fine_tune(filtered_data)
+        """
+        Score every tick in `current_data`, oldest first, with a single forest call.
 
-            selected = filtered_data.tail(1)
-            return self.model.predict(selected)
+        With `update` the ticks are folded into the window one after another, so each
+        row sees the ticks before it. Without it every tick is scored against the
+        current window on its own.
+        """
+        if self.__model is not None or self.__compiled_model is not None:
+            labels = self.__metric_labels()
+            with metrics.timer("prediction_stage_seconds", stage="parse", **labels):
+                records = [
+                    DataframeFactory.record_from_market_data_entity(self.asset, market_data)
+                    for market_data in current_data
+                ]
+            state = self.__push_records(records, update, labels)
+            if state is None:
+                return self.__successor().predict(current_data, update)
+            rows, model, compiled_model = state
+
+            with metrics.timer("prediction_stage_seconds", stage="model_predict", **labels):
+                columns = model.feature_names_in_ if model is not None else compiled_model.feature_names
+                selected = DataFrame(rows, columns=columns)
+                if compiled_model is not None:
+                    return compiled_model.predict(selected)
+                return model.predict(selected)
         logger.exception("Prediction failure! Could not find RandomForestClassifierModel.")
         raise RuntimeError("You need to load or train model before prediction.")
 
+    def __push_records(self, records: list[dict], update: bool, labels: dict[str, str]) -> tuple | None:
+        # Window updates for this asset are serialised; scoring runs outside the lock.
+        with self.__state_lock:
+            if self.__successor is not None:
+                return None
+            with metrics.timer("prediction_stage_seconds", stage="features", **labels):
+                feature_state = self.__get_feature_state()
+                if update:
+                    rows = [feature_state.push(record) for record in records]
+                else:
+                    rows = [feature_state.peek(record) for record in records]
+            if update:
+                with metrics.timer("prediction_stage_seconds", stage="cache_write", **labels):
+                    self.__update_cache_with_market_data(rows)
+            return rows, self.__model, self.__compiled_model
+
+    def refresh(self, n_new_trees: int | None = None, max_estimators: int | None = None) -> int:
+        """
+        Grow `n_new_trees` trees on the current window and retire the oldest ones.
+
+        The tuned hyperparameters are kept; new trees are added with `warm_start` on a
+        copy of the forest, which is then trimmed to its newest `max_estimators` trees
+        and swapped in, so predictions running meanwhile keep using the previous forest.
+        `n_new_trees` defaults to a tenth of the forest and `max_estimators` to its
+        current size. An integer `random_state` is re-derived on every refresh, so the
+        new trees do not repeat the seeds of the previous refresh. Returns the number of
+        trees added.
+        """
+        current = self.model
+        n_new_trees = n_new_trees if n_new_trees is not None else max(1, len(current.estimators_) // 10)
+        max_estimators = max_estimators if max_estimators is not None else len(current.estimators_)
+
+        with self.__window_lock:
+            window = self.__training_subset.to_frame()
+        close = window["close"].to_numpy()
+        # The newest bar has no next close yet, so it has no label.
+        features = window.iloc[:-1][current.feature_names_in_]
+        target = (close[1:] > close[:-1]).astype(int)
+        if not np.array_equal(np.unique(target), current.classes_):
+            raise ValueError(
+                f"Cannot refresh model for {self.asset.name}: the window does not contain every class."
+            )
+
+        logger.info(
+            "Refreshing RandomForestClassifierModel for asset: name=%s, new_trees=%d, max_estimators=%d.",
+            self.asset.name, n_new_trees, max_estimators
+        )
+        refreshed = copy.copy(current)
+        refreshed.estimators_ = list(current.estimators_)
+        random_state = current.random_state
+        if isinstance(random_state, (int, np.integer)):
+            # Warm start skips one seed per existing tree; with a fixed forest size it would reuse them.
+            random_state = int(np.random.SeedSequence(int(random_state)).generate_state(1)[0])
+        refreshed.set_params(
+            warm_start=True, n_estimators=len(current.estimators_) + n_new_trees, random_state=random_state
+        )
+        with warnings.catch_warnings():
+            # Balancing on the recent window only is intended here.
+            warnings.filterwarnings("ignore", message="class_weight presets", category=UserWarning)
+            refreshed.fit(features, target)
+        refreshed.estimators_ = refreshed.estimators_[-max_estimators:]
+        refreshed.set_params(warm_start=False, n_estimators=len(refreshed.estimators_))
+
+        compiled_model = CompiledRandomForest.compile(refreshed) if self.__compiled_model is not None else None
+        with self.__state_lock:
+            self.__model, self.__compiled_model = refreshed, compiled_model
+        return n_new_trees
+
     def fine_tune(self, update_data: DataFrame):
         logger.info("Fine-tuning model for asset: name=%s.", self.asset.name)
-        self.__update_cache_with_market_data(update_data)
+        DataFrameHelper.normalize_timestamp(update_data)
+        labels = self.__metric_labels()
+        with self.__state_lock:
+            successor = self.__successor
+            if successor is None:
+                with metrics.timer("prediction_stage_seconds", stage="fine_tune_features", **labels):
+                    feature_state = self.__get_feature_state()
+                    new_rows = [
+                        feature_state.push(record)
+                        for record in update_data.sort_values(by="timestamp").to_dict("records")
+                    ]
+                with metrics.timer("prediction_stage_seconds", stage="fine_tune_cache_write", **labels):
+                    self.__update_cache_with_market_data(new_rows)
+        if successor is not None:
+            successor().fine_tune(update_data)
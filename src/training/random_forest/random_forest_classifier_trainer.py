@@ -1,9 +1,11 @@
+from __future__ import annotations
+
 import logging
 
-import joblib
-from pandas import DataFrame
+from pandas import DataFrame, Series
 
 from src.entities.asset_entity import AssetEntity
+from src.helpers.joblib_helper import JoblibHelper
 from src.helpers.random_forest_classifier_helper import RandomForestClassifierHelper
 from src.training.random_forest.random_forest_classifier_model import RandomForestClassifierModel
 from src.training.trainer import Trainer
@@ -12,11 +14,41 @@ logger = logging.getLogger(__name__)
 
 
 class RandomForestClassifierTrainer(Trainer):
-    def __train_model(self, asset: AssetEntity, historical_data: DataFrame) -> RandomForestClassifierModel:
-        (processed_data, predictors, target) = self.pre_processor.pre_process_data(historical_data)
-        filtered_data = processed_data[predictors]
-        helper = RandomForestClassifierHelper()
-        trained_model = helper.train_model(filtered_data, target)
+    def __create_helper(self, asset: AssetEntity) -> RandomForestClassifierHelper:
+        return RandomForestClassifierHelper(
+            n_jobs=self.n_jobs, backend=self.search_backend, search_strategy=asset.search_strategy,
+            profiler=self.profiler
+        )
+
+    def __pre_process(
+            self, asset: AssetEntity, historical_data: DataFrame, features_key: str | None
+    ) -> tuple[DataFrame, list[str], Series]:
+        if features_key is not None:
+            with self.profiler.phase("cache_read"):
+                cached_features = self.training_cache.read_features(asset.ticker_symbol, features_key)
+            if cached_features is not None:
+                logger.info("Reusing cached training features for asset: name=%s.", asset.name)
+                return cached_features
+
+        with self.profiler.phase("preprocess"):
+            (processed_data, predictors, target) = self.pre_processor.pre_process_data(historical_data)
+            filtered_data = processed_data[predictors]
+        if features_key is not None:
+            with self.profiler.phase("cache_write"):
+                self.training_cache.write_features(
+                    asset.ticker_symbol, features_key, filtered_data, predictors, target
+                )
+        return filtered_data, predictors, target
+
+    def __train_model(
+            self, asset: AssetEntity, helper: RandomForestClassifierHelper, filtered_data: DataFrame,
+            predictors: list[str], target: Series, best_params: dict | None
+    ) -> RandomForestClassifierModel:
+        if best_params is not None:
+            logger.info("Reusing best hyperparameters for asset: name=%s, params=%s.", asset.name, best_params)
+            trained_model = helper.fit_with_params(filtered_data, target, best_params)
+        else:
+            trained_model = helper.train_model(filtered_data, target)
         classifier_model = RandomForestClassifierModel(
             trained_model, predictors, filtered_data,
             asset, self.pre_processor
@@ -27,10 +59,35 @@ class RandomForestClassifierTrainer(Trainer):
         model_class_name = model.__class__.__name__.lower()
         filename = self._get_file_path(asset, model_class_name)
         logger.info("Saving trained model to path: filepath=%s.", filename)
-        joblib.dump(model, filename)
+        with self.profiler.phase("dump"):
+            JoblibHelper.dump(model, filename)
 
     def train_and_save(self, asset: AssetEntity):
+        with self.profiler.profile_asset(asset.ticker_symbol):
+            self.__train_and_save(asset)
+
+    def __train_and_save(self, asset: AssetEntity):
         logger.info("Training model for asset: name=%s.", asset.name)
-        historical_data = self.data_provider.get_ticker_data(asset.ticker_symbol)
-        classifier_model = self.__train_model(asset, historical_data)
+        with self.profiler.phase("data_load"):
+            historical_data = self.data_provider.get_ticker_data(asset.ticker_symbol)
+        helper = self.__create_helper(asset)
+
+        features_key, search_key, best_params = None, None, None
+        if self.training_cache is not None:
+            features_key = self.training_cache.features_key(historical_data, self.pre_processor)
+            search_key = self.training_cache.search_key(helper.search_space())
+            previous_search = self.training_cache.read_search(asset.ticker_symbol)
+            if previous_search is not None and previous_search["search_key"] == search_key:
+                model_file = self._get_file_path(asset, RandomForestClassifierModel.__name__.lower())
+                if previous_search["features_key"] == features_key and model_file.is_file():
+                    logger.info("History unchanged, skipping training for asset: name=%s.", asset.name)
+                    return
+                best_params = previous_search["best_params"]
+
+        filtered_data, predictors, target = self.__pre_process(asset, historical_data, features_key)
+        classifier_model = self.__train_model(asset, helper, filtered_data, predictors, target, best_params)
         self.__save_model(asset, classifier_model)
+        if self.training_cache is not None:
+            self.training_cache.write_search(
+                asset.ticker_symbol, features_key, search_key, helper.best_params(classifier_model.model)
+            )
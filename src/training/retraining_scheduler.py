@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import joblib
+import schedule
+from pandas import DataFrame
+
+from api.interfaces.prediction_model import PredictionModel
+from api.models.prediction_model_loader import PredictionModelLoader
+from src.entities.asset_entity import AssetEntity
+from src.entities.training_result_entity import TrainingResult
+from src.providers.history_data_provider import HistoryDataProvider
+from src.providers.preprocessor import PreProcessor
+from src.training.training_scheduler import TrainingScheduler
+
+logger = logging.getLogger(__name__)
+
+# Called with the retrained model, the live model (if any) and the held-out rows.
+Validator = Callable[[PredictionModel, Optional[PredictionModel], DataFrame], bool]
+
+
+class HoldoutDataProvider(HistoryDataProvider):
+    """Serves `data_provider`'s history without its newest `holdout` rows, which are kept for validation."""
+
+    def __init__(self, data_provider: HistoryDataProvider, holdout: int):
+        self.data_provider = data_provider
+        self.holdout = holdout
+
+    def get_ticker_data(
+            self, ticker_symbol: str, from_date: datetime | None = None, to_date: datetime | None = None
+    ) -> DataFrame:
+        history = self.data_provider.get_ticker_data(ticker_symbol, from_date, to_date)
+        return history.iloc[:-self.holdout] if self.holdout else history
+
+    def update_ticker_data(self, ticker_symbol: str, market_data: DataFrame) -> DataFrame:
+        return self.data_provider.update_ticker_data(ticker_symbol, market_data)
+
+    def get_preprocessor(self) -> PreProcessor:
+        return self.data_provider.get_preprocessor()
+
+
+class RetrainingScheduler:
+    """
+    Periodically retrains assets in worker processes and hot-swaps the results.
+
+    Each run trains into a staging directory next to the loader's model files with a
+    `TrainingScheduler`, so training never runs in the serving process. The newest
+    `holdout` bars of every history are left out of training; every model that
+    trained successfully is loaded and checked by `validator` on those bars against
+    the live model file, and only then moved over the live file and swapped into the
+    loader's registry. Callers of `get_model` keep getting the previous model until
+    the swap. Runs never overlap; `stop` waits at most `stop_timeout` seconds for a
+    run in progress, which then promotes nothing more.
+    """
+    POLL_INTERVAL = 1.0
+
+    def __init__(
+            self, assets: list[AssetEntity], data_provider: HistoryDataProvider,
+            prediction_model_loader: PredictionModelLoader, model_class_name: str, *,
+            interval: timedelta = timedelta(weeks=1), validator: Validator | None = None,
+            holdout: int = 30, max_score_drop: float = 0.02, stop_timeout: float = 10.0,
+            **training_options
+    ):
+        self.assets = assets
+        self.data_provider = data_provider
+        self.prediction_model_loader = prediction_model_loader
+        self.model_class_name = model_class_name.lower()
+        self.interval = interval
+        self.validator = validator if validator is not None else self.validate_model
+        self.holdout = holdout
+        self.max_score_drop = max_score_drop
+        self.stop_timeout = stop_timeout
+        self.training_options = training_options
+        self.last_results: list[TrainingResult] = []
+        self.__scheduler = schedule.Scheduler()
+        self.__run_lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    @staticmethod
+    def score_model(prediction_model: PredictionModel, holdout_rows: DataFrame) -> float:
+        """Accuracy of the model's forest on `holdout_rows`, which carry the features and ``target``."""
+        model = prediction_model.model
+        predictions = model.predict(holdout_rows[model.feature_names_in_])
+        return float((predictions == holdout_rows["target"].to_numpy()).mean())
+
+    def validate_model(
+            self, prediction_model: PredictionModel, live_model: PredictionModel | None, holdout_rows: DataFrame
+    ) -> bool:
+        """
+        Check the retrained model on the held-out bars it was not fitted on.
+
+        It must predict only known classes and score no more than `max_score_drop`
+        below the live model on the same bars.
+        """
+        model = prediction_model.model
+        if holdout_rows.empty or list(model.feature_names_in_) != list(prediction_model.feature_names):
+            return False
+        if not set(model.feature_names_in_) <= set(holdout_rows.columns):
+            logger.error("Held-out bars lack the model's features: name=%s.", prediction_model.asset.name)
+            return False
+        if not set(model.predict(holdout_rows[model.feature_names_in_])) <= set(model.classes_):
+            return False
+        score = self.score_model(prediction_model, holdout_rows)
+        if live_model is None:
+            return True
+        live_score = self.score_model(live_model, holdout_rows)
+        logger.info(
+            "Validated retrained model: name=%s, score=%.3f, live_score=%.3f.",
+            prediction_model.asset.name, score, live_score
+        )
+        return score >= live_score - self.max_score_drop
+
+    def __get_holdout_rows(self, asset: AssetEntity) -> DataFrame:
+        history = self.data_provider.get_ticker_data(asset.ticker_symbol)
+        if len(history) <= self.holdout:
+            return history.iloc[0:0]
+        cutoff = history["timestamp"].iloc[-self.holdout]
+        processed_data, _, _ = self.data_provider.get_preprocessor().pre_process_data(history.copy())
+        return processed_data[processed_data["timestamp"] >= cutoff]
+
+    def __load_live_model(self, asset: AssetEntity) -> PredictionModel | None:
+        # The model file rather than the registry entry, which may be a shared model without a forest.
+        live_file = self.prediction_model_loader.model_path(asset, self.model_class_name)
+        return joblib.load(live_file) if live_file.is_file() else None
+
+    def run_once(self) -> list[str]:
+        """Retrain every asset now and return the tickers whose models were swapped in."""
+        if not self.__run_lock.acquire(blocking=False):
+            logger.warning("Retraining already in progress, skipping this run.")
+            return []
+        try:
+            live_dir = self.prediction_model_loader.model_dir
+            live_dir.mkdir(parents=True, exist_ok=True)
+            staging_dir = Path(tempfile.mkdtemp(prefix=".retrain-", dir=live_dir))
+            try:
+                training_scheduler = TrainingScheduler(
+                    str(staging_dir), HoldoutDataProvider(self.data_provider, self.holdout), **self.training_options
+                )
+                self.last_results = training_scheduler.train(self.assets)
+                return [
+                    asset.ticker_symbol for asset, result in zip(self.assets, self.last_results)
+                    if result.succeeded and not self.__stop_event.is_set() and self.__promote(asset, staging_dir)
+                ]
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        finally:
+            self.__run_lock.release()
+
+    def __promote(self, asset: AssetEntity, staging_dir: Path) -> bool:
+        staged_file = staging_dir / self.prediction_model_loader.model_path(asset, self.model_class_name).name
+        try:
+            prediction_model = joblib.load(staged_file)
+            if not self.validator(prediction_model, self.__load_live_model(asset), self.__get_holdout_rows(asset)):
+                logger.error("Retrained model failed validation, keeping the live model: name=%s.", asset.name)
+                return False
+            self.prediction_model_loader.swap_model(asset, self.model_class_name, prediction_model, staged_file)
+            return True
+        except Exception:
+            logger.exception("Failed promoting retrained model: name=%s.", asset.name)
+            return False
+
+    def start(self) -> None:
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__scheduler.clear()
+        self.__scheduler.every(max(1, int(self.interval.total_seconds()))).seconds.do(self.run_once)
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name="retraining-scheduler", daemon=True)
+        self.__thread.start()
+
+    def __run(self) -> None:
+        while not self.__stop_event.wait(self.POLL_INTERVAL):
+            self.__scheduler.run_pending()
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(self.stop_timeout)
+            if self.__thread.is_alive():
+                logger.warning("Retraining still running after %.1fs; it will promote no more models.", self.stop_timeout)
+        self.__scheduler.clear()
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
 from pathlib import Path
 
@@ -6,13 +8,23 @@ from constants import PROJECT_ROOT
 from src.entities.asset_entity import AssetEntity
 from src.providers.preprocessor import PreProcessor
 from src.providers.history_data_provider import HistoryDataProvider
+from src.training.training_cache import TrainingCache
+from src.training.training_profiler import TrainingProfiler
 
 
 class Trainer(ABC):
-    def __init__(self, model_dir: str, data_provider: HistoryDataProvider, pre_processor: PreProcessor):
+    def __init__(
+            self, model_dir: str, data_provider: HistoryDataProvider, pre_processor: PreProcessor,
+            n_jobs: int | None = None, search_backend: str = "threading",
+            training_cache: TrainingCache | None = None, profiler: TrainingProfiler | None = None
+    ):
         self.model_dir = model_dir
         self.data_provider = data_provider
         self.pre_processor = pre_processor
+        self.n_jobs = n_jobs
+        self.search_backend = search_backend
+        self.training_cache = training_cache
+        self.profiler = profiler if profiler is not None else TrainingProfiler(enabled=False)
 
     def _get_file_path(self, asset: AssetEntity, model_name: str) -> Path:
         file_path = PROJECT_ROOT.joinpath(Path(f"{self.model_dir}/{asset.ticker_symbol.lower()}-{model_name}.joblib"))
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+from src.persistence.formats.numpy_storage_format import NumpyStorageFormat
+from src.persistence.storage_format import StorageFormat
+from src.providers.preprocessor import PreProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingCache:
+    """
+    Content-addressed store of preprocessing and search results per asset.
+
+    The features key hashes the raw history together with the preprocessor config,
+    so the stored feature matrix is reused only for byte-identical inputs. The search
+    key hashes the search space. Only the latest entry per asset is kept: the
+    feature matrix in ``<ticker>-features-<key>.columns`` and the best
+    hyperparameters, with both keys, in ``<ticker>-search.json``.
+    """
+    TARGET_COLUMN = "__target__"
+
+    def __init__(self, directory: str | Path, storage_format: StorageFormat | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.storage_format = storage_format if storage_format is not None else NumpyStorageFormat()
+
+    @staticmethod
+    def __digest(*parts: bytes) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part)
+        return digest.hexdigest()
+
+    @staticmethod
+    def __encode_config(config: dict) -> bytes:
+        return json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+
+    @classmethod
+    def features_key(cls, history: DataFrame, preprocessor: PreProcessor) -> str:
+        schema = [(str(column), str(dtype)) for column, dtype in history.dtypes.items()]
+        row_hashes = pd.util.hash_pandas_object(history, index=False).to_numpy(dtype=np.uint64)
+        return cls.__digest(
+            cls.__encode_config(preprocessor.get_config()), cls.__encode_config({"schema": schema}),
+            row_hashes.tobytes()
+        )
+
+    @classmethod
+    def search_key(cls, search_space: dict) -> str:
+        return cls.__digest(cls.__encode_config(search_space))
+
+    def __features_base(self, ticker_symbol: str, features_key: str) -> Path:
+        return self.directory / f"{ticker_symbol.lower()}-features-{features_key[:16]}"
+
+    def __search_file(self, ticker_symbol: str) -> Path:
+        return self.directory / f"{ticker_symbol.lower()}-search.json"
+
+    def read_features(self, ticker_symbol: str, features_key: str) -> tuple[DataFrame, list[str], Series] | None:
+        base = self.__features_base(ticker_symbol, features_key)
+        if not self.storage_format.exists(base):
+            return None
+        features = self.storage_format.read(base)
+        target = features.pop(self.TARGET_COLUMN).rename("target")
+        return features, list(features.columns), target
+
+    def write_features(
+            self, ticker_symbol: str, features_key: str, data: DataFrame, predictors: list[str], target: Series
+    ) -> None:
+        features = data[predictors].reset_index(drop=True)
+        features[self.TARGET_COLUMN] = target.to_numpy()
+        self.storage_format.write(self.__features_base(ticker_symbol, features_key), features)
+        self.__remove_stale_features(ticker_symbol, features_key)
+
+    def __remove_stale_features(self, ticker_symbol: str, features_key: str) -> None:
+        current = self.storage_format.path_for(self.__features_base(ticker_symbol, features_key))
+        for path in self.directory.glob(f"{ticker_symbol.lower()}-features-*{self.storage_format.suffix}"):
+            if path != current:
+                logger.debug("Removing stale training features: path=%s.", path)
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+
+    def read_search(self, ticker_symbol: str) -> dict | None:
+        try:
+            return json.loads(self.__search_file(ticker_symbol).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def write_search(self, ticker_symbol: str, features_key: str, search_key: str, best_params: dict) -> None:
+        entry = {"features_key": features_key, "search_key": search_key, "best_params": best_params}
+        search_file = self.__search_file(ticker_symbol)
+        with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False
+        ) as temporary:
+            json.dump(entry, temporary, default=int)
+        os.replace(temporary.name, search_file)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from src.entities.training_profile_entity import PhaseTiming, SearchCandidateTiming, TrainingProfile
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread into collapsed-stack counts.
+
+    Each line of the output is ``thread;outer frame;...;inner frame count``, the input
+    format of ``flamegraph.pl`` and speedscope. Sampling covers the threads of a
+    threading search backend as well, which cProfile does not.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self.__stopped = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    @staticmethod
+    def __format_frame(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def __sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == threading.get_ident():
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self.__format_frame(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.counts[";".join(reversed(stack))] += 1
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.interval):
+            self.__sample()
+
+    def start(self) -> None:
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run, name="stack-sampler", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def write(self, path: Path) -> None:
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common()), encoding="utf-8"
+        )
+
+
+class TrainingProfiler:
+    """
+    Opt-in profiling of training runs.
+
+    Within `profile_asset`, every `phase` records its wall and CPU time, and
+    `record_search` keeps the fit and score time of each search candidate as
+    reported by the search (summed over the CV splits). With `trace_memory` the
+    tracemalloc peak of the asset's run is recorded; expect training to run a few
+    times slower while it is on. `profile_modes` may add "cprofile" (a pstats dump
+    of the training thread) and "collapsed" (sampled stacks of all threads for flame
+    graphs); these files, and a JSON copy of each `TrainingProfile`, are written to
+    `output_dir` when it is set. A disabled profiler does nothing.
+    """
+    PROFILE_MODES = ("cprofile", "collapsed")
+
+    def __init__(
+            self, enabled: bool = True, output_dir: str | Path | None = None, trace_memory: bool = True,
+            profile_modes: tuple[str, ...] = (), sample_interval: float = 0.005
+    ):
+        unknown_modes = set(profile_modes) - set(self.PROFILE_MODES)
+        if unknown_modes:
+            raise ValueError(f"Unknown profile modes: {sorted(unknown_modes)}. Expected any of {self.PROFILE_MODES}.")
+        if profile_modes and output_dir is None:
+            raise ValueError("An output_dir is required to save profiler output.")
+        self.enabled = enabled
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.trace_memory = trace_memory
+        self.profile_modes = tuple(profile_modes)
+        self.sample_interval = sample_interval
+        self.profiles: dict[str, TrainingProfile] = {}
+        self.__current: TrainingProfile | None = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_TrainingProfiler__current"] = None
+        return state
+
+    @contextmanager
+    def profile_asset(self, ticker_symbol: str) -> Iterator[TrainingProfile | None]:
+        if not self.enabled:
+            yield None
+            return
+        profile = self.__current = TrainingProfile(ticker_symbol, [], [])
+        owns_tracemalloc = self.trace_memory and not tracemalloc.is_tracing()
+        if owns_tracemalloc:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if "cprofile" in self.profile_modes else None
+        sampler = StackSampler(self.sample_interval) if "collapsed" in self.profile_modes else None
+        if sampler is not None:
+            sampler.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield profile
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+            if self.trace_memory:
+                profile.peak_memory = tracemalloc.get_traced_memory()[1]
+                if owns_tracemalloc:
+                    tracemalloc.stop()
+            self.__current = None
+            self.__save(profile, profiler, sampler)
+            self.profiles[ticker_symbol] = profile
+            self.__log(profile)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        profile = self.__current
+        if profile is None:
+            yield
+            return
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            profile.phases.append(
+                PhaseTiming(name, time.perf_counter() - wall_started, time.process_time() - cpu_started)
+            )
+
+    def record_search(self, search) -> None:
+        """Keep the per-candidate timings from a fitted scikit-learn search's `cv_results_`."""
+        profile = self.__current
+        if profile is None:
+            return
+        results, n_splits = search.cv_results_, search.n_splits_
+        n_resources = results.get("n_resources")
+        for index, params in enumerate(results["params"]):
+            profile.candidates.append(SearchCandidateTiming(
+                {name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()},
+                float(results["mean_fit_time"][index] * n_splits),
+                float(results["mean_score_time"][index] * n_splits),
+                float(results["mean_test_score"][index]),
+                int(n_resources[index]) if n_resources is not None else None
+            ))
+
+    def __save(
+            self, profile: TrainingProfile, profiler: cProfile.Profile | None, sampler: StackSampler | None
+    ) -> None:
+        if self.output_dir is None:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / profile.ticker_symbol.lower()
+        if profiler is not None:
+            profile.cprofile_path = f"{base}.prof"
+            profiler.dump_stats(profile.cprofile_path)
+        if sampler is not None:
+            profile.collapsed_stacks_path = f"{base}.collapsed"
+            sampler.write(Path(profile.collapsed_stacks_path))
+        Path(f"{base}-profile.json").write_bytes(TypeAdapter(TrainingProfile).dump_json(profile, indent=2))
+
+    @staticmethod
+    def __log(profile: TrainingProfile) -> None:
+        for phase in profile.phases:
+            logger.info(
+                "Training phase for asset %s: phase=%s, wall_time=%.3fs, cpu_time=%.3fs.",
+                profile.ticker_symbol, phase.name, phase.wall_time, phase.cpu_time
+            )
+        if profile.peak_memory is not None:
+            logger.info(
+                "Training peak traced memory for asset %s: %.1f MiB.", profile.ticker_symbol,
+                profile.peak_memory / (1 << 20)
+            )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from src.entities.asset_entity import AssetEntity
+from src.entities.training_result_entity import TrainingResult
+from src.helpers.cpu_helper import CpuHelper
+from src.providers.history_data_provider import HistoryDataProvider
+from src.training.random_forest.random_forest_classifier_trainer import RandomForestClassifierTrainer
+from src.training.trainer import Trainer
+from src.training.training_cache import TrainingCache
+from src.training.training_profiler import TrainingProfiler
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[TrainingResult, int, int], None]
+
+
+def _train_asset(
+        trainer_class: type[Trainer], model_dir: str, data_provider: HistoryDataProvider,
+        asset: AssetEntity, n_jobs: int, search_backend: str, training_cache: TrainingCache | None,
+        profiler: TrainingProfiler | None = None
+) -> TrainingResult:
+    started = time.perf_counter()
+    try:
+        trainer = trainer_class(
+            model_dir, data_provider, data_provider.get_preprocessor(),
+            n_jobs=n_jobs, search_backend=search_backend, training_cache=training_cache, profiler=profiler
+        )
+        trainer.train_and_save(asset)
+    except Exception:
+        return TrainingResult(
+            asset.ticker_symbol, False, time.perf_counter() - started, n_jobs, traceback.format_exc(),
+            profiler.profiles.get(asset.ticker_symbol) if profiler is not None else None
+        )
+    return TrainingResult(
+        asset.ticker_symbol, True, time.perf_counter() - started, n_jobs, None,
+        profiler.profiles.get(asset.ticker_symbol) if profiler is not None else None
+    )
+
+
+class TrainingScheduler:
+    """
+    Trains many assets in parallel worker processes.
+
+    The core budget is split between outer parallelism (assets trained at once) and
+    inner parallelism (`n_jobs` handed to each trainer's hyperparameter search), so
+    ``max_parallel_assets * n_jobs`` never exceeds `total_cores`. Every asset trains
+    in isolation: a failure is recorded in its `TrainingResult` and the rest carry on.
+    `total_cores` defaults to the CPUs available to this process, honouring cgroup
+    limits, and `search_backend` is the joblib backend used by each trainer's search.
+    With a `training_cache`, assets whose history is unchanged are skipped. With an
+    enabled `profiler`, each worker profiles its assets and the resulting
+    `TrainingProfile` is returned on the asset's `TrainingResult`.
+
+    Assets are handed to the pool only as workers free up, so each result's
+    `wall_time` runs from the moment its own asset started, even when its worker dies.
+    """
+
+    def __init__(
+            self, model_dir: str, data_provider: HistoryDataProvider, *,
+            total_cores: int | None = None, max_parallel_assets: int | None = None,
+            trainer_class: type[Trainer] = RandomForestClassifierTrainer,
+            on_progress: ProgressCallback | None = None, mp_context: str = "spawn",
+            search_backend: str = "threading", training_cache: TrainingCache | None = None,
+            profiler: TrainingProfiler | None = None
+    ):
+        self.model_dir = model_dir
+        self.data_provider = data_provider
+        self.total_cores = total_cores if total_cores is not None else CpuHelper.available_cpus()
+        self.max_parallel_assets = max_parallel_assets
+        self.trainer_class = trainer_class
+        self.on_progress = on_progress
+        self.mp_context = mp_context
+        self.search_backend = search_backend
+        self.training_cache = training_cache
+        self.profiler = profiler
+
+    def split_cores(self, n_assets: int) -> tuple[int, int]:
+        """Return (assets trained at once, inner jobs per asset) for `n_assets`."""
+        outer = max(1, min(n_assets, self.total_cores, self.max_parallel_assets or self.total_cores))
+        return outer, max(1, self.total_cores // outer)
+
+    def train(self, assets: list[AssetEntity]) -> list[TrainingResult]:
+        """Train every asset and return one result per asset, in the order given."""
+        if not assets:
+            return []
+        outer, inner = self.split_cores(len(assets))
+        logger.info(
+            "Training assets: count=%d, parallel_assets=%d, jobs_per_asset=%d.", len(assets), outer, inner
+        )
+        started = time.perf_counter()
+        # Keyed by position, so an asset listed twice gets a result for each entry.
+        results: dict[int, TrainingResult] = {}
+        queued = iter(enumerate(assets))
+        running: dict[Future, tuple[int, AssetEntity, float]] = {}
+        with ProcessPoolExecutor(
+                max_workers=outer, mp_context=multiprocessing.get_context(self.mp_context)
+        ) as executor:
+            while True:
+                for index, asset in queued:
+                    asset_started = time.perf_counter()
+                    try:
+                        future = executor.submit(
+                            _train_asset, self.trainer_class, self.model_dir, self.data_provider, asset, inner,
+                            self.search_backend, self.training_cache, self.profiler
+                        )
+                    except BrokenProcessPool:
+                        results[index] = self.__worker_failure(asset, asset_started, inner)
+                        self.__report(results[index], len(results), len(assets))
+                        continue
+                    running[future] = (index, asset, asset_started)
+                    if len(running) >= outer:
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, asset, asset_started = running.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except Exception:
+                        results[index] = self.__worker_failure(asset, asset_started, inner)
+                    self.__report(results[index], len(results), len(assets))
+
+        logger.info(
+            "Finished training assets: succeeded=%d, failed=%d, wall_time=%.1fs.",
+            sum(result.succeeded for result in results.values()),
+            sum(not result.succeeded for result in results.values()),
+            time.perf_counter() - started
+        )
+        return [results[index] for index in range(len(assets))]
+
+    @staticmethod
+    def __worker_failure(asset: AssetEntity, started: float, n_jobs: int) -> TrainingResult:
+        # The worker itself died (e.g. killed or unpicklable result), or the pool broke before it started.
+        return TrainingResult(asset.ticker_symbol, False, time.perf_counter() - started, n_jobs, traceback.format_exc())
+
+    def __report(self, result: TrainingResult, completed: int, total: int) -> None:
+        if result.succeeded:
+            logger.info(
+                "Trained asset %s (%d/%d) in %.1fs.", result.ticker_symbol, completed, total, result.wall_time
+            )
+        else:
+            logger.error(
+                "Failed training asset %s (%d/%d) after %.1fs: %s", result.ticker_symbol, completed, total,
+                result.wall_time, result.error
+            )
+        if self.on_progress is not None:
+            self.on_progress(result, completed, total)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from pandas import DataFrame, Series
+from sklearn.base import ClassifierMixin, clone
+from sklearn.ensemble import RandomForestClassifier
+
+from src.helpers.backtest_helper import BacktestHelper
+from src.helpers.cpu_helper import CpuHelper
+
+logger = logging.getLogger(__name__)
+
+
+def _default_model() -> RandomForestClassifier:
+    return RandomForestClassifier(
+        n_estimators=250, min_samples_split=75, max_depth=10, random_state=5, class_weight="balanced"
+    )
+
+
+class WalkForwardBacktest:
+    """
+    Walk-forward evaluation: retrain on a rolling window, then trade the next one.
+
+    Window ``i`` trains on rows ``[i * step, i * step + train_size)`` and is tested
+    on the `test_size` rows that follow. Windows are independent and run in
+    parallel with joblib; each test window is scored for every (fee, threshold)
+    scenario at once by `BacktestHelper.sweep`.
+    """
+
+    def __init__(
+            self, train_size: int, test_size: int, step: int | None = None, *,
+            model_factory: Callable[[], ClassifierMixin] = _default_model,
+            thresholds: list[float] = (0.5,), fees: list[float] = (0.001,), periods_per_year: int = 365,
+            n_jobs: int | None = None, backend: str = "loky"
+    ):
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step if step is not None else test_size
+        self.model_factory = model_factory
+        self.thresholds = list(thresholds)
+        self.fees = list(fees)
+        self.periods_per_year = periods_per_year
+        self.n_jobs = n_jobs if n_jobs is not None else CpuHelper.available_cpus()
+        self.backend = backend
+
+    def windows(self, rows: int) -> list[tuple[int, int, int]]:
+        """(train_start, test_start, test_end) row positions of every complete window."""
+        return [
+            (start, start + self.train_size, start + self.train_size + self.test_size)
+            for start in range(0, rows - self.train_size - self.test_size + 1, self.step)
+        ]
+
+    def run(self, data: DataFrame, target: Series, close: Series | None = None) -> DataFrame:
+        """
+        Backtest every window; `data` must be sorted oldest first.
+
+        Returns one row per (window, fee, threshold) with the window bounds, the test
+        recall and the metrics from `BacktestHelper.sweep`.
+        """
+        close = data["close"] if close is None else close
+        windows = self.windows(len(data))
+        if not windows:
+            raise ValueError(
+                f"Need at least {self.train_size + self.test_size} rows for one window, got {len(data)}."
+            )
+        logger.info("Running walk-forward backtest: windows=%d, scenarios=%d.",
+                    len(windows), len(self.fees) * len(self.thresholds))
+
+        features = data.to_numpy(dtype=np.float64)
+        labels = np.asarray(target)
+        prices = np.asarray(close, dtype=np.float64)
+        timestamps = data["timestamp"].to_numpy() if "timestamp" in data else np.arange(len(data))
+        results = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+            delayed(self._run_window)(index, window, features, labels, prices, timestamps)
+            for index, window in enumerate(windows)
+        )
+        return pd.concat(results, ignore_index=True)
+
+    def _run_window(
+            self, index: int, window: tuple[int, int, int], features: np.ndarray, labels: np.ndarray,
+            prices: np.ndarray, timestamps: np.ndarray
+    ) -> DataFrame:
+        train_start, test_start, test_end = window
+        model = clone(self.model_factory())
+        model.fit(features[train_start:test_start], labels[train_start:test_start])
+        classes = list(model.classes_)
+        probabilities = (
+            model.predict_proba(features[test_start:test_end])[:, classes.index(1)] if 1 in classes
+            else np.zeros(test_end - test_start)
+        )
+
+        metrics = BacktestHelper.sweep(
+            prices[test_start:test_end], probabilities, self.thresholds, self.fees, self.periods_per_year
+        )
+        test_labels = labels[test_start:test_end]
+        recall = ((probabilities >= 0.5) & (test_labels == 1)).sum() / max(1, (test_labels == 1).sum())
+        metrics.insert(0, "window", index)
+        metrics.insert(1, "train_start", timestamps[train_start])
+        metrics.insert(2, "test_start", timestamps[test_start])
+        metrics.insert(3, "test_end", timestamps[test_end - 1])
+        metrics.insert(4, "recall", recall)
+        return metrics
@@ -0,0 +1,94 @@
+import shutil
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pandas import DataFrame, Series
+
+from api import PredictionModelLoader
+from api.interfaces.market_data import MarketData
+from src.entities.asset_entity import AssetEntity
+from src.prediction_engine import PredictionEngine
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+
+DATASETS = Path(__file__).parent / "datasets"
+SAMPLE_MODEL = Path(__file__).parent / "models" / "btc-randomforestclassifiermodel.joblib"
+
+
+@pytest.fixture
+def dataset_dir(tmp_path: Path) -> str:
+    """Private copy of the dataset fixtures, so imports and partitions never land in the source tree."""
+    return str(shutil.copytree(DATASETS, tmp_path / "datasets"))
+
+
+@pytest.fixture
+def make_asset() -> Callable[..., AssetEntity]:
+    def make(ticker_symbol: str = 'BTC', market_cap: str = '123', asset_id: int = 2781) -> AssetEntity:
+        return AssetEntity(
+            id=asset_id, name=ticker_symbol, ticker_symbol=ticker_symbol,
+            exchange='CRYPTO_DOT_COM', market_cap=market_cap, decimal_places=8, keywords=[]
+        )
+    return make
+
+
+@pytest.fixture
+def make_model_dir(tmp_path: Path) -> Callable[[list[str]], Path]:
+    """Directory under `tmp_path` holding a copy of the BTC sample model for every ticker symbol."""
+    def make(ticker_symbols: list[str]) -> Path:
+        model_dir = tmp_path / "models"
+        model_dir.mkdir()
+        for ticker_symbol in ticker_symbols:
+            shutil.copyfile(SAMPLE_MODEL, model_dir / f"{ticker_symbol}-randomforestclassifiermodel.joblib")
+        return model_dir
+    return make
+
+
+@pytest.fixture
+def make_engine(dataset_dir: str, make_asset) -> Callable[..., PredictionEngine]:
+    def make(cache_dir: str, prediction_dir: str = './tests/models') -> PredictionEngine:
+        data_provider = LocalStorageDataProvider(directory=dataset_dir)
+        loader = PredictionModelLoader(prediction_dir, cache_dir)
+        return PredictionEngine([make_asset('BTC', '525885640459.76')], data_provider, prediction_dir, loader)
+    return make
+
+
+@pytest.fixture
+def make_tick() -> Callable[[int], MarketData]:
+    """Tick `index` minutes from now, its prices rising by one per index."""
+    def make(index: int) -> MarketData:
+        return MarketData(
+            low_price=str(25810.49 + index), high_price=str(25921.97 + index),
+            close_price=str(25895.67 + index), timestamp=int(datetime.now().timestamp()) + 60 * index,
+            volume='5481314132.31'
+        )
+    return make
+
+
+@pytest.fixture
+def make_ticks() -> Callable[[int], list[MarketData]]:
+    """`count` daily ticks from now, their prices rising by 900 per day."""
+    def make(count: int) -> list[MarketData]:
+        now = int(datetime.now().timestamp())
+        return [
+            MarketData(
+                low_price=str(25810.49 + 900 * index), high_price=str(25921.97 + 900 * index),
+                close_price=str(25895.67 + 900 * index), timestamp=now + 86400 * index, volume='5481314132.31'
+            )
+            for index in range(count)
+        ]
+    return make
+
+
+@pytest.fixture
+def make_training_data() -> Callable[[int], tuple[DataFrame, Series]]:
+    """Random features whose target mostly follows column ``a``."""
+    def make(rows: int = 400) -> tuple[DataFrame, Series]:
+        rng = np.random.default_rng(3)
+        data = DataFrame(rng.normal(size=(rows, 3)), columns=["a", "b", "c"])
+        data["timestamp"] = np.arange(rows) * 86400
+        data["close"] = 100 + rng.normal(size=rows).cumsum()
+        target = Series((data["a"] + rng.normal(scale=0.5, size=rows) > 0).astype(int))
+        return data, target
+    return make
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic_data import generate_ohlcv
+from src.helpers.backtest_helper import BacktestHelper
+from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
+from src.training.walk_forward_backtest import WalkForwardBacktest
+
+
+def _single_scenario(close: np.ndarray, positions: np.ndarray, fee: float) -> dict:
+    data = pd.DataFrame({"close": close, "pos": positions})
+    data["forward_log_return"] = np.log(data["close"].shift(-1) / data["close"]).fillna(0)
+    data["cost"] = data["pos"].diff().abs().fillna(0) * fee
+    data["net_log"] = np.log1p(
+        (np.exp(data["pos"] * data["forward_log_return"]) - 1 - data["cost"]).clip(lower=-0.99)
+    )
+    equity = np.exp(data["net_log"].cumsum())
+    return {
+        "annual_return": equity.iloc[-1] ** (365 / len(data)) - 1,
+        "max_drawdown": (equity / equity.cummax() - 1).min(),
+        "sharpe_ratio": np.mean(data["net_log"]) / np.std(data["net_log"]) * np.sqrt(365),
+    }
+
+
+def test_sweep_matches_a_per_scenario_backtest():
+    rng = np.random.default_rng(7)
+    close = generate_ohlcv(250, seed=7)["close"].to_numpy()
+    probabilities = rng.uniform(size=250)
+    thresholds, fees = [0.3, 0.5, 0.7], [0.0, 0.001, 0.01]
+
+    metrics = BacktestHelper.sweep(close, probabilities, thresholds, fees)
+
+    assert list(zip(metrics["fee"], metrics["threshold"])) == [(f, t) for f in fees for t in thresholds]
+    for row in metrics.itertuples():
+        expected = _single_scenario(close, (probabilities >= row.threshold).astype(float), row.fee)
+        assert row.annual_return == pytest.approx(expected["annual_return"])
+        assert row.max_drawdown == pytest.approx(expected["max_drawdown"])
+        assert row.sharpe_ratio == pytest.approx(expected["sharpe_ratio"])
+
+
+def test_walk_forward_backtest_reports_every_window_and_scenario():
+    data, predictors, target = CoinMarketCapPreProcessor().pre_process_data(generate_ohlcv(600))
+    backtest = WalkForwardBacktest(
+        train_size=300, test_size=100, thresholds=[0.5, 0.6], fees=[0.001, 0.002],
+        model_factory=lambda: RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0),
+        n_jobs=2, backend="threading"
+    )
+
+    results = backtest.run(data[predictors], target)
+
+    assert backtest.windows(600) == [(0, 300, 400), (100, 400, 500), (200, 500, 600)]
+    assert len(results) == 3 * 4
+    assert list(results["window"].unique()) == [0, 1, 2]
+    assert results["test_start"].tolist()[::4] == data["timestamp"].iloc[[300, 400, 500]].tolist()
+    assert results[["annual_return", "max_drawdown", "recall"]].notna().all().all()
+    assert (results["max_drawdown"] <= 0).all()
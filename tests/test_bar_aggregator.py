@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from api.interfaces.market_data import MarketData
+from src.streaming.bar_aggregator import BarAggregator
+
+DAY = 86400
+
+
+def test_ticks_are_folded_into_ohlcv_bars():
+    aggregator = BarAggregator(interval=60)
+
+    assert not aggregator.add("BTC", 10.0, 1.0, 120)
+    assert not aggregator.add("btc", 12.0, 2.0, 130)
+    assert not aggregator.add("BTC", 9.0, 0.5, 150)
+    assert not aggregator.add("BTC", 11.0, 1.5, 179)
+    assert aggregator.provisional("BTC") == MarketData(
+        volume="5.0", high_price="12.0", low_price="9.0", close_price="11.0", timestamp=179, open_price="10.0"
+    )
+
+    [closed] = aggregator.add("BTC", 13.0, 1.0, 180)
+
+    assert (closed.open_price, closed.high_price, closed.low_price, closed.close_price) == ("10.0", "12.0", "9.0", "11.0")
+    assert closed.timestamp == 179
+    assert aggregator.provisional("BTC").open_price == "13.0"
+    assert aggregator.provisional("ETH") is None
+
+
+def test_gaps_are_filled_and_late_ticks_dropped():
+    aggregator = BarAggregator(interval=60)
+    aggregator.add("BTC", 10.0, 1.0, 0)
+
+    closed = aggregator.add("BTC", 12.0, 1.0, 200)
+    assert [closed_bar.timestamp for closed_bar in closed] == [59, 119, 179]
+    assert [(closed_bar.close_price, closed_bar.volume) for closed_bar in closed[1:]] == [("10.0", "0.0"), ("10.0", "0.0")]
+
+    assert not aggregator.add("BTC", 1.0, 1.0, 100)
+    assert aggregator.late_ticks == 1
+    assert [closed_bar.timestamp for closed_bar in aggregator.close_due("BTC", 250)] == [239]
+    assert [closed_bar.timestamp for closed_bar in aggregator.add("BTC", 14.0, 1.0, 400)] == [299, 359]
+    assert len(BarAggregator(interval=60, fill_gaps=False).add("BTC", 1.0, 1.0, 0)) == 0
+
+
+def test_engine_predicts_on_closed_bars_only(tmp_path, make_engine):
+    engine = make_engine(str(tmp_path / "streaming"))
+    reference = make_engine(str(tmp_path / "reference"))
+    start = (int(datetime.now().timestamp()) // DAY) * DAY
+
+    assert engine.ingest_tick("BTC", 25800.0, 10.0, start + 5) == []
+    assert engine.ingest_tick("BTC", 26100.0, 15.0, start + 500) == []
+    provisional = engine.predict_provisional("BTC")
+    assert engine.predict_provisional("BTC") == provisional
+
+    predictions = engine.ingest_tick("BTC", 26000.0, 1.0, start + DAY + 1)
+
+    expected = reference.predict("BTC", MarketData(
+        volume="25.0", high_price="26100.0", low_price="25800.0", close_price="26100.0",
+        timestamp=start + DAY - 1, open_price="25800.0"
+    ))
+    assert predictions == [expected]
+    assert provisional == expected
@@ -0,0 +1,31 @@
+from benchmarks.suite import QUICK_CONFIG, compare, run
+
+
+def test_suite_reports_every_measurement():
+    config = {**QUICK_CONFIG, "assets": 1, "predict_iterations": 4, "history_lengths": [300]}
+    report = run(config)
+
+    assert report["config"] == config
+    results = report["results"]
+    assert [entry["rows"] for entry in results["preprocess"]] == [300]
+    assert {"csv_bytes", "first_read_ms", "read_ms", "update_ms"} <= set(results["provider"][0])
+    assert {"p50_ms", "p90_ms", "p99_ms", "max_ms"} == set(results["serving"]["predict_latency"])
+    assert [entry["batch_size"] for entry in results["serving"]["batch_throughput"]] == config["batch_sizes"]
+    assert results["peak_rss_bytes"] > 0
+
+
+def test_compare_flags_regressions_only_beyond_tolerance():
+    baseline = {"results": {
+        "preprocess": [{"rows": 100, "preprocess_ms": 10.0}],
+        "serving": {"batch_throughput": [{"batch_size": 8, "predictions_per_second": 1000.0}]},
+    }}
+    current = {"results": {
+        "preprocess": [{"rows": 100, "preprocess_ms": 10.5}],
+        "serving": {"batch_throughput": [{"batch_size": 8, "predictions_per_second": 500.0}]},
+    }}
+
+    regressions = compare(baseline, current, tolerance=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("serving.batch_throughput[batch_size=8].predictions_per_second")
+    assert compare(baseline, baseline) == []
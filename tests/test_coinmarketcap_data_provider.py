@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from src.helpers.token_bucket_helper import TokenBucket
+from src.providers.clients.coinmarketcap_data_provider import CoinMarketCapDataProvider
+
+DAY = timedelta(days=1)
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# Ids CoinMarketCap reports per symbol, as opposed to the configured asset ids.
+CMC_IDS = {"BTC": 1, "ETH": 1027, "SOL": 5426}
+
+
+class StubCoinMarketCap(BaseHTTPRequestHandler):
+    """Serves one daily bar per day in [time_start, time_end), failing the first call per page with a 429."""
+    requests: list[dict] = []
+    throttled: set = set()
+    broken_symbols: set = set()
+
+    def log_message(self, *args):
+        pass
+
+    def __send(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        params["api_key"] = self.headers.get("X-CMC_PRO_API_KEY")
+        StubCoinMarketCap.requests.append(params)
+        page = (params["symbol"], params["time_start"])
+        if params["symbol"] in StubCoinMarketCap.broken_symbols:
+            self.__send(500, {"status": {"error_message": "broken"}})
+            return
+        if page not in StubCoinMarketCap.throttled:
+            StubCoinMarketCap.throttled.add(page)
+            self.__send(429, {"status": {"error_message": "slow down"}}, {"Retry-After": "0"})
+            return
+
+        day = datetime.fromisoformat(params["time_start"].replace("Z", "+00:00"))
+        end = datetime.fromisoformat(params["time_end"].replace("Z", "+00:00"))
+        quotes = []
+        while day < end:
+            close = (day + DAY - timedelta(milliseconds=1)).isoformat().replace("+00:00", "Z")
+            price = float(day.timetuple().tm_yday)
+            quotes.append({
+                "time_open": day.isoformat().replace("+00:00", "Z"), "time_close": close,
+                "time_high": close, "time_low": close,
+                "quote": {params["convert_id"]: {
+                    "open": price, "high": price + 1, "low": price - 1, "close": price + 0.5,
+                    "volume": 1000.0, "market_cap": 5000.0, "timestamp": close
+                }}
+            })
+            day += DAY
+        self.__send(200, {"data": {params["symbol"]: [
+            {"id": CMC_IDS[params["symbol"]], "symbol": params["symbol"], "quotes": quotes}
+        ]}})
+
+
+@pytest.fixture
+def api_url():
+    StubCoinMarketCap.requests, StubCoinMarketCap.throttled, StubCoinMarketCap.broken_symbols = [], set(), set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCoinMarketCap)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _provider(api_url: str, directory, assets=None) -> CoinMarketCapDataProvider:
+    return CoinMarketCapDataProvider(
+        api_url, "secret", str(directory), assets=assets, max_workers=4, requests_per_minute=60_000, burst=100,
+        backoff=0.001, max_retries=2, page_days=10, history_start=START
+    )
+
+
+def test_history_is_paginated_retried_and_stored(api_url, tmp_path, make_asset):
+    provider = _provider(api_url, tmp_path, [make_asset('BTC')])
+
+    history = provider.get_ticker_data("BTC", to_date=START + 25 * DAY)
+
+    assert len(history) == 25
+    assert history["timestamp"].is_monotonic_increasing
+    assert history["timestamp"].iloc[0] == int((START + DAY).timestamp()) - 1
+    assert history["name"].unique().tolist() == [2781]
+    pages = {request["time_start"] for request in StubCoinMarketCap.requests}
+    assert pages == {"2024-01-01T00:00:00Z", "2024-01-11T00:00:00Z", "2024-01-21T00:00:00Z"}
+    assert len(StubCoinMarketCap.requests) == 6, "Every page is throttled once, then retried."
+    assert {request["api_key"] for request in StubCoinMarketCap.requests} == {"secret"}
+    assert len(provider.local_storage.get_ticker_data("BTC")) == 25
+    provider.close()
+
+
+def test_refresh_only_fetches_missing_bars_and_isolates_failures(api_url, tmp_path):
+    provider = _provider(api_url, tmp_path)
+    provider.get_ticker_data("BTC", to_date=START + 5 * DAY)
+    StubCoinMarketCap.requests.clear()
+    StubCoinMarketCap.broken_symbols.add("SOL")
+
+    written = provider.refresh_tickers(["BTC", "ETH", "SOL"], to_date=START + 8 * DAY)
+
+    assert sorted(written) == ["BTC", "ETH"]
+    assert len(written["BTC"]) == 3 and len(written["ETH"]) == 8
+    btc_requests = [request for request in StubCoinMarketCap.requests if request["symbol"] == "BTC"]
+    assert {request["time_start"] for request in btc_requests} == {"2024-01-06T00:00:00Z"}
+    assert len([request for request in StubCoinMarketCap.requests if request["symbol"] == "SOL"]) == 3
+    assert len(provider.get_ticker_data("BTC", to_date=START + 8 * DAY)) == 8
+    with pytest.raises(requests.HTTPError):
+        provider.get_ticker_data("SOL", to_date=START + 8 * DAY)
+    provider.close()
+
+
+def test_every_ticker_is_stored_under_its_own_asset_id(api_url, tmp_path, make_asset):
+    provider = _provider(api_url, tmp_path, [make_asset('BTC', asset_id=2781), make_asset('ETH', asset_id=1027)])
+
+    written = provider.refresh_tickers(["BTC", "ETH", "SOL"], to_date=START + 3 * DAY)
+
+    names = {ticker_symbol: market_data["name"].unique().tolist() for ticker_symbol, market_data in written.items()}
+    assert names == {"BTC": [2781], "ETH": [1027], "SOL": [CMC_IDS["SOL"]]}
+    assert provider.get_ticker_data("ETH", to_date=START + 3 * DAY)["name"].unique().tolist() == [1027]
+    provider.close()
+
+
+def test_token_bucket_allows_bursts_then_limits_the_rate():
+    now, sleeps = [0.0], []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now[0], sleep=sleep)
+    for _ in range(5):
+        bucket.acquire()
+
+    assert sleeps == [0.5, 0.5]
+    assert bucket.try_acquire() == pytest.approx(0.5)
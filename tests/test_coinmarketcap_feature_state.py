@@ -0,0 +1,59 @@
+import numpy
+import pandas as pd
+import pytest
+
+from src.helpers.dataframe_helper import DataFrameHelper
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+from src.providers.preprocessors.coinmarketcap_feature_state import CoinMarketCapFeatureState
+from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
+
+
+def _synthetic_history(size: int) -> pd.DataFrame:
+    random = numpy.random.default_rng(7)
+    close = numpy.abs(numpy.cumsum(random.normal(scale=50, size=size)) + 30000)
+    close[100:110] = close[100]
+    return pd.DataFrame({
+        'name': 2781, 'open': close * 0.99, 'high': close * 1.01, 'low': close * 0.98,
+        'close': close, 'volume': random.uniform(1e9, 5e9, size), 'marketCap': '123',
+        'timestamp': numpy.arange(size) * 86400 + 1600000000
+    })
+
+
+def _assert_same_features(batch_row: pd.Series, incremental_row: dict, predictors: list[str]):
+    for column in predictors:
+        expected, actual = float(batch_row[column]), float(incremental_row[column])
+        assert expected == actual or (numpy.isnan(expected) and numpy.isnan(actual)), \
+            f"{column}: batch={expected} incremental={actual}"
+
+
+def _dataset_history(dataset_dir: str) -> pd.DataFrame:
+    return DataFrameHelper.normalize_timestamp(
+        LocalStorageDataProvider(directory=dataset_dir).get_ticker_data('BTC')
+    ).sort_values(by="timestamp", ignore_index=True)
+
+
+@pytest.mark.parametrize("build_history", [lambda _: _synthetic_history(1100), _dataset_history])
+def test_feature_state_matches_batch_preprocessor(build_history, dataset_dir):
+    history = build_history(dataset_dir)
+    pre_processor = CoinMarketCapPreProcessor()
+    feature_state = pre_processor.create_feature_state(history.iloc[:0])
+    columns = list(CoinMarketCapFeatureState.RAW_COLUMNS)
+
+    checkpoints = {0, 1, 14, 15, 60, len(history) // 2, len(history) - 1}
+    for index, record in enumerate(history[columns].to_dict("records")):
+        peeked = feature_state.peek(record)
+        pushed = feature_state.push(record)
+        if index in checkpoints:
+            batch, predictors, _ = pre_processor.pre_process_data(history.iloc[:index + 1].copy())
+            _assert_same_features(batch.iloc[-1], pushed, predictors)
+            _assert_same_features(batch.iloc[-1], peeked, predictors)
+
+
+def test_feature_state_seeded_from_history_continues_stream():
+    history = _synthetic_history(1100)
+    pre_processor = CoinMarketCapPreProcessor()
+    feature_state = pre_processor.create_feature_state(history.iloc[:-1])
+
+    record = history[list(CoinMarketCapFeatureState.RAW_COLUMNS)].iloc[-1].to_dict()
+    batch, predictors, _ = pre_processor.pre_process_data(history.copy())
+    _assert_same_features(batch.iloc[-1], feature_state.push(record), predictors)
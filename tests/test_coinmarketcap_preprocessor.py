@@ -0,0 +1,31 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from benchmarks.synthetic_data import generate_ohlcv
+from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
+
+LENGTHS = {2781: 1200, 1027: 800, 5426: 600}
+
+
+def _histories() -> dict[int, pd.DataFrame]:
+    return {
+        name: generate_ohlcv(rows, seed=name, start_timestamp=1_500_000_000 + 86400 * (1200 - rows), name=name)
+        for name, rows in LENGTHS.items()
+    }
+
+
+def test_panel_matches_per_asset_preprocessing():
+    histories = _histories()
+    preprocessor = CoinMarketCapPreProcessor()
+    shuffled = pd.concat(histories.values(), ignore_index=True).sample(frac=1, random_state=0)
+
+    panel, predictors, target = preprocessor.pre_process_panel(shuffled)
+
+    assert "close_Ratio_500" in predictors and "close_Ratio_1000" not in predictors
+    assert panel["name"].drop_duplicates().tolist() == sorted(LENGTHS)
+    for name, history in histories.items():
+        expected, expected_predictors, _ = preprocessor.pre_process_data(history.copy())
+        assert predictors == [column for column in expected_predictors if column in predictors]
+        rows = panel[panel["name"] == name].reset_index(drop=True)
+        assert_frame_equal(rows[predictors + ["target"]], expected[predictors + ["target"]], check_exact=True)
+    assert target.equals(panel["target"])
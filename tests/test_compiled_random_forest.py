@@ -0,0 +1,21 @@
+import joblib
+import numpy
+import pandas as pd
+
+from src.training.random_forest.compiled_random_forest import CompiledRandomForest
+
+
+def test_compiled_forest_matches_sklearn_bit_for_bit():
+    model = joblib.load('./tests/models/btc-randomforestclassifiermodel.joblib')
+    forest = model.model
+    features = model.training_subset[forest.feature_names_in_]
+    random = numpy.random.default_rng(3)
+    perturbed = features.to_numpy() * random.uniform(0.9, 1.1, features.shape)
+    perturbed[random.random(perturbed.shape) < 0.05] = numpy.nan
+    samples = pd.concat([features, pd.DataFrame(perturbed, columns=features.columns)], ignore_index=True)
+
+    compiled = CompiledRandomForest.compile(forest)
+
+    assert numpy.array_equal(compiled.predict_proba(samples), forest.predict_proba(samples))
+    assert numpy.array_equal(compiled.predict(samples), forest.predict(samples))
+    assert numpy.array_equal(compiled.predict(samples.tail(1)), forest.predict(samples.tail(1)))
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+
+from api import PredictionModelLoader
+from api.models import prediction_model_loader
+from src.prediction_engine import PredictionEngine
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+
+MODEL_CLASS_NAME = "randomforestclassifiermodel"
+TICKERS = ['BTC', 'ETH', 'SOL']
+THREADS = 12
+TICKS_PER_THREAD = 20
+
+
+def test_concurrent_misses_load_a_model_once(tmp_path, monkeypatch, make_asset, make_model_dir):
+    loads, load = [], joblib.load
+
+    def slow_load(filename):
+        loads.append(filename)
+        time.sleep(0.2)
+        return load(filename)
+
+    monkeypatch.setattr(prediction_model_loader.joblib, "load", slow_load)
+    loader = PredictionModelLoader(str(make_model_dir(["btc"])), str(tmp_path / "cache"), lazy=True)
+    barrier = threading.Barrier(8)
+
+    def get_model():
+        barrier.wait()
+        return loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: get_model(), range(8)))
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+    loader.close()
+
+
+def test_concurrent_predictions_keep_every_update(
+        tmp_path, dataset_dir, make_asset, make_model_dir, make_tick
+):
+    loader = PredictionModelLoader(
+        str(make_model_dir([ticker.lower() for ticker in TICKERS])), str(tmp_path / "cache"), lazy=True
+    )
+    engine = PredictionEngine(
+        [make_asset(ticker) for ticker in TICKERS], LocalStorageDataProvider(directory=dataset_dir),
+        str(tmp_path), loader
+    )
+    barrier = threading.Barrier(THREADS)
+
+    def predict(worker: int) -> list[int]:
+        barrier.wait()
+        predictions = []
+        for offset in range(TICKS_PER_THREAD):
+            index = worker * TICKS_PER_THREAD + offset
+            predictions.extend(engine.predict_batch([(TICKERS[index % len(TICKERS)], make_tick(index))]))
+        return predictions
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        predictions = [prediction for batch in executor.map(predict, range(THREADS)) for prediction in batch]
+
+    assert len(predictions) == THREADS * TICKS_PER_THREAD
+    assert set(predictions) <= {0, 1}
+    for position, ticker in enumerate(TICKERS):
+        expected_closes = {
+            float(make_tick(index).close_price)
+            for index in range(THREADS * TICKS_PER_THREAD) if index % len(TICKERS) == position
+        }
+        window = loader.get_model(make_asset(ticker), MODEL_CLASS_NAME).training_subset
+        assert set(window["close"].tail(len(expected_closes))) == expected_closes
+    loader.close()
@@ -0,0 +1,50 @@
+import pytest
+
+from src.helpers.cpu_helper import CpuHelper
+from src.helpers.random_forest_classifier_helper import RandomForestClassifierHelper
+
+
+@pytest.fixture
+def cgroup_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(CpuHelper, "CGROUP_ROOT", tmp_path)
+    return tmp_path
+
+
+def test_cgroup_v2_quota_caps_available_cpus(cgroup_root):
+    (cgroup_root / "cpu.max").write_text("150000 100000\n", encoding="utf-8")
+
+    assert CpuHelper.cgroup_cpu_limit() == 1.5
+    assert CpuHelper.available_cpus() == 1
+
+
+def test_cgroup_v2_without_quota_is_unlimited(cgroup_root):
+    (cgroup_root / "cpu.max").write_text("max 100000\n", encoding="utf-8")
+
+    assert CpuHelper.cgroup_cpu_limit() is None
+
+
+def test_cgroup_v1_quota(cgroup_root):
+    (cgroup_root / "cpu").mkdir()
+    (cgroup_root / "cpu" / "cpu.cfs_quota_us").write_text("400000", encoding="utf-8")
+    (cgroup_root / "cpu" / "cpu.cfs_period_us").write_text("100000", encoding="utf-8")
+
+    assert CpuHelper.cgroup_cpu_limit() == 4.0
+
+
+def test_unknown_search_backend_is_rejected():
+    with pytest.raises(ValueError):
+        RandomForestClassifierHelper(backend="dask-ish")
+
+
+def test_loky_backend_trains_a_model(make_training_data):
+    data, target = make_training_data()
+    helper = RandomForestClassifierHelper(n_jobs=2, backend="loky", max_nbytes=1)
+    helper.n_estimators = range(5, 10)
+    helper.min_samples_split = range(2, 10)
+    helper.max_depth = range(2, 4)
+    helper.no_of_iterations = 2
+
+    model = helper.train_model(data, target)
+
+    assert 5 <= model.n_estimators < 10
+    assert model.predict(data).shape == (400,)
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+from api import PredictionModelLoader
+from src.metrics.metrics_registry import MetricsRegistry, metrics
+from src.metrics.sinks.in_memory_metrics_sink import InMemoryMetricsSink
+from src.metrics.sinks.logging_metrics_sink import LoggingMetricsSink
+from src.metrics.sinks.prometheus_metrics_sink import PrometheusMetricsSink
+
+MODEL_CLASS_NAME = "randomforestclassifiermodel"
+
+LABELS = {"asset": "btc", "model": MODEL_CLASS_NAME}
+
+
+@pytest.fixture
+def sink():
+    sink = InMemoryMetricsSink()
+    metrics.reset()
+    metrics.enable(sink)
+    yield sink
+    metrics.disable()
+    metrics.sinks.remove(sink)
+    metrics.reset()
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    with registry.timer("stage_seconds", stage="a"):
+        registry.increment("calls_total")
+
+    snapshot = registry.snapshot()
+    assert snapshot.counters == {} and snapshot.histograms == {}
+
+
+def test_prediction_stages_and_counters_are_recorded(tmp_path, sink, make_engine, make_ticks):
+    engine = make_engine(str(tmp_path / "cache"))
+    engine.predict_batch([("BTC", tick) for tick in make_ticks(3)])
+    snapshot = metrics.export()
+
+    assert sink.latest is snapshot
+    assert snapshot.counter("predictions_total", **LABELS) == 3
+    assert snapshot.histogram("prediction_latency_seconds", **LABELS).count == 1
+    for stage in ("model_lookup", "parse", "features", "cache_write", "model_predict"):
+        assert snapshot.histogram("prediction_stage_seconds", stage=stage, **LABELS).count == 1, stage
+
+
+def test_model_loads_and_evictions_are_counted(tmp_path, sink, make_asset, make_model_dir):
+    model_dir = make_model_dir(["btc", "eth"])
+    loader = PredictionModelLoader(str(model_dir), str(tmp_path / "cache"), lazy=True, max_models=1)
+    loader.get_model(make_asset("BTC"), MODEL_CLASS_NAME)
+    loader.get_model(make_asset("ETH"), MODEL_CLASS_NAME)
+    loader.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot.counter("model_loads_total", **LABELS) == 1
+    assert snapshot.counter("model_evictions_total", **LABELS) == 1
+    assert snapshot.histogram("model_load_seconds", asset="eth", model=MODEL_CLASS_NAME).count == 1
+    assert sink.latest is None
+
+
+def test_prometheus_and_logging_sinks_render_snapshots(tmp_path, caplog):
+    registry = MetricsRegistry(enabled=True)
+    registry.increment("predictions_total", 2, asset="btc")
+    registry.observe("prediction_latency_seconds", 0.003, asset="btc")
+    registry.observe("prediction_latency_seconds", 20.0, asset="btc")
+    prometheus = PrometheusMetricsSink(tmp_path / "metrics.prom", namespace="test")
+    registry.enable(prometheus, LoggingMetricsSink())
+
+    with caplog.at_level(logging.INFO):
+        registry.export()
+
+    lines = (tmp_path / "metrics.prom").read_text(encoding="utf-8").splitlines()
+    assert "# TYPE test_predictions_total counter" in lines
+    assert 'test_predictions_total{asset="btc"} 2.0' in lines
+    assert 'test_prediction_latency_seconds_bucket{asset="btc",le="0.0025"} 0' in lines
+    assert 'test_prediction_latency_seconds_bucket{asset="btc",le="0.005"} 1' in lines
+    assert 'test_prediction_latency_seconds_bucket{asset="btc",le="+Inf"} 2' in lines
+    assert 'test_prediction_latency_seconds_count{asset="btc"} 2' in lines
+    assert any("prediction_latency_seconds{asset=btc}: count=2" in message for message in caplog.messages)
@@ -0,0 +1,69 @@
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy
+import pandas as pd
+
+from src.persistence.partitioned_history_store import PartitionedHistoryStore
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+
+
+def _daily_bars(start: str, days: int, close: float = 100.0) -> pd.DataFrame:
+    timestamps = pd.date_range(start, periods=days, freq="D", tz="UTC").astype("int64") // 10 ** 9
+    return pd.DataFrame({'timestamp': timestamps, 'close': numpy.full(days, close)})
+
+
+def test_range_reads_only_return_requested_rows(tmp_path: Path):
+    store = PartitionedHistoryStore(tmp_path)
+    store.append("btc-usd", _daily_bars("2023-11-20", 60))
+
+    history = store.read(
+        "btc-usd",
+        datetime(2023, 12, 30, tzinfo=timezone.utc), datetime(2024, 1, 2, tzinfo=timezone.utc)
+    )
+
+    assert sorted(path.name for path in (tmp_path / "btc-usd.partitions").glob("[!.]*")) == [
+        "2023-11.columns", "2023-12.columns", "2024-01.columns"
+    ]
+    assert pd.to_datetime(history['timestamp'], unit="s").dt.day.tolist() == [30, 31, 1, 2]
+
+
+def test_append_deduplicates_within_overlapping_partition(tmp_path: Path):
+    store = PartitionedHistoryStore(tmp_path)
+    store.append("btc-usd", _daily_bars("2023-11-20", 60))
+    store.append("btc-usd", _daily_bars("2024-01-15", 5, close=200.0))
+
+    history = store.read("btc-usd")
+
+    assert len(history) == 61
+    assert history['timestamp'].is_monotonic_increasing
+    assert history['close'].iloc[-5:].tolist() == [200.0] * 5
+
+
+def test_concurrent_appends_keep_every_row(tmp_path: Path):
+    store = PartitionedHistoryStore(tmp_path)
+    bars = _daily_bars("2024-01-01", 24)
+    appenders = [
+        threading.Thread(target=store.append, args=("btc-usd", bars.iloc[index:index + 3])) for index in range(0, 24, 3)
+    ]
+    for appender in appenders:
+        appender.start()
+    for appender in appenders:
+        appender.join()
+
+    assert store.read("btc-usd")['timestamp'].tolist() == bars['timestamp'].tolist()
+
+
+def test_local_storage_provider_partitions_legacy_csv(dataset_dir):
+    data_provider = LocalStorageDataProvider(directory=dataset_dir)
+
+    history = data_provider.get_ticker_data('BTC')
+    december = data_provider.get_ticker_data('BTC', datetime(2023, 12, 1), datetime(2023, 12, 31))
+
+    assert history['timestamp'].is_monotonic_increasing
+    assert len(history) == 199
+    assert len(december) == 26
+    history_dir = Path(dataset_dir, "coinmarketcap", "history")
+    assert (history_dir / "btc-usd.partitions").is_dir()
+    assert not (history_dir / "btc-usd.columns").exists()
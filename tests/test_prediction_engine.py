@@ -0,0 +1,33 @@
+import shutil
+
+import joblib
+import numpy
+import pytest
+
+
+def test_predict_batch_matches_sequential_predictions(tmp_path, make_engine, make_ticks):
+    ticks = make_ticks(4)
+    sequential_engine = make_engine(str(tmp_path / "one-by-one"))
+    sequential = [sequential_engine.predict('btc', tick) for tick in ticks]
+
+    batch = make_engine(str(tmp_path / "batch")).predict_batch([('BTC', tick) for tick in ticks])
+
+    assert batch == sequential
+    assert all(isinstance(prediction, numpy.int64) for prediction in batch)
+
+
+def test_predict_batch_rejects_unknown_assets(tmp_path, make_engine, make_ticks):
+    with pytest.raises(ValueError):
+        make_engine(str(tmp_path)).predict_batch([('ETH', make_ticks(1)[0])])
+
+
+def test_refresh_assets_model_saves_refreshed_models(tmp_path, make_engine, make_ticks):
+    shutil.copy('./tests/models/btc-randomforestclassifiermodel.joblib', tmp_path)
+    engine = make_engine(str(tmp_path / "cache"), str(tmp_path))
+
+    engine.refresh_assets_model(n_new_trees=5, max_estimators=100)
+
+    refreshed = joblib.load(tmp_path / "btc-randomforestclassifiermodel.joblib")
+    assert len(refreshed.model.estimators_) == 100
+    assert refreshed.predict(make_ticks(1), update=False)[0] in {0, 1}
+    assert not list(tmp_path.glob("*.tmp"))
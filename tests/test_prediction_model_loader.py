@@ -0,0 +1,103 @@
+import threading
+import time
+
+from api import PredictionModelLoader
+from src.persistence.table_store import TableStore
+from src.persistence.write_behind_persister import WriteBehindPersister
+
+MODEL_CLASS_NAME = "randomforestclassifiermodel"
+
+
+def test_loader_evicts_least_recently_used_models(tmp_path, make_asset, make_model_dir):
+    model_dir = make_model_dir(["btc", "eth", "sol"])
+    loader = PredictionModelLoader(str(model_dir), str(tmp_path / "cache"), lazy=True, max_models=2)
+
+    btc = loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME)
+    loader.get_model(make_asset('ETH'), MODEL_CLASS_NAME)
+    assert loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME) is btc
+    loader.get_model(make_asset('SOL'), MODEL_CLASS_NAME)
+
+    assert list(loader.models) == [('btc', MODEL_CLASS_NAME), ('sol', MODEL_CLASS_NAME)]
+    assert loader.get_model(make_asset('ETH'), MODEL_CLASS_NAME) is not None
+    assert ('btc', MODEL_CLASS_NAME) not in loader.models
+    loader.close()
+
+
+def test_loader_prefetches_hot_assets(tmp_path, make_asset, make_model_dir):
+    model_dir = make_model_dir(["btc", "eth"])
+    loader = PredictionModelLoader(str(model_dir), str(tmp_path / "cache"), lazy=True)
+
+    loader.prefetch([make_asset('BTC'), make_asset('ETH'), make_asset('DOGE')], MODEL_CLASS_NAME)
+
+    assert set(loader.models) == {('btc', MODEL_CLASS_NAME), ('eth', MODEL_CLASS_NAME)}
+    loader.close()
+
+
+def test_evicted_model_flushes_its_window_and_forwards_later_ticks(
+        tmp_path, make_asset, make_model_dir, make_ticks
+):
+    ticks = make_ticks(3)
+    model_dir = make_model_dir(["btc", "eth"])
+    persister = WriteBehindPersister(flush_interval=3600)
+    loader = PredictionModelLoader(
+        str(model_dir), str(tmp_path / "cache"), persister=persister, lazy=True, max_models=1
+    )
+
+    evicted = loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME)
+    # Both files copy the BTC sample model, so they share its cache; create it up front.
+    persister.flush()
+    evicted.predict(ticks[:2])
+    loader.get_model(make_asset('ETH'), MODEL_CLASS_NAME)
+    evicted.predict(ticks[2:])
+
+    reloaded = loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME)
+    assert reloaded is not evicted
+    assert reloaded.training_subset["close"].tail(3).tolist() == [float(tick.close_price) for tick in ticks]
+    loader.close()
+
+
+def test_eviction_flushes_outside_the_registry_lock(tmp_path, make_asset, make_model_dir, make_ticks):
+    model_dir = make_model_dir(["btc", "eth"])
+    held, writing, release = threading.Event(), threading.Event(), threading.Event()
+
+    class SlowStore(TableStore):
+        def write(self, base, data):
+            if held.is_set() and not writing.is_set():
+                writing.set()
+                release.wait(5)
+            super().write(base, data)
+
+    persister = WriteBehindPersister(flush_interval=3600)
+    loader = PredictionModelLoader(
+        str(model_dir), str(tmp_path / "cache"), persister=persister, store=SlowStore(), lazy=True, max_models=1
+    )
+    loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME).predict(make_ticks(1))
+    held.set()
+
+    evicting = threading.Thread(target=loader.get_model, args=(make_asset('ETH'), MODEL_CLASS_NAME))
+    evicting.start()
+    assert writing.wait(5), "The evicted model flushes its window."
+    started = time.monotonic()
+    assert loader.get_model(make_asset('ETH'), MODEL_CLASS_NAME) is not None
+    assert time.monotonic() - started < 1, "Lookups do not wait for the flush."
+    release.set()
+    evicting.join()
+    loader.close()
+
+
+def test_load_model_retires_the_model_it_replaces(tmp_path, make_asset, make_model_dir, make_ticks):
+    ticks = make_ticks(3)
+    model_dir = make_model_dir(["btc"])
+    loader = PredictionModelLoader(
+        str(model_dir), str(tmp_path / "cache"), persister=WriteBehindPersister(flush_interval=3600)
+    )
+
+    previous = loader.load_model(make_asset('BTC'), MODEL_CLASS_NAME)
+    previous.predict(ticks[:2])
+    current = loader.load_model(make_asset('BTC'), MODEL_CLASS_NAME)
+    previous.predict(ticks[2:])
+
+    assert current is not previous
+    assert loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME) is current
+    assert current.training_subset["close"].tail(3).tolist() == [float(tick.close_price) for tick in ticks]
+    loader.close()
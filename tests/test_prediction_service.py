@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api import PredictionModelLoader, PredictionService
+from src.prediction_engine import PredictionEngine
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+
+TICKERS = ['BTC', 'ETH', 'SOL']
+
+
+class RecordingEngine:
+    def __init__(self, engine):
+        self.engine = engine
+        self.calls = []
+
+    def predict_batch(self, requests):
+        self.calls.append([ticker_symbol for ticker_symbol, _ in requests])
+        return self.engine.predict_batch(requests)
+
+
+def test_service_matches_engine_and_batches_per_asset(
+        tmp_path, dataset_dir, make_asset, make_model_dir, make_engine, make_tick
+):
+    loader = PredictionModelLoader(
+        str(make_model_dir([ticker.lower() for ticker in TICKERS])), str(tmp_path / "cache"), lazy=True
+    )
+    engine = RecordingEngine(PredictionEngine(
+        [make_asset(ticker) for ticker in TICKERS], LocalStorageDataProvider(directory=dataset_dir),
+        str(tmp_path), loader
+    ))
+    expected_engine = make_engine(str(tmp_path / "expected"))
+    requests = [(TICKERS[index % len(TICKERS)], make_tick(index)) for index in range(30)]
+    expected = [expected_engine.predict('BTC', tick) for ticker, tick in requests if ticker == 'BTC']
+
+    async def client():
+        async with PredictionService(engine, max_batch_size=30, max_latency=0.5) as service:
+            predictions = await asyncio.gather(*(service.predict(ticker, tick) for ticker, tick in requests))
+            return predictions, service.stats
+
+    predictions, stats = asyncio.run(client())
+
+    assert [p for (ticker, _), p in zip(requests, predictions) if ticker == 'BTC'] == expected
+    assert stats.requests == 30 and stats.batches == 1 and stats.max_batch_size == 30
+    assert stats.queue_depth == 0
+    assert sorted(len(call) for call in engine.calls) == [10, 10, 10]
+    assert all(len(set(call)) == 1 for call in engine.calls)
+    loader.close()
+
+
+def test_failing_asset_only_fails_its_requests(tmp_path, make_engine, make_tick):
+    engine = make_engine(str(tmp_path))
+
+    async def client():
+        async with PredictionService(engine, max_latency=0.05) as service:
+            return await asyncio.gather(
+                service.predict('BTC', make_tick(0)), service.predict('ETH', make_tick(1)), return_exceptions=True
+            )
+
+    btc, eth = asyncio.run(client())
+
+    assert btc in {0, 1}
+    assert isinstance(eth, ValueError)
+
+
+def test_predict_requires_a_running_service(tmp_path, make_engine, make_tick):
+    service = PredictionService(make_engine(str(tmp_path)))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.predict('BTC', make_tick(0)))
+
+
+class SlowEngine:
+    """Answers 1 for every request, sleeping `delays[ticker]` seconds per call."""
+
+    def __init__(self, delays: dict[str, float]):
+        self.delays = delays
+        self.started = threading.Event()
+        self.completed = []
+
+    def predict_batch(self, requests):
+        self.started.set()
+        time.sleep(self.delays.get(requests[0][0], 0.0))
+        self.completed.append(requests[0][0])
+        return [1] * len(requests)
+
+
+def test_stop_finishes_in_flight_batches_and_fails_collected_requests(make_tick):
+    engine = SlowEngine({'BTC': 0.3})
+
+    async def client():
+        service = PredictionService(engine, max_latency=0.01)
+        await service.start()
+        in_flight = asyncio.create_task(service.predict('BTC', make_tick(0)))
+        while not engine.started.is_set():
+            await asyncio.sleep(0.01)
+
+        service.max_latency = 5.0
+        collecting = asyncio.create_task(service.predict('ETH', make_tick(1)))
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(service.stop(), timeout=2)
+        return await asyncio.wait_for(asyncio.gather(in_flight, collecting, return_exceptions=True), timeout=1)
+
+    btc, eth = asyncio.run(client())
+
+    assert btc == 1
+    assert isinstance(eth, RuntimeError)
+
+
+def test_slow_asset_does_not_block_other_assets(make_tick):
+    engine = SlowEngine({'ETH': 0.5})
+
+    async def client():
+        async with PredictionService(engine, max_latency=0.01) as service:
+            eth = asyncio.create_task(service.predict('ETH', make_tick(0)))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            await service.predict('BTC', make_tick(1))
+            btc_latency = time.monotonic() - started
+            await eth
+            return btc_latency
+
+    assert asyncio.run(client()) < 0.3
+    assert engine.completed == ['BTC', 'ETH']
@@ -0,0 +1,24 @@
+import pytest
+
+from src.helpers.random_forest_classifier_helper import RandomForestClassifierHelper
+
+
+def test_unknown_search_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        RandomForestClassifierHelper(search_strategy="grid")
+
+
+def test_halving_search_grows_n_estimators_between_rounds(make_training_data):
+    helper = RandomForestClassifierHelper(n_jobs=1, search_strategy="halving")
+    helper.n_estimators = range(5, 50)
+    helper.min_samples_split = range(2, 40)
+    helper.max_depth = range(2, 6)
+    helper.halving_min_estimators = 5
+    helper.no_of_iterations = 9
+    helper.n_splits = 3
+
+    data, target = make_training_data()
+    model = helper.train_model(data, target)
+
+    assert model.n_estimators in {5, 15, 45}
+    assert model.predict(data).shape == (len(data),)
@@ -13,14 +13,14 @@ from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCap
 from src.training.random_forest.random_forest_classifier_trainer import RandomForestClassifierTrainer
 
 
-def test_model_prediction():
+def test_model_prediction(tmp_path):
     asset = AssetEntity(
         id=2781, name='BTC', ticker_symbol='BTC',
         exchange='CRYPTO_DOT_COM', market_cap='525885640459.76',
         decimal_places=8, keywords=[]
     )
     model_class_name = "randomforestclassifiermodel"
-    loader = PredictionModelLoader('./tests/models', './tests/cache')
+    loader = PredictionModelLoader('./tests/models', str(tmp_path))
     loader.load_model(asset, model_class_name)
     model = loader.get_model(asset, model_class_name)
     prediction = model.predict([MarketData(
@@ -32,9 +32,9 @@ def test_model_prediction():
     assert prediction[0] in {0, 1}, f"Expected 0 or 1, got {prediction[0]}"
 
 
-def test_model_training():
+def test_model_training(dataset_dir):
     with tempfile.TemporaryDirectory() as temp_model_dir:
-        test_dataset_directory = './tests/datasets'
+        test_dataset_directory = dataset_dir
         pre_processor = CoinMarketCapPreProcessor()
         data_provider = LocalStorageDataProvider(directory=test_dataset_directory)
         asset = AssetEntity(
@@ -62,3 +62,32 @@ def test_model_training_create_model():
     )
     trainer = RandomForestClassifierTrainer('./tests/models', data_provider, pre_processor)
     trainer.train_and_save(asset)
+
+
+def test_model_refresh_grows_new_trees_and_retires_the_oldest(tmp_path):
+    asset = AssetEntity(
+        id=2781, name='BTC', ticker_symbol='BTC',
+        exchange='CRYPTO_DOT_COM', market_cap='525885640459.76',
+        decimal_places=8, keywords=[]
+    )
+    loader = PredictionModelLoader('./tests/models', str(tmp_path))
+    model = loader.load_model(asset, "randomforestclassifiermodel")
+    model.compile()
+    original_trees = list(model.model.estimators_)
+
+    added = model.refresh(n_new_trees=10)
+
+    estimators = model.model.estimators_
+    assert added == 10
+    assert len(estimators) == len(original_trees) == model.model.n_estimators
+    assert estimators[:-10] == original_trees[10:]
+    assert not model.model.warm_start
+    assert model.model.max_depth == 14
+    model.refresh(n_new_trees=10)
+    first_seeds = {estimator.random_state for estimator in estimators[-10:]}
+    assert not first_seeds & {estimator.random_state for estimator in model.model.estimators_[-10:]}
+    prediction = model.predict([MarketData(
+        low_price='25810.4950896881', high_price='25921.976226367', close_price='25895.6782209584',
+        timestamp=int(datetime.now().timestamp()), volume='5481314132.31'
+    )], update=False)
+    assert prediction[0] in {0, 1}
@@ -0,0 +1,157 @@
+import shutil
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from api import PredictionModelLoader
+from src.entities.asset_entity import AssetEntity
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+from src.training.retraining_scheduler import HoldoutDataProvider, RetrainingScheduler
+from src.training.trainer import Trainer
+
+MODEL_CLASS_NAME = "randomforestclassifiermodel"
+SAMPLE_MODEL = Path('./tests/models/btc-randomforestclassifiermodel.joblib').resolve()
+
+
+def accept(*_) -> bool:
+    return True
+
+
+class CopyingTrainer(Trainer):
+    def train_and_save(self, asset: AssetEntity):
+        shutil.copyfile(SAMPLE_MODEL, self._get_file_path(asset, MODEL_CLASS_NAME))
+
+
+@pytest.fixture
+def make_retraining_scheduler(tmp_path, dataset_dir, make_asset, make_model_dir):
+    def make(**options) -> tuple[PredictionModelLoader, RetrainingScheduler]:
+        loader = PredictionModelLoader(str(make_model_dir(["btc"])), str(tmp_path / "cache"))
+        loader.load_model(make_asset(), MODEL_CLASS_NAME)
+        retraining_scheduler = RetrainingScheduler(
+            [make_asset()], LocalStorageDataProvider(directory=dataset_dir), loader, MODEL_CLASS_NAME,
+            trainer_class=CopyingTrainer, total_cores=1, **options
+        )
+        return loader, retraining_scheduler
+    return make
+
+
+def test_retrained_model_is_swapped_in_while_predictions_continue(
+        tmp_path, make_asset, make_ticks, make_retraining_scheduler
+):
+    loader, retraining_scheduler = make_retraining_scheduler(validator=accept)
+    live_model = loader.get_model(make_asset(), MODEL_CLASS_NAME)
+    errors, stop = [], threading.Event()
+
+    def keep_predicting():
+        while not stop.is_set():
+            try:
+                loader.get_model(make_asset(), MODEL_CLASS_NAME).predict(make_ticks(1), update=False)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                errors.append(exc)
+
+    predictor = threading.Thread(target=keep_predicting)
+    predictor.start()
+    try:
+        promoted = retraining_scheduler.run_once()
+    finally:
+        stop.set()
+        predictor.join()
+
+    assert promoted == ['BTC']
+    assert not errors
+    assert loader.get_model(make_asset(), MODEL_CLASS_NAME) is not live_model
+    assert not list((tmp_path / "models").glob(".retrain-*"))
+
+
+def test_model_failing_validation_is_not_swapped_in(make_asset, make_retraining_scheduler):
+    loader, retraining_scheduler = make_retraining_scheduler(validator=lambda *_: False)
+    live_model = loader.get_model(make_asset(), MODEL_CLASS_NAME)
+
+    assert not retraining_scheduler.run_once()
+    assert retraining_scheduler.last_results[0].succeeded
+    assert loader.get_model(make_asset(), MODEL_CLASS_NAME) is live_model
+
+
+def test_default_validator_compares_the_holdout_score_with_the_live_model(make_asset, make_retraining_scheduler):
+    loader, retraining_scheduler = make_retraining_scheduler()
+    model = loader.get_model(make_asset(), MODEL_CLASS_NAME)
+    # The sample model needs longer horizons than the test history has, so score its own window.
+    window = model.training_subset
+    holdout_rows = window.assign(target=(window["close"].shift(-1) > window["close"]).astype(int)).iloc[-31:-1]
+
+    assert retraining_scheduler.validate_model(model, model, holdout_rows)
+    assert not retraining_scheduler.validate_model(model, model, holdout_rows.iloc[0:0])
+    retraining_scheduler.max_score_drop = -0.01
+    assert not retraining_scheduler.validate_model(model, model, holdout_rows), "It must not score below the live model."
+    assert retraining_scheduler.validate_model(model, None, holdout_rows)
+
+
+def test_retraining_holds_out_the_newest_bars(dataset_dir, make_retraining_scheduler):
+    held_out = []
+    _, retraining_scheduler = make_retraining_scheduler(
+        holdout=30, validator=lambda model, live_model, holdout_rows: held_out.append(holdout_rows) or True
+    )
+    data_provider = LocalStorageDataProvider(directory=dataset_dir)
+    history = data_provider.get_ticker_data('BTC')
+
+    assert retraining_scheduler.run_once() == ['BTC']
+    assert held_out[0]["timestamp"].tolist() == history["timestamp"].tail(30).tolist()
+    training_history = HoldoutDataProvider(data_provider, 30).get_ticker_data('BTC')
+    assert training_history["timestamp"].tolist() == history["timestamp"].iloc[:-30].tolist()
+
+
+def test_stop_does_not_wait_for_a_run_in_progress(make_retraining_scheduler):
+    _, retraining_scheduler = make_retraining_scheduler(interval=timedelta(seconds=1), stop_timeout=0.1)
+    running, release = threading.Event(), threading.Event()
+
+    def slow_run():
+        running.set()
+        release.wait(5)
+
+    retraining_scheduler.run_once = slow_run
+    retraining_scheduler.POLL_INTERVAL = 0.01
+    retraining_scheduler.start()
+    assert running.wait(5)
+
+    started = time.monotonic()
+    retraining_scheduler.stop()
+    assert time.monotonic() - started < 1
+    release.set()
+
+
+def test_ticks_received_between_staging_and_swap_reach_the_new_model(
+        dataset_dir, make_asset, make_ticks, make_retraining_scheduler
+):
+    ticks = make_ticks(3)
+    loader, _ = make_retraining_scheduler()
+    live_model = loader.get_model(make_asset(), MODEL_CLASS_NAME)
+
+    def predict_while_staged(model, live, holdout_rows) -> bool:
+        live_model.predict(ticks[:2])
+        return accept(model, live, holdout_rows)
+
+    retraining_scheduler = RetrainingScheduler(
+        [make_asset()], LocalStorageDataProvider(directory=dataset_dir), loader, MODEL_CLASS_NAME,
+        trainer_class=CopyingTrainer, total_cores=1, validator=predict_while_staged
+    )
+    assert retraining_scheduler.run_once() == ['BTC']
+    live_model.predict(ticks[2:])
+
+    swapped_model = loader.get_model(make_asset(), MODEL_CLASS_NAME)
+    assert swapped_model is not live_model
+    closes = [float(tick.close_price) for tick in ticks]
+    assert swapped_model.training_subset["close"].tail(3).tolist() == closes
+    assert live_model.training_subset["close"].tail(3).tolist() != closes
+
+
+def test_run_without_assets_promotes_nothing(dataset_dir, make_retraining_scheduler):
+    loader, _ = make_retraining_scheduler()
+    retraining_scheduler = RetrainingScheduler(
+        [], LocalStorageDataProvider(directory=dataset_dir), loader, MODEL_CLASS_NAME,
+        trainer_class=CopyingTrainer, total_cores=1
+    )
+
+    assert not retraining_scheduler.run_once()
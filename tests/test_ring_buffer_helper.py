@@ -0,0 +1,33 @@
+import numpy
+import pandas as pd
+
+from src.helpers.ring_buffer_helper import RingBuffer
+
+
+def _frame(start: int, stop: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'timestamp': numpy.arange(start, stop, dtype=numpy.int64),
+        'close': numpy.arange(start, stop, dtype=numpy.float64) * 1.5,
+    })
+
+
+def test_ring_buffer_keeps_latest_rows_in_order():
+    buffer = RingBuffer.from_frame(_frame(0, 3), capacity=5)
+    for row in _frame(3, 12).to_dict("records"):
+        buffer.append(row)
+
+    window = buffer.to_frame()
+    assert len(buffer) == 5
+    assert window['timestamp'].tolist() == [7, 8, 9, 10, 11]
+    assert window['close'].tolist() == [10.5, 12.0, 13.5, 15.0, 16.5]
+    assert window['timestamp'].dtype == numpy.int64
+    assert window['close'].dtype == numpy.float64
+
+
+def test_ring_buffer_frame_is_a_snapshot():
+    buffer = RingBuffer.from_frame(_frame(0, 10), capacity=4)
+    snapshot = buffer.to_frame()
+    buffer.append({'timestamp': 10, 'close': 15.0})
+
+    assert snapshot['timestamp'].tolist() == [6, 7, 8, 9]
+    assert buffer.column('timestamp').tolist() == [7, 8, 9, 10]
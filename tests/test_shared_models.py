@@ -0,0 +1,72 @@
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from api import PredictionModelLoader
+
+MODEL_CLASS_NAME = "randomforestclassifiermodel"
+
+
+def _load(asset, model_dir, cache_dir, **options):
+    return PredictionModelLoader(str(model_dir), str(cache_dir), **options).get_model(asset, MODEL_CLASS_NAME)
+
+
+def _compiled_arrays(model) -> list:
+    compiled_model = model._RandomForestClassifierModel__compiled_model
+    return [compiled_model.feature, compiled_model.threshold, compiled_model.left, compiled_model.leaf_proba]
+
+
+def test_workers_map_the_same_read_only_forest(tmp_path, make_model_dir, make_asset):
+    model_dir = make_model_dir(["btc"])
+    first = _load(make_asset('BTC'), model_dir, tmp_path / "worker-1", shared_models=True)
+    second = _load(make_asset('BTC'), model_dir, tmp_path / "worker-2", shared_models=True)
+
+    assert (model_dir / "btc-randomforestclassifiermodel.shared.joblib").is_file()
+    for first_array, second_array in zip(_compiled_arrays(first), _compiled_arrays(second)):
+        assert isinstance(first_array, np.memmap) and isinstance(second_array, np.memmap)
+        assert first_array.filename == second_array.filename
+        assert not first_array.flags.writeable
+
+
+def test_shared_model_predicts_like_the_regular_model(
+        tmp_path, make_model_dir, make_ticks, make_asset
+):
+    model_dir = make_model_dir(["btc"])
+    regular = _load(make_asset('BTC'), model_dir, tmp_path / "regular")
+    shared = _load(make_asset('BTC'), model_dir, tmp_path / "shared", shared_models=True)
+    ticks = make_ticks(5)
+
+    assert list(shared.predict(ticks)) == list(regular.predict(ticks))
+    assert shared.training_subset.equals(regular.training_subset)
+
+
+def test_shared_model_window_stays_private(tmp_path, make_model_dir, make_ticks, make_asset):
+    model_dir = make_model_dir(["btc"])
+    first = _load(make_asset('BTC'), model_dir, tmp_path / "worker-1", shared_models=True)
+    second = _load(make_asset('BTC'), model_dir, tmp_path / "worker-2", shared_models=True)
+    window = second.training_subset
+
+    first.predict(make_ticks(3))
+
+    assert second.training_subset.equals(window)
+    assert not first.training_subset.equals(window)
+    with pytest.raises(RuntimeError):
+        first.refresh()
+
+
+def test_swapped_model_is_served_from_the_shared_export(tmp_path, make_asset, make_model_dir):
+    model_dir = make_model_dir(["btc"])
+    loader = PredictionModelLoader(str(model_dir), str(tmp_path / "cache"), shared_models=True)
+    live = loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME)
+    staged = tmp_path / "staged.joblib"
+    shutil.copyfile(model_dir / "btc-randomforestclassifiermodel.joblib", staged)
+
+    swapped = loader.swap_model(make_asset('BTC'), MODEL_CLASS_NAME, joblib.load(staged), staged)
+
+    assert loader.get_model(make_asset('BTC'), MODEL_CLASS_NAME) is swapped is not live
+    assert all(isinstance(array, np.memmap) for array in _compiled_arrays(swapped))
+    with pytest.raises(RuntimeError):
+        swapped.refresh()
+    loader.close()
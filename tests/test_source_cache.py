@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from src.misc.google_trends import GoogleTrends
+from src.misc.yahoo_finance import YahooFinance
+from src.persistence.source_cache import SourceCache
+
+DAYS = pd.date_range("2024-01-01", periods=10, freq="D", tz="America/New_York", name="Date")
+
+
+class FakeTicker:
+    calls: list[tuple[str, dict]] = []
+    lock = threading.Lock()
+    fail = False
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    def history(self, **kwargs) -> pd.DataFrame:
+        with FakeTicker.lock:
+            FakeTicker.calls.append((self.ticker, kwargs))
+        time.sleep(0.05)
+        if FakeTicker.fail:
+            raise ConnectionError("Yahoo is down.")
+        days = DAYS if "period" in kwargs else DAYS[DAYS >= pd.Timestamp(kwargs["start"], tz=DAYS.tz)]
+        close = [float(day.day) + (100 if "start" in kwargs else 0) for day in days]
+        return pd.DataFrame({"Close": close, "Volume": [1.0] * len(days)}, index=days)
+
+
+class FakeTrendReq:
+    calls = 0
+
+    def __init__(self, hl: str, tz: int):
+        self.keywords = []
+
+    def build_payload(self, keywords: list[str], cat: int):
+        self.keywords = keywords
+
+    def interest_over_time(self) -> pd.DataFrame:
+        FakeTrendReq.calls += 1
+        # Every download covers a window one week later than the previous one.
+        start = pd.Timestamp("2024-01-07") + pd.Timedelta(weeks=FakeTrendReq.calls - 1)
+        index = pd.date_range(start, periods=4, freq="W", name="date")
+        data = {keyword: [FakeTrendReq.calls * 10] * 4 for keyword in self.keywords}
+        return pd.DataFrame({**data, "isPartial": [False] * 4}, index=index)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fakes(monkeypatch):
+    FakeTicker.calls, FakeTicker.fail, FakeTrendReq.calls = [], False, 0
+    monkeypatch.setattr("src.misc.yahoo_finance.yf.Ticker", FakeTicker)
+    monkeypatch.setattr("src.misc.google_trends.TrendReq", FakeTrendReq)
+
+
+def _yahoo(tmp_path, clock: Clock) -> YahooFinance:
+    yahoo = YahooFinance(directory=str(tmp_path))
+    yahoo.cache = SourceCache(yahoo.directory, yahoo.store, timedelta(hours=12), clock=clock)
+    return yahoo
+
+
+def test_yahoo_history_is_cached_then_topped_up(tmp_path):
+    clock = Clock()
+    yahoo = _yahoo(tmp_path, clock)
+
+    first = yahoo.get_data_source("BTC-USD")
+    assert yahoo.get_data_source("BTC-USD").equals(first)
+    assert FakeTicker.calls == [("BTC-USD", {"period": "5y"})]
+
+    clock.now += timedelta(hours=13).total_seconds()
+    refreshed = yahoo.get_data_source("BTC-USD")
+
+    assert FakeTicker.calls[1] == ("BTC-USD", {"start": "2024-01-10"})
+    assert len(refreshed) == 10
+    assert refreshed["Close"].tolist() == [float(day) for day in range(1, 10)] + [110.0]
+    assert str(refreshed["Date"].dt.tz) == "UTC"
+
+
+def test_yahoo_history_is_trimmed_to_the_requested_period(tmp_path):
+    clock = Clock()
+    yahoo = _yahoo(tmp_path, clock)
+
+    first = yahoo.get_data_source("BTC-USD", period="5d")
+    clock.now += timedelta(hours=13).total_seconds()
+    refreshed = yahoo.get_data_source("BTC-USD", period="5d")
+
+    assert first["Date"].dt.day.tolist() == [6, 7, 8, 9, 10]
+    assert refreshed["Date"].dt.day.tolist() == [6, 7, 8, 9, 10]
+    assert yahoo.store.read(yahoo.directory / "BTC-USD-5d").equals(refreshed)
+    history = first.assign(Date=first["Date"] + pd.DateOffset(years=1))
+    assert len(YahooFinance.trim_to_period(history, "1wk")) == 5
+    assert YahooFinance.trim_to_period(history, "ytd")["Date"].dt.day.tolist() == [6, 7, 8, 9, 10]
+    assert YahooFinance.trim_to_period(history, "max").equals(history)
+
+
+def test_concurrent_callers_share_one_download(tmp_path):
+    yahoo = _yahoo(tmp_path, Clock())
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: yahoo.get_data_source("ETH-USD"), range(6)))
+    yahoo.prefetch(["ETH-USD", "SOL-USD", "ADA-USD"])
+
+    assert sorted(ticker for ticker, _ in FakeTicker.calls) == ["ADA-USD", "ETH-USD", "SOL-USD"]
+    assert all(result.equals(results[0]) for result in results)
+
+
+def test_stale_copy_is_served_when_refresh_fails(tmp_path):
+    clock = Clock()
+    yahoo = _yahoo(tmp_path, clock)
+    cached = yahoo.get_data_source("BTC-USD")
+    FakeTicker.fail = True
+    clock.now += timedelta(days=2).total_seconds()
+
+    assert yahoo.get_data_source("BTC-USD").equals(cached)
+    with pytest.raises(ConnectionError):
+        yahoo.get_data_source("DOGE-USD")
+
+
+def test_google_trends_are_refetched_after_ttl(tmp_path):
+    clock = Clock()
+    trends = GoogleTrends(directory=str(tmp_path))
+    trends.cache = SourceCache(trends.directory, trends.store, timedelta(days=7), clock=clock)
+
+    first = trends.get_data_source(["bitcoin", "btc"])
+    trends.get_data_source(["bitcoin", "btc"])
+    clock.now += timedelta(days=8).total_seconds()
+    refreshed = trends.get_data_source(["bitcoin", "btc"])
+
+    assert FakeTrendReq.calls == 2
+    assert len(first) == len(refreshed) == 4
+    assert refreshed["date"].iloc[0] == pd.Timestamp("2024-01-14")
+    assert refreshed["Google"].tolist() == [2 * first["Google"].iloc[0]] * 4, "Old-scale rows must be dropped."
@@ -0,0 +1,100 @@
+import json
+import threading
+from pathlib import Path
+
+import numpy
+import pandas as pd
+import pytest
+
+from src.helpers.dataframe_helper import DataFrameHelper
+from src.helpers.file_lock_helper import FileLock
+from src.persistence.formats.csv_storage_format import CsvStorageFormat
+from src.persistence.formats.numpy_storage_format import NumpyStorageFormat
+from src.persistence.table_store import TableStore
+
+
+def _table() -> pd.DataFrame:
+    return pd.DataFrame({
+        'timestamp': numpy.array([1700000000, 1700086400, 1700172800], dtype=numpy.int64),
+        'close': [42000.5, numpy.nan, 43000.25],
+        'timeOpen': ["2023-11-14T00:00:00.000Z", None, "2023-11-16T00:00:00.000Z"],
+        'Date': pd.to_datetime([1700000000, 1700086400, 1700172800], unit="s", utc=True).tz_convert("US/Eastern"),
+        'isPartial': [False, False, True],
+    })
+
+
+def test_numpy_storage_format_round_trips_typed_columns(tmp_path: Path):
+    storage_format = NumpyStorageFormat(mmap_threshold=0)
+    storage_format.write(tmp_path / "btc-usd", _table())
+    storage_format.write(tmp_path / "btc-usd", _table())
+
+    restored = storage_format.read(tmp_path / "btc-usd")
+
+    pd.testing.assert_frame_equal(restored, _table())
+    assert len(list(storage_format.path_for(tmp_path / "btc-usd").glob("*.npy"))) == 6
+
+
+def test_numpy_storage_format_removes_earlier_generations(tmp_path: Path):
+    storage_format = NumpyStorageFormat()
+    directory = storage_format.path_for(tmp_path / "btc-usd")
+    storage_format.write(tmp_path / "btc-usd", _table())
+    stale_manifest = json.loads((directory / NumpyStorageFormat.MANIFEST).read_text(encoding="utf-8"))
+
+    storage_format.write(tmp_path / "btc-usd", _table())
+
+    assert not any((directory / column["file"]).is_file() for column in stale_manifest["columns"])
+    assert len(list(directory.glob("*.npy"))) == 6
+
+
+def test_numpy_storage_format_readers_lock_out_writers(tmp_path: Path):
+    storage_format = NumpyStorageFormat()
+    storage_format.write(tmp_path / "btc-usd", _table())
+    lock_path = storage_format.path_for(tmp_path / "btc-usd") / NumpyStorageFormat.LOCK
+
+    with FileLock(lock_path, shared=True), FileLock(lock_path, timeout=0.5, shared=True):
+        with pytest.raises(TimeoutError):
+            FileLock(lock_path, timeout=0.1).acquire()
+
+
+def test_numpy_storage_format_concurrent_writers_and_readers_never_tear(tmp_path: Path):
+    storage_format = NumpyStorageFormat()
+    errors = []
+
+    def write():
+        try:
+            for _ in range(5):
+                storage_format.write(tmp_path / "btc-usd", _table())
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            errors.append(exc)
+
+    def read():
+        try:
+            for _ in range(20):
+                pd.testing.assert_frame_equal(storage_format.read(tmp_path / "btc-usd"), _table())
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            errors.append(exc)
+
+    storage_format.write(tmp_path / "btc-usd", _table())
+    threads = [threading.Thread(target=write) for _ in range(4)] + [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    pd.testing.assert_frame_equal(storage_format.read(tmp_path / "btc-usd"), _table())
+
+
+def test_table_store_imports_legacy_csv_once(tmp_path: Path):
+    legacy_format = CsvStorageFormat(sep=";")
+    legacy = _table()[['timestamp', 'close']].assign(
+        timestamp=["2023-11-14T23:59:59.999Z", "2023-11-15T23:59:59.999Z", "2023-11-16T23:59:59.999Z"]
+    )
+    legacy_format.write(tmp_path / "btc-usd", legacy)
+    store = TableStore(legacy_format=legacy_format, on_import=DataFrameHelper.normalize_timestamp)
+
+    imported = store.read(tmp_path / "btc-usd")
+    legacy_format.path_for(tmp_path / "btc-usd").unlink()
+
+    assert imported['timestamp'].dtype == numpy.int64
+    pd.testing.assert_frame_equal(store.read(tmp_path / "btc-usd"), imported)
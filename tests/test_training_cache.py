@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic_data import generate_ohlcv
+from src.helpers.random_forest_classifier_helper import RandomForestClassifierHelper
+from src.providers.history_data_provider import HistoryDataProvider
+from src.providers.preprocessors.coinmarketcap_preprocessor import CoinMarketCapPreProcessor
+from src.training.random_forest.random_forest_classifier_trainer import RandomForestClassifierTrainer
+from src.training.training_cache import TrainingCache
+
+
+class InMemoryDataProvider(HistoryDataProvider):
+    def __init__(self, history):
+        self.history = history
+
+    def get_ticker_data(self, ticker_symbol, from_date=None, to_date=None):
+        return self.history.copy()
+
+    def update_ticker_data(self, ticker_symbol, market_data):
+        self.history = pd.concat([self.history, market_data], ignore_index=True)
+        return market_data
+
+    def get_preprocessor(self):
+        return CoinMarketCapPreProcessor()
+
+
+@pytest.fixture
+def search_calls(monkeypatch):
+    calls = []
+
+    def fit(params):
+        def _fit(self, data, target, *args):
+            calls.append(params or args[0])
+            return RandomForestClassifier(n_estimators=3, max_depth=3, random_state=0).fit(data, target)
+        return _fit
+
+    monkeypatch.setattr(RandomForestClassifierHelper, "train_model", fit("search"))
+    monkeypatch.setattr(RandomForestClassifierHelper, "fit_with_params", fit(None))
+    return calls
+
+
+def test_features_key_depends_on_history_and_preprocessor_config():
+    history = generate_ohlcv(300)
+    preprocessor = CoinMarketCapPreProcessor()
+    key = TrainingCache.features_key(history, preprocessor)
+
+    assert TrainingCache.features_key(history.copy(), preprocessor) == key
+    assert TrainingCache.features_key(generate_ohlcv(301), preprocessor) != key
+
+    preprocessor.horizons = [10, 50]
+    assert TrainingCache.features_key(history, preprocessor) != key
+
+
+def test_features_round_trip(tmp_path):
+    cache = TrainingCache(tmp_path)
+    data, predictors, target = CoinMarketCapPreProcessor().pre_process_data(generate_ohlcv(300))
+
+    cache.write_features('BTC', 'a' * 64, data[predictors], predictors, target)
+    cache.write_features('BTC', 'b' * 64, data[predictors], predictors, target)
+    features, cached_predictors, cached_target = cache.read_features('BTC', 'b' * 64)
+
+    assert cache.read_features('BTC', 'a' * 64) is None
+    assert cached_predictors == predictors
+    pd.testing.assert_frame_equal(features, data[predictors].reset_index(drop=True))
+    assert cached_target.tolist() == target.tolist()
+
+
+def test_trainer_skips_unchanged_history_and_reuses_params(tmp_path, search_calls, make_asset):
+    data_provider = InMemoryDataProvider(generate_ohlcv(300))
+    cache = TrainingCache(tmp_path / "cache")
+    trainer = RandomForestClassifierTrainer(
+        str(tmp_path), data_provider, data_provider.get_preprocessor(), n_jobs=1, training_cache=cache
+    )
+
+    trainer.train_and_save(make_asset())
+    trainer.train_and_save(make_asset())
+    assert search_calls == ["search"]
+
+    data_provider.update_ticker_data('BTC', generate_ohlcv(301).tail(1))
+    trainer.train_and_save(make_asset())
+    assert search_calls == ["search", {"n_estimators": 3, "min_samples_split": 2, "max_depth": 3}]
+    assert (tmp_path / "btc-randomforestclassifiermodel.joblib").is_file()
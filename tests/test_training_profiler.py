@@ -0,0 +1,70 @@
+import json
+
+from src.entities.asset_entity import AssetEntity
+from src.helpers.random_forest_classifier_helper import RandomForestClassifierHelper
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+from src.training.trainer import Trainer
+from src.training.training_profiler import TrainingProfiler
+from src.training.training_scheduler import TrainingScheduler
+
+
+class PhasedTrainer(Trainer):
+    def train_and_save(self, asset: AssetEntity):
+        with self.profiler.profile_asset(asset.ticker_symbol):
+            with self.profiler.phase("data_load"):
+                self.data_provider.get_ticker_data(asset.ticker_symbol)
+            with self.profiler.phase("fit"):
+                sum(range(10_000))
+
+
+def _small_helper(profiler: TrainingProfiler) -> RandomForestClassifierHelper:
+    helper = RandomForestClassifierHelper(n_jobs=2, profiler=profiler)
+    helper.n_estimators = range(5, 20, 5)
+    helper.min_samples_split = range(2, 40)
+    helper.max_depth = range(2, 6)
+    helper.no_of_iterations = 3
+    helper.n_splits = 2
+    return helper
+
+
+def test_profiler_records_phases_candidates_and_profiles(tmp_path, make_training_data):
+    profiler = TrainingProfiler(output_dir=tmp_path, profile_modes=("cprofile", "collapsed"), sample_interval=0.001)
+    data, target = make_training_data()
+
+    with profiler.profile_asset("BTC"):
+        model = _small_helper(profiler).train_model(data, target)
+
+    profile = profiler.profiles["BTC"]
+    assert [phase.name for phase in profile.phases] == ["search", "refit", "evaluate", "backtest"]
+    assert all(phase.wall_time >= 0 and phase.cpu_time >= 0 for phase in profile.phases)
+    assert len(profile.candidates) == 3
+    assert model.get_params()["n_estimators"] in {candidate.params["n_estimators"] for candidate in profile.candidates}
+    assert all(candidate.fit_time > 0 for candidate in profile.candidates)
+    assert profile.peak_memory > 0
+    assert (tmp_path / "btc.prof").stat().st_size > 0
+    assert (tmp_path / "btc.collapsed").read_text(encoding="utf-8").strip()
+    saved = json.loads((tmp_path / "btc-profile.json").read_text(encoding="utf-8"))
+    assert saved["cprofile_path"] == str(tmp_path / "btc.prof")
+
+
+def test_disabled_profiler_records_nothing(make_training_data):
+    profiler = TrainingProfiler(enabled=False)
+    data, target = make_training_data()
+
+    with profiler.profile_asset("BTC"):
+        _small_helper(profiler).train_model(data, target)
+
+    assert not profiler.profiles
+
+
+def test_scheduler_returns_worker_profiles(tmp_path, dataset_dir, make_asset):
+    scheduler = TrainingScheduler(
+        str(tmp_path), LocalStorageDataProvider(directory=dataset_dir), total_cores=1,
+        trainer_class=PhasedTrainer, profiler=TrainingProfiler(trace_memory=False)
+    )
+
+    [result] = scheduler.train([make_asset('BTC')])
+
+    assert result.succeeded
+    assert [phase.name for phase in result.profile.phases] == ["data_load", "fit"]
+    assert result.profile.peak_memory is None
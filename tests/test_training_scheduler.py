@@ -0,0 +1,74 @@
+import os
+import time
+from pathlib import Path
+
+from src.entities.asset_entity import AssetEntity
+from src.providers.clients.local_storage_data_provider import LocalStorageDataProvider
+from src.training.trainer import Trainer
+from src.training.training_scheduler import TrainingScheduler
+
+
+class RecordingTrainer(Trainer):
+    def train_and_save(self, asset: AssetEntity):
+        if asset.ticker_symbol == 'FAIL':
+            raise ValueError("Broken history.")
+        if asset.ticker_symbol == 'DIE':
+            os._exit(1)
+        if asset.ticker_symbol == 'SLOW':
+            time.sleep(1)
+        Path(self.model_dir, f"{asset.ticker_symbol.lower()}.trained").write_text(str(self.n_jobs), encoding="utf-8")
+
+
+def test_split_cores_balances_outer_and_inner_parallelism():
+    scheduler = TrainingScheduler('.', None, total_cores=12)
+
+    assert scheduler.split_cores(1) == (1, 12)
+    assert scheduler.split_cores(4) == (4, 3)
+    assert scheduler.split_cores(30) == (12, 1)
+    assert TrainingScheduler('.', None, total_cores=12, max_parallel_assets=2).split_cores(30) == (2, 6)
+
+
+def test_failing_asset_does_not_abort_the_others(tmp_path, dataset_dir, make_asset):
+    progress = []
+    scheduler = TrainingScheduler(
+        str(tmp_path), LocalStorageDataProvider(directory=dataset_dir),
+        total_cores=4, trainer_class=RecordingTrainer,
+        on_progress=lambda result, completed, total: progress.append((completed, total))
+    )
+
+    results = scheduler.train([make_asset('BTC'), make_asset('FAIL'), make_asset('ETH')])
+
+    assert [result.ticker_symbol for result in results] == ['BTC', 'FAIL', 'ETH']
+    assert [result.succeeded for result in results] == [True, False, True]
+    assert "Broken history." in results[1].error
+    assert all(result.wall_time >= 0 for result in results)
+    assert (tmp_path / "btc.trained").read_text(encoding="utf-8") == "1"
+    assert (tmp_path / "eth.trained").exists()
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_duplicate_assets_get_one_result_each(tmp_path, dataset_dir, make_asset):
+    progress = []
+    scheduler = TrainingScheduler(
+        str(tmp_path), LocalStorageDataProvider(directory=dataset_dir), total_cores=2,
+        trainer_class=RecordingTrainer, on_progress=lambda result, completed, total: progress.append(completed)
+    )
+
+    results = scheduler.train([make_asset('BTC'), make_asset('BTC')])
+
+    assert [result.ticker_symbol for result in results] == ['BTC', 'BTC']
+    assert all(result.succeeded for result in results)
+    assert sorted(progress) == [1, 2]
+
+
+def test_dead_worker_is_timed_from_its_own_start(tmp_path, dataset_dir, make_asset):
+    scheduler = TrainingScheduler(
+        str(tmp_path), LocalStorageDataProvider(directory=dataset_dir), total_cores=1,
+        trainer_class=RecordingTrainer
+    )
+
+    slow, dead, skipped = scheduler.train([make_asset('SLOW'), make_asset('DIE'), make_asset('BTC')])
+
+    assert slow.succeeded and slow.wall_time >= 1
+    assert not dead.succeeded and dead.wall_time < slow.wall_time
+    assert not skipped.succeeded
@@ -0,0 +1,67 @@
+import gc
+import time
+import weakref
+from pathlib import Path
+
+import pandas as pd
+
+from src.persistence.formats.csv_storage_format import CsvStorageFormat
+from src.persistence.write_behind_persister import WriteBehindPersister
+
+
+def test_pending_writes_are_flushed_on_close(tmp_path: Path):
+    persister = WriteBehindPersister(flush_interval=60, max_dirty_ticks=1000)
+    storage_format = CsvStorageFormat()
+    base = tmp_path / "btc-train-subset"
+    target = storage_format.path_for(base)
+    for value in range(5):
+        persister.mark_dirty(base, lambda value=value: pd.DataFrame({"close": [value]}), storage_format.write)
+
+    assert not target.exists()
+    persister.close()
+
+    assert pd.read_csv(target)["close"].tolist() == [4]
+    assert list(tmp_path.iterdir()) == [target], "Temporary files were left behind."
+
+
+def test_dirty_tick_threshold_triggers_background_flush(tmp_path: Path):
+    persister = WriteBehindPersister(flush_interval=60, max_dirty_ticks=3)
+    storage_format = CsvStorageFormat()
+    base = tmp_path / "eth-train-subset"
+    target = storage_format.path_for(base)
+    for _ in range(3):
+        persister.mark_dirty(base, lambda: pd.DataFrame({"close": [1.0]}), storage_format.write)
+
+    deadline = time.monotonic() + 5
+    while not target.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    persister.close()
+
+    assert target.exists()
+    assert persister.pending == 0
+
+
+def test_unreferenced_persister_is_collected_and_flushed(tmp_path: Path):
+    persister = WriteBehindPersister(flush_interval=60)
+    storage_format = CsvStorageFormat()
+    base = tmp_path / "sol-train-subset"
+    persister.mark_dirty(base, lambda: pd.DataFrame({"close": [2.0]}), storage_format.write)
+    reference = weakref.ref(persister)
+
+    del persister
+    gc.collect()
+
+    assert reference() is None
+    assert pd.read_csv(storage_format.path_for(base))["close"].tolist() == [2.0]
+
+
+def test_updates_after_close_are_written_inline(tmp_path: Path):
+    persister = WriteBehindPersister(flush_interval=60)
+    storage_format = CsvStorageFormat()
+    base = tmp_path / "ada-train-subset"
+    persister.close()
+
+    persister.mark_dirty(base, lambda: pd.DataFrame({"close": [3.0]}), storage_format.write)
+
+    assert persister.pending == 0
+    assert pd.read_csv(storage_format.path_for(base))["close"].tolist() == [3.0]